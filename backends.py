@@ -0,0 +1,356 @@
+"""DOM backends for the hot operations of the invite loop.
+
+Extracting the result cards, clicking a card's button, filling the note or
+message box and waiting for the dialog are the operations every invite
+repeats. WebDriverBackend runs them as classic WebDriver commands, one HTTP
+round-trip to chromedriver per find, click, attribute read or wait poll.
+
+CdpBackend sends them over a persistent DevTools websocket to the tab
+instead. Each operation is one Runtime.evaluate message whose script does
+all of its steps in the page (find, scroll, click, wait for the dialog) and
+waits on a MutationObserver rather than being polled from Python. Cards are
+addressed by the data-lac-id handle the card extractor sets, so no element
+references cross the connection. create_backend() falls back to the classic
+backend when no DevTools connection can be made.
+"""
+import json
+import threading
+from urllib.request import urlopen
+
+from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException, TimeoutException,
+                                        WebDriverException)
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+import waits
+from cards import Card, FIND_BUTTON_JS, extract_cards, relocate_button
+
+WEBDRIVER = 'webdriver'
+CDP = 'cdp'
+
+# What a click waits for afterwards
+MODAL_OPEN = 'modal_open'
+MODAL_CLOSED = 'modal_closed'
+# The clicked element is removed or hidden
+DETACHED = 'detached'
+
+# Wait step whose ceiling bounds each of the conditions above
+_UNTIL_STEPS = {MODAL_OPEN: 'modal_open', MODAL_CLOSED: 'modal_close', DETACHED: 'modal_close'}
+
+# Seconds allowed for a DevTools reply on top of the waits inside the script
+_REPLY_MARGIN = 5
+
+# JSON.stringify replacer dropping DOM elements from script results
+_NO_NODES = "(key, value) => value instanceof Node ? null : value"
+
+_DOM_HELPERS_JS = r"""
+function isShown(el) {
+    return !!el && el.isConnected && (el.offsetParent !== null || el.getClientRects().length > 0);
+}
+function byXPath(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function clickable(xpath) {
+    const el = byXPath(xpath);
+    return isShown(el) && !el.disabled ? el : null;
+}
+function visibleModal() {
+    for (const modal of document.querySelectorAll('div[role="dialog"], div[role="alertdialog"], .artdeco-modal')) {
+        if (isShown(modal)) return modal;
+    }
+    return null;
+}
+// Resolves with the first truthy value of check(), re-checked on every DOM mutation
+function observe(check, timeoutMs) {
+    return new Promise(resolve => {
+        const first = check();
+        if (first || timeoutMs <= 0) return resolve(first || null);
+        let timer = null;
+        const observer = new MutationObserver(() => {
+            const value = check();
+            if (value) done(value);
+        });
+        function done(value) {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(value);
+        }
+        timer = setTimeout(() => done(null), timeoutMs);
+        observer.observe(document, {childList: true, subtree: true, attributes: true});
+    });
+}
+// Waits for the condition named by `until`, returns [reached, waited ms]
+async function settle(until, el, timeoutMs) {
+    const checks = {
+        modal_open: () => visibleModal(),
+        modal_closed: () => !visibleModal(),
+        detached: () => !isShown(el)
+    };
+    if (!checks[until]) return [true, 0];
+    const start = performance.now();
+    const reached = !!(await observe(checks[until], timeoutMs));
+    return [reached, performance.now() - start];
+}
+"""
+
+_CLICK_CARD_JS = _DOM_HELPERS_JS + FIND_BUTTON_JS + r"""
+const [ref, until, untilMs] = arguments;
+const el = findButton(ref);
+if (!el) return null;
+el.scrollIntoView({block: 'center'});
+el.click();
+return await settle(until, el, untilMs);
+"""
+
+_CLICK_XPATH_JS = _DOM_HELPERS_JS + r"""
+const [xpath, timeoutMs, until, untilMs] = arguments;
+const start = performance.now();
+const el = await observe(() => clickable(xpath), timeoutMs);
+if (!el) return null;
+const foundMs = performance.now() - start;
+el.click();
+return [...await settle(until, el, untilMs), foundMs];
+"""
+
+_FILL_JS = _DOM_HELPERS_JS + r"""
+const [xpath, text, timeoutMs] = arguments;
+const start = performance.now();
+const box = await observe(() => byXPath(xpath), timeoutMs);
+if (!box) return null;
+const foundMs = performance.now() - start;
+box.focus();
+if (box.isContentEditable) document.execCommand('selectAll', false);
+else box.select();
+// insertText fires the input events the page listens to, like typing
+if (!document.execCommand('insertText', false, text)) {
+    if (box.isContentEditable) box.textContent = text;
+    else box.value = text;
+    box.dispatchEvent(new Event('input', {bubbles: true}));
+}
+return foundMs;
+"""
+
+_VISIBLE_JS = _DOM_HELPERS_JS + r"""
+return isShown(byXPath(arguments[0]));
+"""
+
+
+class WebDriverBackend:
+    """Hot operations as classic WebDriver commands"""
+    name = WEBDRIVER
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.actions = ActionChains(driver)
+        # Why a requested backend could not be used, '' when it is the one asked for
+        self.fallback_reason = ''
+
+    def execute_script(self, script:str, *args):
+        return self.driver.execute_script(script, *args)
+
+    def attach(self, window_handle:str):
+        """Called after the driver switched to another tab"""
+
+    def detach(self, window_handle:str):
+        """Called when a tab is closed"""
+
+    def close(self):
+        pass
+
+    def extract_cards(self, registry=None) -> list:
+        return extract_cards(self, registry)
+
+    def visible(self, xpath:str) -> bool:
+        try:
+            return any(element.is_displayed() for element in self.driver.find_elements(By.XPATH, xpath))
+        except WebDriverException:
+            return False
+
+    def card_button(self, card:Card, refresh:bool=False):
+        """The card's button element, looked up again inside its card when refresh is set or it has none"""
+        if refresh or card.button is None:
+            relocate_button(self.driver, card)
+        if card.button is None:
+            raise NoSuchElementException(f"No {card.kind} button left for {card.key or card.handle}")
+        return card.button
+
+    def click_card(self, card:Card, until:str=None) -> bool:
+        """Scroll to the card's button and click it, returns whether `until` was reached"""
+        def click(button):
+            self.actions.move_to_element(button).perform()
+            self.driver.execute_script("arguments[0].click();", button)
+            return button
+
+        try:
+            button = click(self.card_button(card))
+        except StaleElementReferenceException:
+            # The results re-rendered since extraction, find the button again within the same card
+            button = click(self.card_button(card, refresh=True))
+        return self._settle(until, button)
+
+    def click_xpath(self, xpath:str, timeout:float=None, until:str=None) -> bool:
+        """Click the element once it is clickable, returns whether `until` was reached.
+
+        Waits the learned 'clickable' timeout unless one is given. Raises
+        TimeoutException when the element doesn't become clickable, or
+        NoSuchElementException right away when timeout is 0 and it is missing.
+        """
+        if timeout is not None and timeout <= 0:
+            element = self.driver.find_element(By.XPATH, xpath)
+        else:
+            element = waits.wait_for(self.driver, 'clickable', EC.element_to_be_clickable((By.XPATH, xpath)), timeout)
+        self.driver.execute_script("arguments[0].click();", element)
+        return self._settle(until, element)
+
+    def fill(self, xpath:str, text:str, timeout:float=None):
+        """Replace the content of a textarea or text box, raises TimeoutException when it doesn't show"""
+        box = waits.wait_for(self.driver, 'clickable', EC.presence_of_element_located((By.XPATH, xpath)), timeout)
+        box.clear()
+        box.send_keys(text)
+
+    def _settle(self, until:str, element) -> bool:
+        if until == MODAL_OPEN:
+            return bool(waits.try_wait_for(self.driver, 'modal_open', waits.modal_open))
+        if until == MODAL_CLOSED:
+            return bool(waits.try_wait_for(self.driver, 'modal_close', waits.modal_closed))
+        if until == DETACHED:
+            return bool(waits.try_wait_for(self.driver, 'modal_close', EC.invisibility_of_element(element)))
+        return True
+
+
+class CdpBackend(WebDriverBackend):
+    """Hot operations over a persistent DevTools connection to each tab"""
+    name = CDP
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.address = (driver.capabilities.get('goog:chromeOptions') or {}).get('debuggerAddress')
+        # Window handle -> websocket of that tab
+        self.sockets = {}
+        self.handle = None
+        self.message_id = 0
+        self.messages = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """Open the connection to the driver's current tab, raises when DevTools can't be reached"""
+        if not self.address:
+            raise RuntimeError("Chrome reports no debuggerAddress")
+        self.attach(self.driver.current_window_handle)
+        return self
+
+    def attach(self, window_handle:str):
+        """Send the next operations to this tab, connecting to it the first time"""
+        if window_handle not in self.sockets:
+            import websocket
+            # chromedriver window handles are DevTools target ids, older versions prefix them
+            target_id = window_handle.replace('CDwindow-', '')
+            with urlopen(f"http://{self.address}/json/list", timeout=_REPLY_MARGIN) as response:
+                targets = json.load(response)
+            target = next((t for t in targets if t.get('id') == target_id), None)
+            if not target:
+                raise RuntimeError(f"No DevTools target for window {window_handle}")
+            self.sockets[window_handle] = websocket.create_connection(
+                target['webSocketDebuggerUrl'], timeout=_REPLY_MARGIN, suppress_origin=True)
+        self.handle = window_handle
+
+    def detach(self, window_handle:str):
+        socket = self.sockets.pop(window_handle, None)
+        if socket:
+            socket.close()
+        if self.handle == window_handle:
+            self.handle = None
+
+    def close(self):
+        for window_handle in list(self.sockets):
+            self.detach(window_handle)
+
+    def send(self, method:str, params:dict=None, timeout:float=0):
+        """Send one DevTools command to the current tab and return its result"""
+        with self.lock:
+            socket = self.sockets[self.handle]
+            self.message_id += 1
+            message_id = self.message_id
+            socket.settimeout(timeout + _REPLY_MARGIN)
+            socket.send(json.dumps({'id': message_id, 'method': method, 'params': params or {}}))
+            self.messages += 1
+            while True:
+                # No domain is enabled, so anything else on the socket is a stale reply
+                reply = json.loads(socket.recv())
+                if reply.get('id') == message_id:
+                    break
+        if 'error' in reply:
+            raise WebDriverException(f"{method}: {reply['error'].get('message')}")
+        return reply.get('result', {})
+
+    def execute_script(self, script:str, *args, timeout:float=0):
+        """Run a WebDriver style script body in the page, awaiting it when it is async.
+
+        Elements can't cross the connection and come back as None.
+        """
+        expression = (f"(async function() {{\n{script}\n}}).apply(null, {json.dumps(list(args))})"
+                      f".then(value => value === undefined ? null : JSON.parse(JSON.stringify(value, {_NO_NODES})))")
+        result = self.send('Runtime.evaluate', {'expression': expression, 'awaitPromise': True,
+                                                'returnByValue': True}, timeout)
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            raise WebDriverException((details.get('exception') or {}).get('description') or details.get('text'))
+        return result.get('result', {}).get('value')
+
+    def visible(self, xpath:str) -> bool:
+        return bool(self.execute_script(_VISIBLE_JS, xpath))
+
+    def click_card(self, card:Card, until:str=None) -> bool:
+        until_timeout = self._until_timeout(until)
+        settled = self.execute_script(_CLICK_CARD_JS, card.ref(), until, until_timeout * 1000, timeout=until_timeout)
+        if settled is None:
+            raise NoSuchElementException(f"No {card.kind} button left for {card.key or card.handle}")
+        return self._record(until, settled)
+
+    def click_xpath(self, xpath:str, timeout:float=None, until:str=None) -> bool:
+        timeout = waits.timeout_for('clickable') if timeout is None else timeout
+        until_timeout = self._until_timeout(until)
+        settled = self.execute_script(_CLICK_XPATH_JS, xpath, timeout * 1000, until, until_timeout * 1000,
+                                      timeout=timeout + until_timeout)
+        if settled is None:
+            if timeout > 0:
+                waits.record('clickable', timeout, timed_out=True)
+            raise TimeoutException(f"{xpath} not clickable after {timeout}s")
+        if timeout > 0:
+            waits.record('clickable', settled[2] / 1000)
+        return self._record(until, settled)
+
+    def fill(self, xpath:str, text:str, timeout:float=None):
+        timeout = waits.timeout_for('clickable') if timeout is None else timeout
+        found_ms = self.execute_script(_FILL_JS, xpath, text, timeout * 1000, timeout=timeout)
+        if found_ms is None:
+            waits.record('clickable', timeout, timed_out=True)
+            raise TimeoutException(f"{xpath} not found after {timeout}s")
+        waits.record('clickable', found_ms / 1000)
+
+    @staticmethod
+    def _until_timeout(until:str) -> float:
+        return waits.timeout_for(_UNTIL_STEPS[until]) if until in _UNTIL_STEPS else 0
+
+    @staticmethod
+    def _record(until:str, settled:list) -> bool:
+        """Count the in-page wait like an optional WebDriverWait of the same step"""
+        reached, waited_ms = settled[:2]
+        if until in _UNTIL_STEPS:
+            waits.record(_UNTIL_STEPS[until], waited_ms / 1000, learn=reached)
+        return reached
+
+
+def create_backend(driver, name:str=WEBDRIVER):
+    """The named backend for driver, classic WebDriver when the DevTools connection fails"""
+    if name == CDP:
+        backend = CdpBackend(driver)
+        try:
+            return backend.connect()
+        except Exception as e:
+            backend.close()
+            fallback = WebDriverBackend(driver)
+            fallback.fallback_reason = str(e) or type(e).__name__
+            return fallback
+    return WebDriverBackend(driver)
@@ -0,0 +1,172 @@
+"""Offline benchmarks of the invite loop.
+
+    python benchmark.py suite --limit 20
+    python benchmark.py backends fixtures/v1 --limit 10 --rounds 3
+
+`suite` runs the real flow (location filter, send_connection_request and
+its pagination) in headless Chrome against the local LinkedIn simulator,
+once per scenario, and reports invites per hour, WebDriver commands per
+invite and the time per phase. Every scenario starts from a fresh
+simulator with the same seed, so numbers from two commits compare.
+
+`backends` replays the same captured fixture pages with each DOM backend
+and compares the per-invite latency (click, dialog and send phases) and the
+WebDriver commands and DevTools messages each invite needed. The backends
+take turns every round so neither always runs on a warm cache.
+"""
+import argparse
+import time
+from dataclasses import replace
+
+from fixtures import start_server, server_url, replay_driver
+from simulator import SimulatorConfig, start_simulator, search_url
+
+# Phases that make up the latency of one invite
+INVITE_PHASES = ('click', 'modal', 'send')
+
+# Simulator settings of each suite scenario, on top of the command line ones
+SCENARIOS = {
+    'baseline': {},
+    'slow_pages': {'page_latency_ms': 1500, 'dialog_latency_ms': 600},
+    'flaky': {'click_failure_rate': 0.1, 'send_failure_rate': 0.05, 'got_it_rate': 0.3},
+    'sparse': {'message_rate': 0.3, 'pending_rate': 0.3, 'follow_rate': 0.2},
+    'invite_limit': {'invite_limit': 5},
+}
+
+STOP_REASONS = {None: 'limit reached', 'end': 'end of results', 'limit': 'invitation limit',
+                'quota': 'quota', 'error': 'error'}
+
+
+def run_flow(driver, start_url:str, backend:str='webdriver', limit:int=10, include_notes:bool=True,
+             pagination:str='url', location:str='', two_tabs:bool=False) -> dict:
+    """Run the invite flow from start_url with no pacing, returns its numbers"""
+    import log
+    import main
+    from backends import CdpBackend, create_backend
+    from command_stats import CommandAccounting
+    from metrics import Metrics
+    from waits import PacingPolicy
+
+    main.run_metrics = Metrics()
+    main.dom_backend = create_backend(driver, backend)
+    if main.dom_backend.fallback_reason:
+        raise RuntimeError(f"{backend} backend unavailable: {main.dom_backend.fallback_reason}")
+    accounting = CommandAccounting().install(driver)
+    main.run_metrics.command_counter = lambda: accounting.total
+    try:
+        start = time.monotonic()
+        with main.run_metrics.span('navigation', page=1, selector='url'):
+            driver.get(start_url)
+        if location:
+            with main.run_metrics.span('select_location', location=location):
+                main.select_location(driver, location)
+        runner = main.send_with_two_tabs if two_tabs else main.send_connection_request
+        sent, stop_reason = runner(driver=driver, limit=limit, letter="Hi {name}, benchmark run.",
+                                   include_notes=include_notes, message_letter='',
+                                   pacing=PacingPolicy(action_delay=0), pagination=pagination)
+        elapsed = time.monotonic() - start
+    finally:
+        accounting.uninstall()
+        main.dom_backend.close()
+        log.drain()
+    durations = main.run_metrics.durations
+    return {
+        'sent': sent,
+        'stop_reason': stop_reason,
+        'seconds': elapsed,
+        'commands': accounting.total,
+        'messages': main.dom_backend.messages if isinstance(main.dom_backend, CdpBackend) else 0,
+        'phases': main.run_metrics.summary(),
+        'phase_seconds': {phase: sum(values) for phase, values in durations.items()},
+    }
+
+
+def run_suite(scenarios:list, base:SimulatorConfig, limit:int, backend:str, include_notes:bool,
+              pagination:str, location:str, two_tabs:bool):
+    """Run each scenario against its own simulator and print invites/hour, commands/invite and phase times"""
+    driver = replay_driver()
+    try:
+        for name in scenarios:
+            server = start_simulator(replace(base, **SCENARIOS[name]))
+            try:
+                result = run_flow(driver, search_url(server), backend, limit, include_notes, pagination, location, two_tabs)
+                confirmed = server.simulator.stats()['invites']
+            finally:
+                server.shutdown()
+            sent = result['sent']
+            print(f"[BENCH] {name}: {sent} sent ({confirmed} confirmed by the simulator) in {result['seconds']:.1f}s, "
+                  f"{sent / result['seconds'] * 3600:.0f} invites/hour, "
+                  f"{result['commands'] / max(sent, 1):.1f} WebDriver commands per invite, "
+                  f"stopped: {STOP_REASONS.get(result['stop_reason'], result['stop_reason'])}")
+            for phase, stats in result['phases'].items():
+                print(f"    {phase:<16} {stats['count']:4d}x  p50 {stats['p50']:.2f}s  p95 {stats['p95']:.2f}s  "
+                      f"total {result['phase_seconds'][phase]:.1f}s")
+    finally:
+        driver.quit()
+
+
+def compare_backends(directory:str, names:list, limit:int, rounds:int, include_notes:bool):
+    """Run every backend `rounds` times on the fixtures and print the per-invite comparison"""
+    server = start_server(directory)
+    driver = replay_driver()
+    totals = {name: [] for name in names}
+    try:
+        for round_num in range(rounds):
+            order = names if round_num % 2 == 0 else list(reversed(names))
+            for name in order:
+                result = run_flow(driver, server_url(server), name, limit, include_notes)
+                totals[name].append(result)
+                print(f"[BENCH] round {round_num + 1} {name}: {result['sent']} invites in {result['seconds']:.2f}s")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    latency = {}
+    for name, results in totals.items():
+        sent = sum(result['sent'] for result in results)
+        if not sent:
+            print(f"[BENCH] {name}: no invites sent")
+            continue
+        phases = {phase: sum(result['phase_seconds'].get(phase, 0.0) for result in results) / sent for phase in INVITE_PHASES}
+        latency[name] = sum(phases.values())
+        print(f"[BENCH] {name}: {latency[name] * 1000:.0f} ms per invite ("
+              + ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in phases.items())
+              + f"), {sum(result['commands'] for result in results) / sent:.1f} WebDriver commands and "
+                f"{sum(result['messages'] for result in results) / sent:.1f} DevTools messages per invite, "
+                f"{sum(result['seconds'] for result in results) / sent:.2f}s per invite end to end")
+    if len(latency) == 2:
+        (slow, slow_latency), (fast, fast_latency) = sorted(latency.items(), key=lambda item: -item[1])
+        print(f"[BENCH] {fast} is {slow_latency / fast_latency:.1f}x faster per invite than {slow}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the invite loop")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    suite_parser = subparsers.add_parser("suite", help="run the invite flow against the LinkedIn simulator")
+    suite_parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenarios to run")
+    suite_parser.add_argument("--limit", type=int, default=20)
+    suite_parser.add_argument("--results", type=int, default=SimulatorConfig.results, help="search results per scenario")
+    suite_parser.add_argument("--latency", type=int, default=SimulatorConfig.page_latency_ms, help="page load latency in ms")
+    suite_parser.add_argument("--backend", default="webdriver", help="DOM backend: webdriver or cdp")
+    suite_parser.add_argument("--pagination", default="url", help="url or buttons")
+    suite_parser.add_argument("--location", default="", help="apply this location through the filter UI first")
+    suite_parser.add_argument("--two-tabs", action="store_true", help="use the two-tab execution mode")
+    suite_parser.add_argument("--no-notes", action="store_true", help="send invites without a note")
+
+    backends_parser = subparsers.add_parser("backends", help="compare per-invite latency of the DOM backends on fixtures")
+    backends_parser.add_argument("directory")
+    backends_parser.add_argument("--limit", type=int, default=10)
+    backends_parser.add_argument("--rounds", type=int, default=3)
+    backends_parser.add_argument("--no-notes", action="store_true", help="send invites without a note")
+    backends_parser.add_argument("--backends", default="webdriver,cdp", help="comma separated backends to compare")
+
+    args = parser.parse_args()
+    if args.command == "suite":
+        unknown = set(args.scenarios.split(',')) - set(SCENARIOS)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        run_suite(args.scenarios.split(','), SimulatorConfig(results=args.results, page_latency_ms=args.latency),
+                  args.limit, args.backend, not args.no_notes, args.pagination, args.location, args.two_tabs)
+    else:
+        compare_backends(args.directory, args.backends.split(','), args.limit, args.rounds, not args.no_notes)
@@ -0,0 +1,173 @@
+"""Chrome driver profiles.
+
+A BrowserProfile describes how Chrome is started: a persistent user data
+directory (so the LinkedIn session and HTTP cache survive between runs),
+headless mode, a fixed window size and where the chromedriver binary comes
+from. The driver path resolved by webdriver_manager is cached on disk so
+later runs start without any network lookup.
+
+Resources that are not needed to read names or click buttons (images,
+video, fonts, trackers) can be blocked through the DevTools protocol, and
+NetworkStats reports how many requests that saved. Blocked requests never
+transfer anything, so the bytes they saved are an estimate from typical
+sizes per resource type; only the transferred bytes are measured.
+"""
+import json
+import os
+from dataclasses import dataclass
+
+DRIVER_CACHE_FILE = '.driver_cache.json'
+
+_IMAGES_AND_MEDIA = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*media.licdn.com/dms/image*', '*dms.licdn.com/playlist*',
+]
+
+_THIRD_PARTY = [
+    '*doubleclick.net*', '*google-analytics.com*', '*googletagmanager.com*',
+    '*px.ads.linkedin.com*', '*snap.licdn.com*', '*bat.bing.com*', '*connect.facebook.net*',
+]
+
+# URL patterns for Network.setBlockedURLs
+BLOCK_PRESETS = {
+    'none': [],
+    'images+media': _IMAGES_AND_MEDIA,
+    # Images and media plus fonts, stylesheets and the known trackers above.
+    # setBlockedURLs only takes block patterns, so third-party scripts, iframes
+    # and documents not listed here still load. Blocking stylesheets is the
+    # fastest setting but may hide some layouts' buttons.
+    'strict': _IMAGES_AND_MEDIA + _THIRD_PARTY + ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.css'],
+}
+
+# Rough transfer size per resource type, used to estimate what blocking saved
+ESTIMATED_BYTES = {
+    'Image': 25_000, 'Media': 500_000, 'Font': 40_000, 'Stylesheet': 30_000, 'Script': 60_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+@dataclass
+class BrowserProfile:
+    """Chrome startup settings, read from the [Browser] section"""
+    headless: bool = False
+    user_data_dir: str = ''
+    profile_directory: str = ''
+    window_size: str = ''
+    driver_path: str = ''
+    driver_manager: bool = False
+    block_preset: str = 'none'
+    block_urls: str = ''
+
+    @classmethod
+    def from_config(cls, input_config):
+        section = 'Browser'
+        return cls(
+            headless=input_config.getboolean(section, 'headless', fallback=False),
+            user_data_dir=input_config.get(section, 'user_data_dir', fallback=''),
+            profile_directory=input_config.get(section, 'profile_directory', fallback=''),
+            window_size=input_config.get(section, 'window_size', fallback=''),
+            driver_path=input_config.get(section, 'driver_path', fallback=''),
+            driver_manager=input_config.getboolean(section, 'driver_manager', fallback=False),
+            block_preset=input_config.get(section, 'block_preset', fallback='none'),
+            block_urls=input_config.get(section, 'block_urls', fallback=''),
+        )
+
+    @property
+    def persistent(self) -> bool:
+        """True when the browser keeps its session between runs"""
+        return bool(self.user_data_dir)
+
+    def blocked_urls(self) -> list:
+        """URL patterns to block, from the preset plus any extra block_urls"""
+        if self.block_preset not in BLOCK_PRESETS:
+            raise ValueError(f"Unknown block_preset '{self.block_preset}', use one of: {', '.join(BLOCK_PRESETS)}")
+        extra = [pattern.strip() for pattern in self.block_urls.split(',') if pattern.strip()]
+        return BLOCK_PRESETS[self.block_preset] + extra
+
+    def chrome_arguments(self) -> list:
+        arguments = []
+        if self.headless:
+            arguments.append("--headless=new")
+        if self.user_data_dir:
+            arguments.append(f"--user-data-dir={os.path.abspath(self.user_data_dir)}")
+        if self.profile_directory:
+            arguments.append(f"--profile-directory={self.profile_directory}")
+        if self.window_size:
+            arguments.append(f"--window-size={self.window_size.replace('x', ',')}")
+        return arguments
+
+
+def _read_driver_cache() -> str:
+    try:
+        with open(DRIVER_CACHE_FILE) as f:
+            return json.load(f).get('driver_path', '')
+    except (OSError, ValueError):
+        return ''
+
+
+def resolve_driver_path(profile:BrowserProfile) -> str:
+    """chromedriver path to use, or '' to let Selenium locate the driver itself"""
+    if profile.driver_path:
+        return profile.driver_path
+    cached = _read_driver_cache()
+    if cached and os.path.exists(cached):
+        return cached
+    if not profile.driver_manager:
+        return ''
+    from webdriver_manager.chrome import ChromeDriverManager
+    driver_path = ChromeDriverManager().install()
+    with open(DRIVER_CACHE_FILE, 'w') as f:
+        json.dump({'driver_path': driver_path}, f)
+    return driver_path
+
+
+def apply_blocklist(driver, patterns:list):
+    """Block URL patterns in the current tab through the DevTools protocol"""
+    if not patterns:
+        return
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+class NetworkStats:
+    """Request and byte counts read from Chrome's performance log"""
+
+    def __init__(self):
+        self.enabled = False
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = {}
+
+    def collect(self, driver):
+        """Drain the performance log, call regularly so the log buffer stays small"""
+        if not self.enabled:
+            return
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            params = message.get('params', {})
+            if message.get('method') == 'Network.loadingFinished':
+                self.requests += 1
+                self.bytes += int(params.get('encodedDataLength', 0))
+            elif message.get('method') == 'Network.loadingFailed' and params.get('blockedReason'):
+                resource_type = params.get('type', 'Other')
+                self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked.values())
+
+    @property
+    def estimated_bytes_saved(self) -> int:
+        return sum(ESTIMATED_BYTES.get(kind, DEFAULT_ESTIMATED_BYTES) * count for kind, count in self.blocked.items())
+
+    def summary(self) -> str:
+        return (f"{self.blocked_requests} requests blocked (an estimated {self.estimated_bytes_saved / 1e6:.1f} MB saved), "
+                f"{self.bytes / 1e6:.1f} MB transferred over {self.requests} requests (measured)")
@@ -0,0 +1,253 @@
+"""Page-level extraction of LinkedIn search result cards.
+
+Reading the name, profile link and action button of every result card with
+individual WebDriver commands costs a dozen round-trips per invite. The
+functions here collect the whole results page with a single execute_script
+call and hand back plain card records that the invite loop can work from.
+"""
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from ledger import canonical_profile_key
+
+# Labels of the action button on a search result card
+CONNECT = "Connect"
+MESSAGE = "Message"
+PENDING = "Pending"
+FOLLOW = "Follow"
+BUTTON_KINDS = (CONNECT, MESSAGE, PENDING, FOLLOW)
+
+# Result card containers, most specific first
+CONTAINER_SELECTORS = [
+    '[data-chameleon-result-urn]',
+    'li.reusable-search__result-container',
+    'div.entity-result',
+]
+
+# Profile link inside a result card
+LINK_SELECTORS = [
+    'span.entity-result__title-text a',
+    '.entity-result__title-line a',
+    'a.app-aware-link[href*="/in/"]',
+    'a[href*="/in/"]',
+]
+
+_BUTTON_KIND_JS = r"""
+const KINDS = ['Connect', 'Message', 'Pending', 'Follow'];
+function buttonKind(btn) {
+    const text = (btn.innerText || '').trim();
+    const label = btn.getAttribute('aria-label') || '';
+    for (const kind of KINDS) {
+        if (text === kind) return kind;
+    }
+    if (label.startsWith('Invite') || label.includes('connect')) return 'Connect';
+    for (const kind of KINDS) {
+        if (label.startsWith(kind)) return kind;
+    }
+    return null;
+}
+"""
+
+# Finds a card's action button by its handle. When a re-render replaced the
+# tagged element, the button of the same kind is looked up again inside the
+# result with the card's profile URN (or profile link) and tagged anew.
+# ref is the {handle, urn, url, kind} object built by Card.ref().
+FIND_BUTTON_JS = _BUTTON_KIND_JS + r"""
+function findButton(ref) {
+    const tagged = document.querySelector('[data-lac-id="' + CSS.escape(ref.handle) + '"]');
+    if (tagged && tagged.isConnected) return tagged;
+    let result = null;
+    if (ref.urn) {
+        const holder = document.querySelector('[data-chameleon-result-urn="' + CSS.escape(ref.urn) + '"]');
+        result = holder ? (holder.closest('li') || holder) : null;
+    }
+    if (!result && ref.url) {
+        const link = Array.from(document.querySelectorAll('a[href*="/in/"]')).find(a => a.href.split('?')[0] === ref.url);
+        result = link ? (link.closest('[data-chameleon-result-urn], li') || null) : null;
+    }
+    if (!result) return null;
+    const btn = Array.from(result.querySelectorAll('button')).find(b => buttonKind(b) === ref.kind) || null;
+    if (btn) btn.setAttribute('data-lac-id', ref.handle);
+    return btn;
+}
+"""
+
+RELOCATE_BUTTON_JS = FIND_BUTTON_JS + r"""
+return findButton(arguments[0]);
+"""
+
+# Shared helpers for the extraction scripts. Every action button gets a
+# data-lac-id attribute derived from its card's profile URN, so it can be
+# found again with a CSS selector and re-found inside the same card.
+# The container and link selector lists are passed in as the last two
+# script arguments so their order can be learned between runs.
+_CARD_HELPERS_JS = r"""
+const CONTAINER_SELECTORS = arguments[arguments.length - 2];
+const LINK_SELECTORS = arguments[arguments.length - 1];
+""" + _BUTTON_KIND_JS + r"""
+function findContainer(el) {
+    for (const sel of CONTAINER_SELECTORS) {
+        const found = el.closest(sel);
+        if (found) return found;
+    }
+    return el.closest('li');
+}
+
+function describe(container, btn, idx) {
+    let link = null;
+    let linkSelector = null;
+    for (const sel of LINK_SELECTORS) {
+        link = container ? container.querySelector(sel) : null;
+        if (link) { linkSelector = sel; break; }
+    }
+    let name = '';
+    if (link) {
+        const hidden = link.querySelector('span[aria-hidden="true"]');
+        name = ((hidden || link).innerText || '').split('\n')[0].trim();
+    }
+    let urn = '';
+    if (container) {
+        const holder = container.closest('[data-chameleon-result-urn]') ||
+            container.querySelector('[data-chameleon-result-urn]');
+        urn = holder ? holder.getAttribute('data-chameleon-result-urn') : '';
+    }
+    const url = link ? link.href.split('?')[0] : '';
+    // Tied to the profile rather than the card's position, so re-extracting can't point it at another card
+    const handle = 'lac-' + (urn || url || idx);
+    if (btn) btn.setAttribute('data-lac-id', handle);
+    const subtitle = sel => {
+        const el = container ? container.querySelector(sel) : null;
+        return el ? (el.innerText || '').trim() : '';
+    };
+    const badge = subtitle('.entity-result__badge-text span[aria-hidden="true"], .entity-result__badge-text');
+    const degree = (badge.match(/\d+(st|nd|rd|th)\+?/) || [''])[0];
+    return {
+        name: name,
+        url: url,
+        urn: urn || '',
+        kind: btn ? buttonKind(btn) : null,
+        handle: btn ? handle : '',
+        button: btn,
+        link_selector: linkSelector,
+        headline: subtitle('.entity-result__primary-subtitle'),
+        location: subtitle('.entity-result__secondary-subtitle'),
+        degree: degree
+    };
+}
+"""
+
+EXTRACT_CARDS_JS = _CARD_HELPERS_JS + r"""
+let containers = [];
+let containerSelector = null;
+for (const sel of CONTAINER_SELECTORS) {
+    containers = Array.from(document.querySelectorAll(sel));
+    if (containers.length) { containerSelector = sel; break; }
+}
+// Nested matches (a urn holder inside a result container) would be counted twice
+containers = containers.filter(c => !containers.some(o => o !== c && o.contains(c)));
+return {
+    container_selector: containerSelector,
+    cards: containers.map((container, idx) => {
+        const buttons = Array.from(container.querySelectorAll('button'));
+        const btn = buttons.find(b => buttonKind(b) !== null) || null;
+        return describe(container, btn, idx);
+    })
+};
+"""
+
+CARDS_FROM_BUTTONS_JS = _CARD_HELPERS_JS + r"""
+return arguments[0].map((btn, idx) => describe(findContainer(btn), btn, 'b' + idx));
+"""
+
+@dataclass
+class Card:
+    """A single search result card"""
+    name: str
+    profile_url: str
+    urn: str
+    kind: Optional[str]
+    handle: str
+    button: Any = None
+    headline: str = ""
+    location: str = ""
+    degree: str = ""
+
+    @property
+    def first_name(self) -> str:
+        """First name used to fill the {name} placeholder in templates"""
+        parts = self.name.split()
+        return parts[0].title() if parts else ""
+
+    @property
+    def key(self) -> str:
+        """Ledger key of the profile behind this card"""
+        return canonical_profile_key(self.profile_url, self.urn)
+
+    def ref(self) -> dict:
+        """What the page scripts need to find this card's button again"""
+        return {"handle": self.handle, "urn": self.urn, "url": self.profile_url, "kind": self.kind}
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Card":
+        return cls(
+            name=record.get("name") or "",
+            profile_url=record.get("url") or "",
+            urn=record.get("urn") or "",
+            kind=record.get("kind"),
+            handle=record.get("handle") or "",
+            button=record.get("button"),
+            headline=record.get("headline") or "",
+            location=record.get("location") or "",
+            degree=record.get("degree") or "",
+        )
+
+
+def _record_link_selectors(registry, records: list, tried: list) -> None:
+    """Count which profile link selector resolved the cards of a page"""
+    used = {r.get("link_selector") for r in records}
+    for selector in tried:
+        if selector in used:
+            registry.record("profile_link", selector, hit=True)
+            break
+        # Tried on every card before the first selector that matched
+        registry.record("profile_link", selector, hit=False)
+
+
+def extract_cards(driver, registry=None) -> List[Card]:
+    """Return every result card on the current page using one script call"""
+    containers = registry.ordered("card_container", CONTAINER_SELECTORS) if registry else CONTAINER_SELECTORS
+    links = registry.ordered("profile_link", LINK_SELECTORS) if registry else LINK_SELECTORS
+    result = driver.execute_script(EXTRACT_CARDS_JS, containers, links) or {}
+    records = result.get("cards") or []
+    if registry:
+        matched = result.get("container_selector")
+        if matched:
+            for selector in containers:
+                registry.record("card_container", selector, hit=selector == matched)
+                if selector == matched:
+                    break
+        if records:
+            _record_link_selectors(registry, records, links)
+    return [Card.from_record(r) for r in records]
+
+
+def relocate_button(driver, card: Card):
+    """Find the card's button again after a re-render, scoped to the card's profile; sets and returns it or None"""
+    card.button = driver.execute_script(RELOCATE_BUTTON_JS, card.ref()) or None
+    return card.button
+
+
+def cards_from_buttons(driver, buttons: list, kind: str, registry=None) -> List[Card]:
+    """Build card records for buttons found by an XPath cascade in one script call"""
+    if not buttons:
+        return []
+    containers = registry.ordered("card_container", CONTAINER_SELECTORS) if registry else CONTAINER_SELECTORS
+    links = registry.ordered("profile_link", LINK_SELECTORS) if registry else LINK_SELECTORS
+    records = driver.execute_script(CARDS_FROM_BUTTONS_JS, list(buttons), containers, links) or []
+    if registry and records:
+        _record_link_selectors(registry, records, links)
+    cards = [Card.from_record(r) for r in records]
+    for card in cards:
+        # The cascade already decided what these buttons are
+        card.kind = kind
+    return cards
@@ -0,0 +1,45 @@
+"""Crash-safe campaign checkpoints.
+
+The invite loop periodically writes where it is (search URL, current page
+URL, page number, index within the page and counts) to a small JSON file.
+Writes go to a temporary file that is fsynced and renamed over the old
+checkpoint, so a crash never leaves a half written file behind. A resumed
+run navigates straight to the saved page URL.
+"""
+import json
+import os
+import time
+
+DEFAULT_CHECKPOINT_FILE = '.checkpoint.json'
+
+
+class CampaignCheckpoint:
+    """Atomic JSON checkpoint of a running campaign"""
+
+    def __init__(self, path:str=DEFAULT_CHECKPOINT_FILE):
+        self.path = path
+
+    def load(self):
+        """Return the saved state, or None when there is no usable checkpoint"""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state if isinstance(state, dict) and state.get('page_url') else None
+
+    def save(self, **state):
+        state['updated_at'] = time.time()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Remove the checkpoint once the campaign has finished"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,177 @@
+"""Command line entry point.
+
+    python cli.py run [--resume] [--capture [DIR]] [--count-commands]
+    python cli.py harvest [--output FILE] [--pages N]
+    python cli.py validate        (or: python cli.py plan)
+    python cli.py session [--base-url URL]
+
+Only `run` imports Selenium and the browser code. `validate` parses
+input_config.ini, builds the exact search URL, renders the note or message
+and reports configuration problems without starting Chrome. `session`
+checks the saved LinkedIn session cookie with one HTTP request.
+"""
+import argparse
+import os
+import sys
+import time
+import traceback
+from configparser import ConfigParser
+
+from colorama import Fore, init
+
+# Shown when rendering the note or message template
+SAMPLE_FIRST_NAME = 'Alex'
+
+
+def run_in_chrome(**options) -> int:
+    """Call main.main() with the given options, reporting crashes"""
+    import main
+    try:
+        print(Fore.CYAN + "LinkedIn Auto Connector")
+        print(Fore.CYAN + "=====================")
+        main.main(**options)
+    except KeyboardInterrupt:
+        print(Fore.YELLOW + "\n[INFO] Script terminated by user.")
+    except Exception as e:
+        print(Fore.RED + f"[ERROR] Unhandled exception: {e}")
+        traceback.print_exc()
+        return 1
+    finally:
+        print(Fore.GREEN + "[INFO] Script execution completed.")
+    return 0
+
+
+def run(args) -> int:
+    """Run a campaign in Chrome"""
+    return run_in_chrome(resume=args.resume, capture_dir=args.capture, count_commands=args.count_commands)
+
+
+def harvest(args) -> int:
+    """Walk the campaign searches read-only and stream their cards to a file"""
+    return run_in_chrome(harvest_path=args.output, harvest_pages=args.pages, count_commands=args.count_commands)
+
+
+def validate(args) -> int:
+    """Check the config and print the campaign plan, returns 1 when it has errors"""
+    from settings import (INPUT_CONFIG_FILE, SETUP_CONFIG_FILE, ERROR, WARNING, config_problems, load_campaigns,
+                          render_template, total_budget)
+    from locations import GeoUrnCache
+    from session import SessionStore
+    from scheduler import ActionScheduler
+    from checkpoint import CampaignCheckpoint
+
+    init(autoreset=True)
+    start = time.perf_counter()
+    if not os.path.exists(INPUT_CONFIG_FILE):
+        print(Fore.RED + f"[ERROR] {INPUT_CONFIG_FILE} not found, run `python cli.py run` once to create it")
+        return 1
+    input_config = ConfigParser()
+    input_config.read(INPUT_CONFIG_FILE)
+    campaigns = load_campaigns(input_config, GeoUrnCache().load())
+    problems = config_problems(input_config)
+
+    setup_config = ConfigParser()
+    setup_config.read(SETUP_CONFIG_FILE)
+    has_credentials = all(setup_config.get('LinkedIn', option, fallback='').strip('# ')
+                          for option in ('email', 'password'))
+    if not SessionStore.from_config(input_config, setup_config).load().cookie:
+        if has_credentials:
+            problems.append((WARNING, f"li_at cookie is not set, the login will use the {SETUP_CONFIG_FILE} credentials"))
+        else:
+            problems.append((ERROR, f"Neither an li_at cookie nor {SETUP_CONFIG_FILE} credentials are set"))
+
+    scheduler = ActionScheduler.from_config(input_config).load()
+    resume_state = CampaignCheckpoint().load()
+    for settings in campaigns:
+        print(Fore.CYAN + f"[-] Campaign '{settings.campaign}': up to {settings.limit} {settings.action}s "
+                          f"to {settings.connection_degree} connections")
+        print(Fore.MAGENTA + f"[+] Search URL: {settings.search()}")
+        if settings.location:
+            source = f"geoUrn {settings.location_code}" if settings.location_code else "filter UI"
+            print(Fore.MAGENTA + f"[+] Location: {settings.location} ({source})")
+        print(Fore.MAGENTA + f"[+] Pagination: {settings.pagination}")
+        if settings.template:
+            rendered = render_template(settings.template, SAMPLE_FIRST_NAME)
+            print(Fore.MAGENTA + f"[+] {'Message' if settings.message_letter else 'Note'} ({len(rendered)} characters): {rendered}")
+        else:
+            print(Fore.MAGENTA + "[+] Invitations without a note")
+        if resume_state and resume_state.get('campaign') == settings.campaign \
+                and resume_state.get('search_url') == str(settings.search()):
+            print(Fore.MAGENTA + f"[+] --resume continues at page {resume_state['page_num']} "
+                                 f"with {resume_state['connections_sent']} sent")
+        problems.extend((level, f"[{settings.section}] {text}") for level, text in settings.problems(input_config))
+
+    for action in sorted({settings.action for settings in campaigns}):
+        remaining = scheduler.remaining(action)
+        print(Fore.CYAN + f"[-] Schedule: {remaining['hourly']} {action}s left this hour, {remaining['daily']} today")
+    if len(campaigns) > 1:
+        print(Fore.CYAN + f"[-] Session budget: {total_budget(input_config, campaigns)} over {len(campaigns)} campaigns")
+
+    for level, text in problems:
+        print((Fore.RED + "[ERROR] " if level == ERROR else Fore.YELLOW + "[WARNING] ") + text)
+    errors = sum(1 for level, _ in problems if level == ERROR)
+    color = Fore.RED if errors else Fore.GREEN
+    print(color + f"[INFO] {errors} errors, {len(problems) - errors} warnings "
+                  f"(checked in {(time.perf_counter() - start) * 1000:.0f} ms)")
+    return 1 if errors else 0
+
+
+def session(args) -> int:
+    """Check the session cookie over HTTP without Chrome, returns 1 unless it is valid"""
+    from settings import INPUT_CONFIG_FILE, SETUP_CONFIG_FILE
+    from session import SessionStore, check_session, VALID, UNKNOWN, LINKEDIN_URL
+
+    init(autoreset=True)
+    input_config = ConfigParser()
+    input_config.read(INPUT_CONFIG_FILE)
+    setup_config = ConfigParser()
+    setup_config.read(SETUP_CONFIG_FILE)
+    store = SessionStore.from_config(input_config, setup_config).load()
+    base_url = args.base_url or input_config.get('Session', 'base_url', fallback=LINKEDIN_URL)
+    start = time.perf_counter()
+    status, detail = check_session(store.cookie, base_url, input_config.getfloat('Session', 'timeout', fallback=10))
+    store.record(status, detail)
+    color = Fore.GREEN if status == VALID else Fore.YELLOW if status == UNKNOWN else Fore.RED
+    print(color + f"[INFO] Session {status}: {detail} (checked in {(time.perf_counter() - start) * 1000:.0f} ms)")
+    return 0 if status == VALID else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="LinkedIn Auto Connector")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the campaign in Chrome")
+    run_parser.add_argument("--resume", action="store_true", help="continue the last interrupted campaign from its saved page")
+    run_parser.add_argument("--capture", nargs="?", const="", metavar="DIR",
+                            help="save the DOM of every page state as replay fixtures (default: next fixtures/vN)")
+    run_parser.add_argument("--count-commands", action="store_true",
+                            help="count and time every WebDriver command by type and call site")
+    run_parser.set_defaults(handler=run)
+
+    harvest_parser = subparsers.add_parser("harvest", help="list the search results to CSV/JSONL without sending anything")
+    harvest_parser.add_argument("--output", default="harvest.csv", metavar="FILE",
+                                help="output file, JSON lines when it ends in .jsonl (default: harvest.csv)")
+    harvest_parser.add_argument("--pages", type=int, default=0, metavar="N",
+                                help="stop each campaign after N result pages (default: all)")
+    harvest_parser.add_argument("--count-commands", action="store_true",
+                                help="count and time every WebDriver command by type and call site")
+    harvest_parser.set_defaults(handler=harvest)
+
+    validate_parser = subparsers.add_parser("validate", aliases=["plan"],
+                                            help="check input_config.ini and show the search URL and messages, without Chrome")
+    validate_parser.set_defaults(handler=validate)
+
+    session_parser = subparsers.add_parser("session", help="check the LinkedIn session cookie over HTTP, without Chrome")
+    session_parser.add_argument("--base-url", default="", metavar="URL",
+                                help="site to check against, e.g. a local simulator (default: [Session] base_url)")
+    session_parser.set_defaults(handler=session)
+    return parser
+
+
+def main(argv:list=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""WebDriver command accounting.
+
+Every Selenium call (find_element, is_displayed, get_attribute, .text,
+each WebDriverWait poll, ...) is one HTTP round-trip to chromedriver and
+goes through driver.execute. CommandAccounting wraps that method on a
+driver instance and counts and times each command by type and by the line
+of this project's code that issued it, so round-trips per invite can be
+tracked as a hard number.
+"""
+import os
+import sys
+import time
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+_WAIT_MODULE = os.path.join('selenium', 'webdriver', 'support', 'wait.py')
+
+# A call site is flagged when this many of its round-trips are WebDriverWait polls
+POLLING_FLAG_THRESHOLD = 10
+
+
+class CommandAccounting:
+    """Counts and times the WebDriver commands of one driver"""
+
+    def __init__(self):
+        self.total = 0
+        self.seconds = 0.0
+        self.by_command = {}
+        self.by_site = {}
+        self.driver = None
+        self._execute = None
+
+    def install(self, driver):
+        """Start counting commands sent through driver"""
+        self.driver = driver
+        self._execute = driver.execute
+        driver.execute = self.execute
+        return self
+
+    def uninstall(self):
+        if self.driver is not None:
+            del self.driver.execute
+            self.driver = None
+
+    def execute(self, driver_command, params=None):
+        start = time.monotonic()
+        try:
+            return self._execute(driver_command, params)
+        finally:
+            self.record(driver_command, time.monotonic() - start)
+
+    def record(self, command:str, seconds:float):
+        site, polled = self.call_site()
+        self.total += 1
+        self.seconds += seconds
+        stats = self.by_command.setdefault(command, [0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        stats = self.by_site.setdefault(site, {'commands': 0, 'seconds': 0.0, 'polls': 0})
+        stats['commands'] += 1
+        stats['seconds'] += seconds
+        if polled:
+            stats['polls'] += 1
+
+    @staticmethod
+    def call_site():
+        """First frame in this project's code, and whether a WebDriverWait is polling"""
+        frame = sys._getframe(3)
+        polled = False
+        while frame:
+            filename = frame.f_code.co_filename
+            if filename.endswith(_WAIT_MODULE):
+                polled = True
+            elif filename.startswith(_PROJECT_DIR) and filename != __file__:
+                return f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}", polled
+            frame = frame.f_back
+        return 'selenium', polled
+
+    def per(self, count:int) -> float:
+        return self.total / count if count else 0.0
+
+    def polling_sites(self) -> list:
+        """Call sites where WebDriverWait polling piles up round-trips"""
+        flagged = []
+        for site, stats in self.by_site.items():
+            if stats['polls'] >= POLLING_FLAG_THRESHOLD and stats['polls'] / stats['commands'] > 0.5:
+                flagged.append((site, stats))
+        return sorted(flagged, key=lambda item: -item[1]['polls'])
+
+    def report(self, invites:int, pages:int, top:int=10) -> list:
+        """Human readable summary lines"""
+        lines = [
+            f"{self.total} WebDriver commands in {self.seconds:.1f}s, "
+            f"{self.per(invites):.1f} per invite, {self.per(pages):.1f} per page"
+        ]
+        lines.append("Top commands:")
+        for command, (count, seconds) in sorted(self.by_command.items(), key=lambda item: -item[1][0])[:top]:
+            lines.append(f"  {count:6d}  {seconds:7.2f}s  {command}")
+        lines.append("Top call sites:")
+        for site, stats in sorted(self.by_site.items(), key=lambda item: -item[1]['commands'])[:top]:
+            lines.append(f"  {stats['commands']:6d}  {stats['seconds']:7.2f}s  {site}")
+        for site, stats in self.polling_sites():
+            lines.append(f"  [POLLING] {site}: {stats['polls']} of {stats['commands']} round-trips are wait polls")
+        return lines
@@ -0,0 +1,333 @@
+"""Record and replay LinkedIn page fixtures for offline testing.
+
+Capture mode (python main.py --capture) saves the DOM of every page state
+the invite loop interacts with into a versioned directory such as
+fixtures/v3. Replay mode serves those fixtures from a local HTTP server,
+with a small script standing in for LinkedIn's own JavaScript, so the real
+send_connection_request flow can be timed in headless Chrome without
+touching the live site. Check mode reports which of the script's selectors
+still match the captured layouts.
+
+Usage:
+    python fixtures.py replay fixtures/v1 --limit 10
+    python fixtures.py check fixtures/v1
+    python fixtures.py serve fixtures/v1
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+FIXTURE_ROOT = 'fixtures'
+FORMAT_VERSION = 1
+
+# Page states captured by the recorder, with the script that returns their HTML
+STATE_SCRIPTS = {
+    'search_results': "return document.documentElement.outerHTML;",
+    'pagination': "const el = document.querySelector('.artdeco-pagination'); return el ? el.outerHTML : null;",
+    'connect_modal': "const el = document.querySelector('div[role=\"dialog\"], .artdeco-modal'); return el ? el.outerHTML : null;",
+    'note_modal': "const el = document.querySelector('div[role=\"dialog\"], .artdeco-modal'); return el ? el.outerHTML : null;",
+    'invite_limit': """
+        const h2 = Array.from(document.querySelectorAll('h2')).find(h => h.innerText.trim() === 'No free personalized invitations left');
+        if (!h2) return null;
+        return (h2.closest('div[role="dialog"], .artdeco-modal') || h2).outerHTML;
+    """,
+    'got_it': """
+        const btn = document.querySelector('button[aria-label="Got it"]');
+        if (!btn) return null;
+        return (btn.closest('div[role="dialog"], .artdeco-modal, [role="alert"]') || btn.parentElement).outerHTML;
+    """,
+    'messaging_overlay': """
+        const el = document.querySelector('.msg-overlay-conversation-bubble, aside.msg-overlay-container');
+        return el ? el.outerHTML : null;
+    """,
+}
+
+_SHIM_JS = r"""
+(function () {
+    const config = window.__replayConfig || {};
+    let sent = 0;
+    let actedButton = null;
+
+    function fragment(state) {
+        return fetch('/__replay__/fragment/' + state).then(r => r.ok ? r.text() : '');
+    }
+    function show(html) {
+        if (!html) return;
+        const holder = document.createElement('div');
+        holder.setAttribute('data-replay-overlay', '1');
+        holder.innerHTML = html;
+        document.body.appendChild(holder);
+    }
+    function closeOverlays() {
+        document.querySelectorAll('[data-replay-overlay]').forEach(el => el.remove());
+    }
+    function goToPage(page) {
+        const params = new URLSearchParams(location.search);
+        params.set('page', page);
+        location.search = params.toString();
+    }
+    function currentPage() {
+        return parseInt(new URLSearchParams(location.search).get('page') || '1', 10);
+    }
+
+    document.addEventListener('click', function (event) {
+        const btn = event.target.closest('button');
+        if (!btn) return;
+        const text = (btn.innerText || '').trim();
+        const label = btn.getAttribute('aria-label') || '';
+        event.preventDefault();
+
+        if (btn.closest('[data-replay-overlay]')) {
+            if (label === 'Add a note') {
+                closeOverlays();
+                fragment('note_modal').then(show);
+            } else if (label === 'Send invitation' || label === 'Send without a note') {
+                sent += 1;
+                closeOverlays();
+                if (actedButton) {
+                    actedButton.innerText = 'Pending';
+                    actedButton.disabled = true;
+                }
+            } else if (text !== 'Send') {
+                closeOverlays();
+            }
+            return;
+        }
+        if (text === 'Connect' || label.startsWith('Invite')) {
+            actedButton = btn;
+            const limited = config.inviteLimit && sent >= config.inviteLimit;
+            fragment(limited ? 'invite_limit' : 'connect_modal').then(show);
+        } else if (text === 'Message' || label.startsWith('Message')) {
+            actedButton = btn;
+            fragment('messaging_overlay').then(show);
+        } else if (label.includes('Next') || text === 'Next') {
+            goToPage(currentPage() + 1);
+        } else if (btn.closest('.artdeco-pagination') && /^\d+$/.test(text)) {
+            goToPage(parseInt(text, 10));
+        }
+    }, true);
+})();
+"""
+
+_EMPTY_RESULTS_HTML = """<!DOCTYPE html><html><head><title>No results</title></head>
+<body><div id="global-nav-typeahead"></div><main><h2>No results found</h2></main></body></html>"""
+
+
+def new_fixture_dir(root:str=FIXTURE_ROOT) -> str:
+    """Return the next unused versioned directory (v1, v2, ...) under root"""
+    versions = [int(name[1:]) for name in os.listdir(root) if re.fullmatch(r'v\d+', name)] if os.path.isdir(root) else []
+    return os.path.join(root, f"v{max(versions, default=0) + 1}")
+
+
+def fixture_name(state:str, page_num=None) -> str:
+    return f"{state}-p{page_num}.html" if page_num is not None else f"{state}.html"
+
+
+class FixtureRecorder:
+    """Save the DOM of each interacted page state, once per state and page"""
+
+    def __init__(self, directory:str):
+        self.directory = directory
+        self.manifest = {'format': FORMAT_VERSION, 'created_at': time.time(), 'fixtures': {}}
+        os.makedirs(directory, exist_ok=True)
+
+    def capture(self, driver, state:str, page_num=None):
+        name = fixture_name(state, page_num)
+        if name in self.manifest['fixtures']:
+            return
+        try:
+            html = driver.execute_script(STATE_SCRIPTS[state])
+        except Exception:
+            return
+        if not html:
+            return
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+        self.manifest['fixtures'][name] = {
+            'state': state, 'page': page_num, 'url': driver.current_url, 'captured_at': time.time()
+        }
+        with open(os.path.join(self.directory, 'manifest.json'), 'w') as f:
+            json.dump(self.manifest, f, indent=1)
+
+
+def load_manifest(directory:str) -> dict:
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def sanitize(html:str) -> str:
+    """Drop LinkedIn's scripts, stylesheets and remote media so pages load offline"""
+    html = re.sub(r'<script\b.*?</script>', '', html, flags=re.S | re.I)
+    html = re.sub(r'<link\b[^>]*>', '', html, flags=re.I)
+    html = re.sub(r'<iframe\b.*?</iframe>', '', html, flags=re.S | re.I)
+    return re.sub(r'\s(src|srcset)="https?://[^"]*"', '', html, flags=re.I)
+
+
+def make_handler(directory:str, invite_limit:int=0):
+    """Request handler class serving the fixtures in directory"""
+    config_js = f"window.__replayConfig = {json.dumps({'inviteLimit': invite_limit})};"
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, body:str, content_type:str='text/html', status:int=200):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type + '; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def read_fixture(self, name:str):
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding='utf-8') as f:
+                return sanitize(f.read())
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/__replay__/shim.js':
+                return self.send_body(config_js + _SHIM_JS, 'application/javascript')
+            if url.path.startswith('/__replay__/fragment/'):
+                fragment = self.read_fixture(fixture_name(url.path.rsplit('/', 1)[1]))
+                return self.send_body(fragment or '', status=200 if fragment else 404)
+            if url.path.startswith('/__replay__/view/'):
+                fragment = self.read_fixture(fixture_name(url.path.rsplit('/', 1)[1])) or ''
+                return self.send_body(f"<!DOCTYPE html><html><body>{fragment}</body></html>")
+            if url.path.startswith('/search/results/people'):
+                page = int(parse_qs(url.query).get('page', ['1'])[0])
+                html = self.read_fixture(fixture_name('search_results', page)) or _EMPTY_RESULTS_HTML
+                shim = '<script src="/__replay__/shim.js"></script>'
+                html = html.replace('</body>', shim + '</body>') if '</body>' in html else html + shim
+                return self.send_body(html)
+            self.send_body('', status=404)
+
+    return ReplayHandler
+
+
+def start_server(directory:str, invite_limit:int=0, port:int=0):
+    """Serve the fixtures on a background thread, returns the server"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(directory, invite_limit))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_url(server, page:int=1) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/search/results/people/?keywords=replay&origin=FACETED_SEARCH&page={page}"
+
+
+def replay_driver():
+    """Headless Chrome for replay runs"""
+    from main import setup_driver
+    from browser import BrowserProfile
+    return setup_driver(BrowserProfile(headless=True, window_size='1366,900'))
+
+
+def replay(directory:str, limit:int, include_notes:bool, message_letter:str, invite_limit:int):
+    """Run send_connection_request against the fixtures and time it"""
+    import main
+    import waits
+    from waits import PacingPolicy
+
+    server = start_server(directory, invite_limit)
+    driver = replay_driver()
+    try:
+        driver.get(server_url(server))
+        start = time.monotonic()
+        main.send_connection_request(driver=driver, limit=limit, letter="Hi {name}, replay run.",
+                                     include_notes=include_notes, message_letter=message_letter,
+                                     pacing=PacingPolicy(action_delay=0))
+        elapsed = time.monotonic() - start
+        print(f"[REPLAY] send_connection_request finished in {elapsed:.2f}s")
+        for step, stats in waits.summary().items():
+            print(f"[REPLAY] wait '{step}': {stats['count']}x, avg {stats['avg']:.2f}s, max {stats['max']:.2f}s")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+def check(directory:str) -> bool:
+    """Report which selectors still match the captured layouts, False if any state has no match"""
+    import main
+    from cards import extract_cards
+    from selenium.webdriver.common.by import By
+
+    state_xpaths = {
+        'pagination': [main.PAGINATION_XPATH] + main.NEXT_BUTTON_XPATHS,
+        'connect_modal': [main.SEND_WITHOUT_NOTE_XPATH, main.ADD_NOTE_XPATH],
+        'note_modal': [main.NOTE_TEXTAREA_XPATH, main.SEND_INVITATION_XPATH],
+        'invite_limit': [main.INVITE_LIMIT_XPATH],
+        'got_it': [main.GOT_IT_XPATH],
+        'messaging_overlay': [main.MESSAGE_BOX_XPATH, main.MESSAGE_SEND_XPATH, main.MESSAGE_CLOSE_XPATH],
+    }
+    manifest = load_manifest(directory)
+    server = start_server(directory)
+    driver = replay_driver()
+    ok = True
+    try:
+        for name, info in sorted(manifest['fixtures'].items()):
+            state = info['state']
+            if state == 'search_results':
+                driver.get(server_url(server, info['page']))
+                cards = extract_cards(driver)
+                kinds = {}
+                for card in cards:
+                    kinds[card.kind] = kinds.get(card.kind, 0) + 1
+                print(f"[CHECK] {name}: {len(cards)} cards {kinds}")
+                xpaths = main.CONNECT_BUTTON_XPATHS + main.MESSAGE_BUTTON_XPATHS
+                ok = ok and bool(cards)
+            else:
+                driver.get(f"http://127.0.0.1:{server.server_address[1]}/__replay__/view/{name[:-len('.html')]}")
+                xpaths = state_xpaths.get(state, [])
+            matched = 0
+            for xpath in xpaths:
+                count = len(driver.find_elements(By.XPATH, xpath))
+                matched += bool(count)
+                print(f"    {'OK  ' if count else 'MISS'} {count:3d}  {xpath}")
+            if xpaths and not matched:
+                ok = False
+    finally:
+        driver.quit()
+        server.shutdown()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured LinkedIn page fixtures offline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = subparsers.add_parser("replay", help="time send_connection_request against the fixtures")
+    replay_parser.add_argument("directory")
+    replay_parser.add_argument("--limit", type=int, default=10)
+    replay_parser.add_argument("--no-notes", action="store_true", help="send invites without a note")
+    replay_parser.add_argument("--message", default="", help="message 1st connections instead of inviting")
+    replay_parser.add_argument("--invite-limit", type=int, default=0, help="show the invitation limit after this many invites")
+
+    check_parser = subparsers.add_parser("check", help="check the selector cascades against the fixtures")
+    check_parser.add_argument("directory")
+
+    serve_parser = subparsers.add_parser("serve", help="serve the fixtures for manual inspection")
+    serve_parser.add_argument("directory")
+    serve_parser.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args()
+    if args.command == "replay":
+        replay(args.directory, args.limit, not args.no_notes, args.message, args.invite_limit)
+    elif args.command == "check":
+        raise SystemExit(0 if check(args.directory) else 1)
+    else:
+        server = start_server(args.directory, port=args.port)
+        print(f"Serving {args.directory} at {server_url(server)}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
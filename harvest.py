@@ -0,0 +1,81 @@
+"""Read-only harvest of search result cards.
+
+Harvest mode walks the same search URL and pagination as a campaign but
+never clicks anything. Every card is written to a CSV or JSONL file as soon
+as its page is read, one compact row at a time, so a long harvest holds no
+more than one page in memory. HarvestWriter also keeps the page rate used
+to size campaigns before running them.
+"""
+import csv
+import json
+import os
+import time
+
+FIELDS = ('campaign', 'page', 'name', 'profile_url', 'headline', 'location', 'degree', 'action')
+
+
+def output_format(path:str) -> str:
+    """'jsonl' for .jsonl/.json files, 'csv' otherwise"""
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.json') else 'csv'
+
+
+class HarvestWriter:
+    """Streams card rows to a CSV or JSONL file and times the pages"""
+
+    def __init__(self, path:str):
+        self.path = path
+        self.format = output_format(path)
+        self.file = None
+        self.csv = None
+        self.rows = 0
+        self.actionable = 0
+        self.pages = 0
+        self.started = time.monotonic()
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'w', newline='', encoding='utf-8')
+        if self.format == 'csv':
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(FIELDS)
+        self.started = time.monotonic()
+        return self
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def write_page(self, campaign:str, page_num:int, cards:list, actionable_kind:str=None):
+        """Write the cards of one results page and flush them to disk"""
+        for card in cards:
+            row = (campaign, page_num, card.name, card.profile_url, card.headline, card.location, card.degree, card.kind or '')
+            if self.csv:
+                self.csv.writerow(row)
+            else:
+                self.file.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n')
+            if actionable_kind and card.kind == actionable_kind:
+                self.actionable += 1
+        self.rows += len(cards)
+        self.pages += 1
+        self.file.flush()
+
+    def pages_per_minute(self) -> float:
+        minutes = (time.monotonic() - self.started) / 60
+        return self.pages / minutes if minutes > 0 else 0.0
+
+    def report(self, limit:int=0) -> list:
+        """Page rate and, for a campaign limit, the pages and time it would need"""
+        seconds_per_page = (time.monotonic() - self.started) / self.pages if self.pages else 0.0
+        lines = [f"{self.rows} cards from {self.pages} pages in {time.monotonic() - self.started:.0f}s: "
+                 f"{self.pages_per_minute():.1f} pages/min, {seconds_per_page:.1f}s per page"]
+        if self.pages:
+            per_page = self.actionable / self.pages
+            lines.append(f"{per_page:.1f} actionable candidates per page ({self.actionable} of {self.rows})")
+            if limit and per_page:
+                pages_needed = limit / per_page
+                lines.append(f"A limit of {limit} needs about {pages_needed:.0f} pages "
+                             f"(~{pages_needed * seconds_per_page / 60:.1f} min of page loads)")
+        return lines
@@ -0,0 +1,109 @@
+"""SQLite ledger of every profile the script has acted on.
+
+Each profile is keyed by its canonical profile URL (or URN when the card has
+no public profile link) and stores the last action, outcome, campaign and
+timestamp. The keys are loaded into memory when the ledger opens, so the
+invite loop can skip people that were already handled without touching the
+browser.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, unquote
+
+DEFAULT_LEDGER_FILE = 'ledger.sqlite3'
+
+# Outcomes written by the invite loop
+SENT = 'sent'
+MESSAGED = 'messaged'
+PENDING = 'pending'
+FAILED = 'failed'
+
+_URN_PATTERN = re.compile(r'urn:li:[A-Za-z_]+:[A-Za-z0-9_-]+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    profile_key TEXT PRIMARY KEY,
+    profile_url TEXT,
+    name TEXT,
+    action TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    campaign TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_campaign ON contacts (campaign);
+"""
+
+
+def canonical_profile_key(profile_url:str='', urn:str='') -> str:
+    """Stable key for a profile: 'in/<slug>' for public profile URLs, otherwise the URN"""
+    if profile_url:
+        parts = [p for p in urlparse(profile_url).path.split('/') if p]
+        if len(parts) >= 2 and parts[0] == 'in':
+            return 'in/' + unquote(parts[1]).lower()
+    if urn:
+        match = _URN_PATTERN.search(urn)
+        return match.group(0) if match else urn
+    return ''
+
+
+class Ledger:
+    """Contact ledger with an in-memory index of handled profiles"""
+
+    def __init__(self, path:str=DEFAULT_LEDGER_FILE, retry_failed:bool=False):
+        self.path = path
+        self.retry_failed = retry_failed
+        self.conn = None
+        self.index = {}
+        # The two-tab mode records Pending profiles from its discovery thread
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, input_config):
+        return cls(
+            path=input_config.get('Ledger', 'path', fallback=DEFAULT_LEDGER_FILE),
+            retry_failed=input_config.getboolean('Ledger', 'retry_failed', fallback=False),
+        )
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.index = dict(self.conn.execute("SELECT profile_key, outcome FROM contacts"))
+        return self
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def seen(self, key:str) -> bool:
+        """True when the profile was already handled and should be skipped"""
+        outcome = self.index.get(key)
+        if outcome is None:
+            return False
+        return not (self.retry_failed and outcome == FAILED)
+
+    def record(self, key:str, action:str, outcome:str, campaign:str='', profile_url:str='', name:str=''):
+        """Insert or update a profile's entry"""
+        if not key:
+            return
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO contacts (profile_key, profile_url, name, action, outcome, campaign, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(profile_key) DO UPDATE SET
+                       profile_url=excluded.profile_url, name=excluded.name, action=excluded.action,
+                       outcome=excluded.outcome, campaign=excluded.campaign, updated_at=excluded.updated_at""",
+                (key, profile_url, name, action, outcome, campaign, time.time()),
+            )
+            self.conn.commit()
+        self.index[key] = outcome
@@ -0,0 +1,70 @@
+"""Location name to LinkedIn geoUrn cache.
+
+LinkedIn filters people search by geoUrn, a numeric id per location. A few
+ids are bundled; every other location is learned from the search URL once
+select_location() has applied it through the filter UI, and saved so that
+later runs put the geoUrn in the search URL directly.
+"""
+import json
+import os
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_CACHE_FILE = '.geo_cache.json'
+
+BUNDLED_GEO_URNS = {
+    'united states': '103644278',
+    'india': '102713980',
+    'canada': '101174742',
+    'united kingdom': '102264111',
+    'australia': '102300403',
+    'germany': '101282230',
+}
+
+
+def normalize(location:str) -> str:
+    return ' '.join(location.lower().split())
+
+
+def geo_urn_from_url(url:str) -> str:
+    """First geoUrn id of a search URL, or '' when it has none"""
+    values = parse_qs(urlparse(url).query).get('geoUrn')
+    if not values:
+        return ''
+    try:
+        ids = json.loads(values[0])
+    except ValueError:
+        return ''
+    return str(ids[0]) if isinstance(ids, list) and ids else ''
+
+
+class GeoUrnCache:
+    """Bundled geoUrns plus the ones learned from previous runs"""
+
+    def __init__(self, path:str=DEFAULT_CACHE_FILE):
+        self.path = path
+        self.learned = {}
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.learned = json.load(f)
+        except (OSError, ValueError):
+            self.learned = {}
+        return self
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.learned, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, location:str) -> str:
+        key = normalize(location)
+        return self.learned.get(key) or BUNDLED_GEO_URNS.get(key, '')
+
+    def learn(self, location:str, geo_urn:str):
+        """Remember the geoUrn a location resolved to and save the cache"""
+        key = normalize(location)
+        if geo_urn and self.learned.get(key) != geo_urn:
+            self.learned[key] = geo_urn
+            self.save()
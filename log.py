@@ -0,0 +1,184 @@
+"""Structured, non-blocking logging for the run.
+
+Every message is a record with a level, an event name and its fields
+(selector, page, card, duration, ...). The calling thread only puts the
+record on a queue; a background listener formats it and writes it to the
+console, colorized per level, and optionally as one JSON line to a file.
+The message is a str.format template over the fields and is only
+rendered by the listener, so debug records that are filtered out cost a
+level check and nothing else.
+
+Stack traces are only collected at debug level and at most once per
+trace_interval for the same event, since most swallowed exceptions in
+the invite loop are expected fallback misses.
+"""
+import atexit
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from colorama import Fore
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+# Between INFO and WARNING, rendered as a green [INFO] line
+SUCCESS = 25
+logging.addLevelName(SUCCESS, 'SUCCESS')
+
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+
+_COLORS = {DEBUG: Fore.WHITE, INFO: Fore.CYAN, SUCCESS: Fore.GREEN, WARNING: Fore.YELLOW, ERROR: Fore.RED}
+
+logger = logging.getLogger('linkedin_auto_connector')
+logger.propagate = False
+logger.setLevel(INFO)
+
+# Seconds between two stack traces of the same event
+trace_interval = 60.0
+_last_trace = {}
+
+
+def message(record:logging.LogRecord) -> str:
+    """The record's message template filled in with its fields"""
+    text = record.getMessage()
+    fields = getattr(record, 'fields', None)
+    if fields:
+        try:
+            return text.format_map(fields)
+        except (KeyError, IndexError, ValueError, TypeError):
+            return text
+    return text
+
+
+class ConsoleRenderer(logging.Formatter):
+    """The classic colored `[LEVEL] message` console lines"""
+
+    def format(self, record:logging.LogRecord) -> str:
+        tag = 'INFO' if record.levelno == SUCCESS else record.levelname
+        line = _COLORS.get(record.levelno, '') + f"[{tag}] {message(record)}"
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class JsonRenderer(logging.Formatter):
+    """One compact JSON object per record"""
+
+    def format(self, record:logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'event': getattr(record, 'event', None),
+            'message': message(record),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['trace'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class PrintHandler(logging.Handler):
+    """Prints to whatever sys.stdout is at emit time, so colorama's wrapper applies"""
+
+    def emit(self, record:logging.LogRecord):
+        try:
+            print(self.format(record), flush=True)
+        except Exception:
+            self.handleError(record)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """Queues the record untouched, rendering is left to the listener thread"""
+
+    def prepare(self, record:logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_queue = queue.Queue(-1)
+_console = PrintHandler()
+_console.setFormatter(ConsoleRenderer())
+_file = None
+_listener = None
+logger.addHandler(_RecordQueueHandler(_queue))
+
+
+def start():
+    """Start the background listener, handlers are fixed until the next start"""
+    global _listener
+    stop()
+    handlers = [_console] + ([_file] if _file else [])
+    _listener = QueueListener(_queue, *handlers, respect_handler_level=False)
+    _listener.start()
+
+
+def stop():
+    """Write out every queued record and stop the listener"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def drain():
+    """Block until every record queued so far is written, e.g. before printing or prompting directly"""
+    if _listener:
+        _queue.join()
+
+
+def configure(input_config):
+    """Apply the [Logging] section: level, JSON lines file and trace interval"""
+    global _file, trace_interval
+    level = input_config.get('Logging', 'level', fallback='INFO').upper()
+    logger.setLevel(LEVELS.get(level, INFO))
+    trace_interval = input_config.getfloat('Logging', 'trace_interval', fallback=60)
+    path = input_config.get('Logging', 'path', fallback='')
+    if _file:
+        _file.close()
+        _file = None
+    if path:
+        _file = logging.FileHandler(path, encoding='utf-8')
+        _file.setFormatter(JsonRenderer())
+    start()
+
+
+def _log(level:int, event:str, text:str, fields:dict, exc_info=None):
+    if logger.isEnabledFor(level):
+        logger.log(level, text, exc_info=exc_info, extra={'event': event, 'fields': fields})
+
+
+def debug(event:str, text:str, **fields):
+    _log(DEBUG, event, text, fields)
+
+
+def info(event:str, text:str, **fields):
+    _log(INFO, event, text, fields)
+
+
+def success(event:str, text:str, **fields):
+    _log(SUCCESS, event, text, fields)
+
+
+def warning(event:str, text:str, **fields):
+    _log(WARNING, event, text, fields)
+
+
+def error(event:str, text:str, **fields):
+    _log(ERROR, event, text, fields)
+
+
+def exception(event:str, text:str, error:BaseException, level:int=WARNING, **fields):
+    """Log a caught exception as `error`, with its stack trace when debugging and not traced recently"""
+    if not logger.isEnabledFor(level):
+        return
+    exc_info = None
+    if logger.isEnabledFor(DEBUG):
+        now = time.monotonic()
+        if now - _last_trace.get(event, float('-inf')) >= trace_interval:
+            _last_trace[event] = now
+            exc_info = (type(error), error, error.__traceback__)
+    _log(level, event, text, dict(fields, error=str(error)), exc_info)
+
+
+start()
+atexit.register(stop)
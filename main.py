@@ -1,64 +1,136 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from configparser import ConfigParser
 from selenium.webdriver.common.action_chains import ActionChains
-from colorama import Fore, Style, init
-import time, requests
-from urllib.parse import quote
+from colorama import init
+import time
 import os
-import traceback
 import sys
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
+from cards import Card, CONNECT, MESSAGE, PENDING, cards_from_buttons
+from ledger import Ledger, SENT, MESSAGED, FAILED, PENDING as PENDING_OUTCOME
+from selector_cache import SelectorRegistry
+import waits
+from waits import PacingPolicy, try_wait_for
+from checkpoint import CampaignCheckpoint
+from pipeline import CandidateQueue
+from fixtures import FixtureRecorder, new_fixture_dir
+from browser import BrowserProfile, NetworkStats, apply_blocklist, resolve_driver_path
+from metrics import Metrics
+from scheduler import ActionScheduler, INVITE, MESSAGE as MESSAGE_ACTION
+from search_url import SearchURL
+from locations import GeoUrnCache, geo_urn_from_url
+from settings import (CampaignSettings, INPUT_CONFIG_FILE, SETUP_CONFIG_FILE, PAGINATION_STRATEGIES, ERROR,
+                      config_problems, load_campaigns, render_template, total_budget)
+from command_stats import CommandAccounting
+from tabs import TabSet, DiscoveryWorker, DISCOVERY, ACTION
+from harvest import HarvestWriter
+from backends import WebDriverBackend, CdpBackend, MODAL_OPEN, MODAL_CLOSED, DETACHED, create_backend
+from memory_watchdog import MemoryWatchdog, RECYCLE_TAB, RESTART_DRIVER
+from session import SessionStore, check_session, VALID, EXPIRED, CHALLENGED, LINKEDIN_URL
+import log
 
 # Initialize colorama
 init(autoreset=True)
 
-# Initialize config parser
+# Login credentials, read when a run starts
 config = ConfigParser()
-config_file = 'setup.ini'
-config.read(config_file)
+config_file = SETUP_CONFIG_FILE
 
 # Add input config file
 input_config = ConfigParser()
-input_config_file = 'input_config.ini'
+input_config_file = INPUT_CONFIG_FILE
 
-def setup_driver():
+# Learned order of the selector cascades, kept between runs
+selector_registry = SelectorRegistry('.selector_cache.json')
+
+# Set by --capture to save the DOM of every page state the script interacts with
+fixture_recorder = None
+
+# Requests and bytes saved by the [Browser] block_preset
+network_stats = NetworkStats()
+
+# Per-phase timing spans of this run, written to the [Metrics] file
+run_metrics = Metrics()
+
+# Runs the hot DOM operations, set up by main() from [Execution] backend
+dom_backend = None
+
+# The li_at cookie, read and saved only here; main() loads it from [Session] path
+session_store = SessionStore()
+
+def dom_for(driver:webdriver.Chrome):
+    """The DOM backend of driver, classic WebDriver unless main() connected another one"""
+    global dom_backend
+    if dom_backend is None or dom_backend.driver is not driver:
+        dom_backend = WebDriverBackend(driver)
+    return dom_backend
+
+def capture_state(driver:webdriver.Chrome, state:str, page_num:int=None):
+    """Save the current page state as a replay fixture when capturing"""
+    if fixture_recorder:
+        fixture_recorder.capture(driver, state, page_num)
+
+def setup_driver(profile:BrowserProfile=None):
+    profile = profile or BrowserProfile()
     try:
         chrome_options = Options()
         chrome_options.add_argument("--log-level=2")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--no-sandbox")
+        # Keep tabs that are not in front rendering at full speed (two-tab mode)
+        chrome_options.add_argument("--disable-background-timer-throttling")
+        chrome_options.add_argument("--disable-renderer-backgrounding")
+        for argument in profile.chrome_arguments():
+            chrome_options.add_argument(argument)
+        blocked_urls = profile.blocked_urls()
+        if blocked_urls:
+            # The performance log is only needed to count what blocking saved
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
         
-        # Uncomment the line below if you're having issues with the driver
-        # service = Service(ChromeDriverManager().install())
-        # driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver = webdriver.Chrome(options=chrome_options)
+        # Set driver_manager = True in [Browser] if you're having issues with the driver,
+        # the path it resolves is cached so later runs don't hit the network
+        driver_path = resolve_driver_path(profile)
+        if driver_path:
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        else:
+            driver = webdriver.Chrome(options=chrome_options)
+        if blocked_urls:
+            apply_blocklist(driver, blocked_urls)
+            network_stats.enabled = True
+            log.info('url_blocking', "Blocking {patterns} URL patterns ({preset} preset)",
+                     patterns=len(blocked_urls), preset=profile.block_preset)
         return driver
     except Exception as e:
-        print(Fore.RED + f"[ERROR] Failed to setup Chrome driver: {e}")
-        traceback.print_exc()
+        log.exception('driver_setup_failed', "Failed to setup Chrome driver: {error}", e, level=log.ERROR)
         sys.exit(1)
 
 def save_cookie(driver:webdriver.Chrome):
-    """Save the cookie to the setup.ini file"""
+    """Save the browser's current li_at cookie to the session store for the next run"""
     try:
-        li_at_cookie = driver.get_cookie('li_at')['value']
-        config.set('LinkedIn', 'li_at', li_at_cookie)
-        with open(config_file, 'w') as f:
-            config.write(f)
+        cookie = driver.get_cookie('li_at')
+        if cookie:
+            session_store.save(cookie['value'])
     except Exception as e:
-        print(Fore.YELLOW + f"[WARNING] Could not save cookie: {e}")
+        log.warning('cookie_save_failed', "Could not save cookie: {error}", error=str(e))
 
-def login_with_cookie(driver:webdriver.Chrome, li_at):
-    """Attempt to login with the existing 'li_at' cookie"""
+def login_with_cookie(driver:webdriver.Chrome, li_at, landing_url:str="https://www.linkedin.com"):
+    """Attempt to login with the existing 'li_at' cookie, leaves the browser on landing_url"""
     try:
-        print(Fore.YELLOW + "Attempting to log in with cookie...")
-        driver.get("https://www.linkedin.com")
+        log.info('login', "Attempting to log in with cookie...")
+        driver.get(landing_url)
+        # A persistent browser profile may still hold a valid (possibly refreshed) session
+        if driver.get_cookie('li_at'):
+            try:
+                waits.wait_for(driver, 'page_load', EC.presence_of_element_located((By.ID, "global-nav-typeahead")), required=False)
+                log.success('login', "Reusing the browser profile's LinkedIn session.", method='profile')
+                return
+            except:
+                pass
         driver.add_cookie(
             {
                 "name": "li_at",
@@ -68,53 +140,109 @@ def login_with_cookie(driver:webdriver.Chrome, li_at):
                 "domain": ".linkedin.com"  # Added domain to fix cookie issues
             }
         )
-        driver.refresh()
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "global-nav-typeahead")))
-        print(Fore.GREEN + "[INFO] Logged in with cookie successfully.")
+        # Logged out visits may have been redirected, so load the landing page again
+        driver.get(landing_url)
+        waits.wait_for(driver, 'page_load', EC.presence_of_element_located((By.ID, "global-nav-typeahead")))
+        log.success('login', "Logged in with cookie successfully.", method='cookie')
     except Exception as e:
-        print(Fore.RED + f"[ERROR] Cookie login failed: {e}")
-        traceback.print_exc()
+        log.exception('cookie_login_failed', "Cookie login failed: {error}", e, level=log.ERROR)
         raise
 
 def login_with_credentials(driver:webdriver.Chrome, email:str, password:str):
     """Login using credentials and handle verification code if required"""
     try:
-        print(Fore.YELLOW + "Logging in with credentials...")
+        log.info('login', "Logging in with credentials...")
         driver.get("https://www.linkedin.com/login")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "username")))
+        waits.wait_for(driver, 'login', EC.presence_of_element_located((By.ID, "username")))
 
         driver.find_element(By.ID, "username").send_keys(email)
         driver.find_element(By.ID, "password").send_keys(password)
         driver.find_element(By.XPATH, "//button[@type='submit']").click()
 
-        WebDriverWait(driver, 10).until(
-            lambda d: d.find_element(By.ID, "global-nav-typeahead") or 
-            "Enter the code" in d.page_source
-        )
+        waits.wait_for(driver, 'login',
+                       lambda d: d.find_element(By.ID, "global-nav-typeahead") or "Enter the code" in d.page_source)
 
         if "Enter the code" in driver.page_source:
+            # The prompt must come after everything logged so far
+            log.drain()
             verification_code = input("[+] Enter the verification code sent to your email: ")
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "input__email_verification_pin")))
+            waits.wait_for(driver, 'login', EC.presence_of_element_located((By.ID, "input__email_verification_pin")))
             driver.find_element(By.ID, "input__email_verification_pin").send_keys(verification_code)
             driver.find_element(By.ID, "email-pin-submit-button").click()
 
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "global-nav-typeahead")))
-        print(Fore.GREEN + "[INFO] Logged in with credentials successfully.")
+        waits.wait_for(driver, 'login', EC.presence_of_element_located((By.ID, "global-nav-typeahead")))
+        log.success('login', "Logged in with credentials successfully.", method='credentials')
         save_cookie(driver)
     except Exception as e:
-        print(Fore.RED + f"[ERROR] Credential login failed: {e}")
-        traceback.print_exc()
+        log.exception('credential_login_failed', "Credential login failed: {error}", e, level=log.ERROR)
         raise
 
+def recycle_browser(driver:webdriver.Chrome, how:str, url:str, profile:BrowserProfile, backend_name:str, li_at:str,
+                    command_accounting:CommandAccounting=None):
+    """Free the memory of the tab (RECYCLE_TAB) or the whole browser (RESTART_DRIVER) and reopen url.
+
+    Returns the driver to continue with, a new one after a restart. The new
+    browser logs in with the cookie, then with the setup.ini credentials;
+    when both fail it is quit and the login error raised.
+    """
+    global dom_backend
+    if how == RECYCLE_TAB:
+        old_handle = driver.current_window_handle
+        driver.switch_to.new_window('tab')
+        new_handle = driver.current_window_handle
+        driver.switch_to.window(old_handle)
+        driver.close()
+        dom_for(driver).detach(old_handle)
+        driver.switch_to.window(new_handle)
+        dom_for(driver).attach(new_handle)
+        # URL blocking is set per tab
+        apply_blocklist(driver, profile.blocked_urls())
+        driver.get(url)
+    else:
+        # LinkedIn refreshes li_at during a session, log the new browser in with the current one
+        cookie = driver.get_cookie('li_at')
+        if network_stats.enabled:
+            network_stats.collect(driver)
+        if command_accounting:
+            command_accounting.uninstall()
+        dom_for(driver).close()
+        driver.quit()
+        driver = setup_driver(profile)
+        try:
+            if command_accounting:
+                command_accounting.install(driver)
+            dom_backend = create_backend(driver, backend_name)
+            try:
+                login_with_cookie(driver, cookie['value'] if cookie else li_at, url)
+            except Exception as e:
+                if not has_credentials():
+                    raise
+                log.warning('login', "Cookie login failed: {error}. Attempting login with credentials.", error=str(e))
+                login_with_credentials(driver, config.get('LinkedIn', 'email'), config.get('LinkedIn', 'password'))
+                driver.get(url)
+        except Exception:
+            # Nothing else holds the new browser, don't leave it and its chromedriver running
+            try:
+                dom_for(driver).close()
+                driver.quit()
+            except Exception as e:
+                log.warning('driver_quit_failed', "Could not quit the restarted browser: {error}", error=str(e))
+            raise
+    try_wait_for(driver, 'page_load', waits.results_or_empty)
+    return driver
+
 def select_location(driver:webdriver.Chrome, location:str):
     """Select the location in the LinkedIn search filter"""
     try:
-        print("Selecting location")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "searchFilter_geoUrn"))).click()
-        time.sleep(1)
-        location_input = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Add a location']")))
+        log.info('select_location', "Selecting location {location}", location=location)
+        waits.wait_for(driver, 'page_load', EC.presence_of_element_located((By.ID, "searchFilter_geoUrn"))).click()
+        location_input = waits.wait_for(driver, 'clickable', EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Add a location']")))
         location_input.send_keys(location)
-        time.sleep(2)
+        # Wait for the typeahead to offer suggestions instead of sleeping
+        try_wait_for(driver, 'typeahead', EC.presence_of_element_located(
+            (By.XPATH, f"//*[text()='{location.title()}'] | //span[contains(@class, 'search-typeahead-v2__hit-info')]")
+        ))
+        results_before = waits.results_signature(driver)
         try:
             driver.find_element(By.XPATH,f"//*[text()='{location.title()}']").click()
             # Close the dropdown suggestions
@@ -126,661 +254,1052 @@ def select_location(driver:webdriver.Chrome, location:str):
                 location_options[0].click()
                 location_input.send_keys(Keys.ESCAPE)
             else:
-                print(Fore.YELLOW + f"[WARNING] Could not select location '{location}'. Continuing without location filter.")
-                driver.find_element(By.XPATH, "//button[@aria-label='Dismiss']").click()
+                log.warning('location_not_found', "Could not select location '{location}'. Continuing without location filter.",
+                            location=location)
+                driver.find_element(By.XPATH, DISMISS_XPATH).click()
                 return
                 
-        time.sleep(1)
         # First fallback: Use the text-based XPath for the 'Show Results' button
         try:
-            show_results_button = WebDriverWait(driver, 10).until(
+            show_results_button = waits.wait_for(driver, 'clickable',
                 EC.element_to_be_clickable((
                     By.XPATH,
                     "//button[(translate(@aria-label,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz')='show results') or span[translate(normalize-space(),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz')='show results']]"
-                ))
+                )), required=False
             )
             driver.execute_script("arguments[0].click();", show_results_button)
-            print("[DEBUG] 'Show Results' button clicked using text-based XPath.")
+            log.debug('show_results', "'Show Results' button clicked using text-based XPath.", selector='xpath')
         except:
             # Second fallback: Press Enter to apply the location filter
-            print("[DEBUG] 'Show Results' button not clickable, pressing Enter.")
+            log.debug('show_results', "'Show Results' button not clickable, pressing Enter.", selector='enter')
             location_input.send_keys(Keys.RETURN)
-            time.sleep(3)
+            if try_wait_for(driver, 'results', waits.results_changed(results_before)):
+                return
             
             # Third fallback: Force-click the first 'Show Results' button
             try:
                 show_results = driver.find_element(By.XPATH,
                     "(//button[span[normalize-space()='Show results']])[1]")
                 driver.execute_script("arguments[0].click();", show_results)
-                print("[DEBUG] 'Show Results' button force-clicked.")
+                log.debug('show_results', "'Show Results' button force-clicked.", selector='force_click')
             except Exception as e:
-                print(Fore.YELLOW + f"[WARNING] Could not force-click 'Show Results' button: {e}")
-        time.sleep(3)
+                log.warning('show_results_failed', "Could not force-click 'Show Results' button: {error}", error=str(e))
+        # The filtered results replace the current list
+        try_wait_for(driver, 'results', waits.results_changed(results_before))
     except Exception as e:
-        print(Fore.YELLOW + f"[WARNING] Error selecting location: {e}")
-        traceback.print_exc()
-        print(Fore.YELLOW + "Continuing without location filter...")
+        log.exception('select_location_failed', "Error selecting location: {error}. Continuing without location filter...", e)
+
+CONNECT_BUTTON_XPATHS = [
+    "//*[text()='Connect']/..",
+    "//button[contains(@aria-label, 'Invite') or contains(@aria-label, 'Connect')]",
+    "//span[text()='Connect']/parent::button",
+    "//span[text()='Connect']/ancestor::button",
+    "//div[contains(@class, 'entity-result__actions')]/div/button[contains(.,'Connect')]",
+    "//button[contains(@class, 'artdeco-button')][contains(.,'Connect')]"
+]
+
+MESSAGE_BUTTON_XPATHS = [
+    "//*[text()='Message']/..",
+    "//button[contains(@aria-label, 'Message')]",
+    "//span[text()='Message']/parent::button",
+    "//span[text()='Message']/ancestor::button",
+    "//div[contains(@class, 'entity-result__actions')]/div/button[contains(.,'Message')]",
+    "//button[contains(@class, 'artdeco-button')][contains(.,'Message')]"
+]
+
+NEXT_BUTTON_XPATHS = [
+    "//button[@aria-label='Next']",
+    "//button[contains(@aria-label, 'Next')]",
+    "//span[text()='Next']/parent::button",
+    "//button[contains(@class, 'artdeco-pagination__button--next')]",
+    "//li[contains(@class, 'artdeco-pagination__button--next')]/button",
+    "//button[contains(., 'Next')]"
+]
+
+# Times a results page is requested before the run stops on it
+PAGE_LOAD_ATTEMPTS = 2
+
+# XPaths of the page states the invite loop interacts with
+INVITE_LIMIT_XPATH = "//h2[text()='No free personalized invitations left']"
+PAGINATION_XPATH = "//ul[contains(@class, 'artdeco-pagination__pages')]"
+GOT_IT_XPATH = "//button[@aria-label='Got it']"
+SEND_WITHOUT_NOTE_XPATH = '//button[@aria-label="Send without a note"]'
+ADD_NOTE_XPATH = '//button[@aria-label="Add a note"]'
+NOTE_TEXTAREA_XPATH = '//textarea[@name="message"]'
+SEND_INVITATION_XPATH = '//button[@aria-label="Send invitation"]'
+DISMISS_XPATH = "//button[@aria-label='Dismiss']"
+MESSAGE_BOX_XPATH = "//div[@role='textbox']"
+MESSAGE_SEND_XPATH = '//button[text()="Send"]'
+MESSAGE_CLOSE_XPATH = "//button[@class='msg-overlay-bubble-header__control artdeco-button artdeco-button--circle artdeco-button--muted artdeco-button--1 artdeco-button--tertiary ember-view']"
 
-def send_connection_request(driver: webdriver.Chrome, limit:int, letter:str, include_notes: bool, message_letter:str):
-    """Send a connection request to the specified LinkedIn profile"""
+def find_action_buttons(driver:webdriver.Chrome, kind:str):
+    """Fallback XPath cascade for Connect/Message buttons when the card extractor finds no cards"""
+    cascade = f"{kind.lower()}_buttons"
+    xpath_patterns = CONNECT_BUTTON_XPATHS if kind == CONNECT else MESSAGE_BUTTON_XPATHS
+    for xpath in selector_registry.ordered(cascade, xpath_patterns):
+        try:
+            buttons = waits.wait_for(driver, 'clickable', EC.presence_of_all_elements_located((By.XPATH, xpath)), required=False)
+            if buttons:
+                selector_registry.record(cascade, xpath, hit=True)
+                log.debug('buttons_found', "Found {count} {kind} buttons using xpath: {selector}",
+                          count=len(buttons), kind=kind.lower(), selector=xpath)
+                return buttons
+        except:
+            pass
+        selector_registry.record(cascade, xpath, hit=False)
+    return []
+
+def load_page_cards(driver:webdriver.Chrome, kind:str, page_num:int, ledger:Ledger=None, campaign:str='', seen:set=None):
+    """Collect the actionable cards of the current results page that the ledger and this session haven't seen"""
     try:
-        # Scroll to center of page first for better element visibility
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/3);")
-        time.sleep(2)  # Wait for the page to load
-        
-        connect_buttons = []
+        capture_state(driver, 'search_results', page_num)
+        network_stats.collect(driver)
+        with run_metrics.span('discovery', page=page_num) as span:
+            cards = dom_for(driver).extract_cards(selector_registry)
+            actionable = [card for card in cards if card.kind == kind]
+            span['selector'] = 'extractor'
+            if not cards:
+                # Unknown layout, fall back to the XPath cascade and resolve the cards in one call
+                span['selector'] = 'xpath_cascade'
+                buttons = find_action_buttons(driver, kind)
+                actionable = cards_from_buttons(driver, buttons, kind, selector_registry)
+            else:
+                log.debug('cards_extracted', "Extracted {cards} result cards, {actionable} with a {kind} button",
+                          page=page_num, cards=len(cards), actionable=len(actionable), kind=kind)
+            span['cards'] = len(actionable)
+        if ledger:
+            # Invites sent outside this script show up as Pending, remember them too
+            for card in cards:
+                if card.kind == PENDING and card.key and not ledger.seen(card.key):
+                    ledger.record(card.key, 'observed', PENDING_OUTCOME, campaign, card.profile_url, card.name)
+            fresh = [card for card in actionable if not ledger.seen(card.key)]
+            if len(fresh) < len(actionable):
+                log.info('ledger_skip', "Skipping {skipped} profiles already in the ledger",
+                         page=page_num, skipped=len(actionable) - len(fresh))
+            actionable = fresh
+        if seen:
+            # Profiles handled by an earlier campaign of this session
+            fresh = [card for card in actionable if card.key not in seen]
+            if len(fresh) < len(actionable):
+                log.info('session_skip', "Skipping {skipped} profiles already handled this session",
+                         page=page_num, skipped=len(actionable) - len(fresh))
+            actionable = fresh
+        log.info('page_cards', "Number of {kind} buttons found on page {page}: {cards}",
+                 page=page_num, kind=kind.lower(), cards=len(actionable), selector=span['selector'])
+        return actionable
+    except Exception as e:
+        log.exception('page_cards_failed', "No {kind} buttons found on page {page}: {error}", e, page=page_num, kind=kind.lower())
+        return []
+
+def invitation_limit_reached(driver:webdriver.Chrome):
+    """Check whether LinkedIn is showing the invitation limit heading"""
+    try:
+        limit_reached = driver.find_element(By.XPATH, INVITE_LIMIT_XPATH).is_displayed()
+    except:
+        return False
+    if limit_reached:
+        capture_state(driver, 'invite_limit')
+    return limit_reached
+
+def go_to_next_page(driver:webdriver.Chrome, actions:ActionChains):
+    """Move the results list to the next page.
+
+    Returns the method that worked (the Next button XPath, 'page_number' or 'url'),
+    or False at the end of the results.
+    """
+    # Get the pagination container
+    try:
+        waits.wait_for(driver, 'results', EC.presence_of_element_located((By.XPATH, PAGINATION_XPATH)), required=False)
+        log.debug('pagination_found', "Found pagination element", selector=PAGINATION_XPATH)
+    except:
+        log.debug('pagination_missing', "Could not find pagination element. Trying alternative methods.", selector=PAGINATION_XPATH)
+
+    # Method 1: Try standard next button
+    next_button_clicked = False
+    for xpath in selector_registry.ordered("next_button", NEXT_BUTTON_XPATHS):
         try:
-            if message_letter == "":
-                # Try multiple XPath patterns for connect buttons
-                xpath_patterns = [
-                    "//*[text()='Connect']/..",
-                    "//button[contains(@aria-label, 'Invite') or contains(@aria-label, 'Connect')]",
-                    "//span[text()='Connect']/parent::button",
-                    "//span[text()='Connect']/ancestor::button",
-                    "//div[contains(@class, 'entity-result__actions')]/div/button[contains(.,'Connect')]",
-                    "//button[contains(@class, 'artdeco-button')][contains(.,'Connect')]"
-                ]
-                
-                for xpath in xpath_patterns:
-                    try:
-                        connect_buttons = WebDriverWait(driver, 3).until(EC.presence_of_all_elements_located((By.XPATH, xpath)))
-                        if connect_buttons and len(connect_buttons) > 0:
-                            print(f"Found {len(connect_buttons)} connect buttons using xpath: {xpath}")
-                            break
-                    except:
-                        continue
-            elif message_letter != "":
-                # Try multiple XPath patterns for message buttons
-                xpath_patterns = [
-                    "//*[text()='Message']/..",
-                    "//button[contains(@aria-label, 'Message')]",
-                    "//span[text()='Message']/parent::button",
-                    "//span[text()='Message']/ancestor::button",
-                    "//div[contains(@class, 'entity-result__actions')]/div/button[contains(.,'Message')]",
-                    "//button[contains(@class, 'artdeco-button')][contains(.,'Message')]"
-                ]
-                
-                for xpath in xpath_patterns:
-                    try:
-                        connect_buttons = WebDriverWait(driver, 3).until(EC.presence_of_all_elements_located((By.XPATH, xpath)))
-                        if connect_buttons and len(connect_buttons) > 0:
-                            print(f"Found {len(connect_buttons)} message buttons using xpath: {xpath}")
-                            break
-                    except:
-                        continue
-                        
-            print(f"Number of connect buttons found: {len(connect_buttons)}")
-        except Exception as e:
-            print(Fore.YELLOW + f"[WARNING] Could not find connect buttons on initial page load: {e}")
-            connect_buttons = []
-            print("No connect buttons found")
-            print(f"Number of connect buttons found: 0")
-        
-        actions = ActionChains(driver)
-        cnt = 0
-        cnt2 = 1
-        page_num = 1
-        connections_sent = 0
-        
-        while connections_sent < limit:
-            print(f"Processing page {page_num}, connection {connections_sent+1}/{limit}")
-            
-            # If we've processed all buttons on this page or found none, go to next page
-            if cnt >= len(connect_buttons) or len(connect_buttons) == 0:
-                print(Fore.CYAN + f"[INFO] Moving to next page...")
+            next_button = waits.wait_for(driver, 'clickable', EC.element_to_be_clickable((By.XPATH, xpath)), required=False)
+            if next_button:
+                selector_registry.record("next_button", xpath, hit=True)
+                log.debug('next_button_found', "Found Next button using: {selector}", selector=xpath)
+                # Scroll to make the button visible
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
+                # Try different click methods
                 try:
-                    # Scroll to bottom of page to make pagination visible
-                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(3)
-                    
-                    # Check if we've hit the invitation limit
-                    try:
-                        if driver.find_element(By.XPATH, "//h2[text()='No free personalized invitations left']").is_displayed():
-                            print(Fore.RED + "[ERROR] No free personalized invitations left.")
-                            return
-                    except:
-                        pass
-                    
-                    # Get the pagination container
+                    next_button.click()
+                    next_button_clicked = True
+                    log.debug('next_button_clicked', "Next button clicked successfully", selector=xpath, method='click')
+                except:
                     try:
-                        pagination = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.XPATH, "//ul[contains(@class, 'artdeco-pagination__pages')]"))
-                        )
-                        print(Fore.GREEN + "[INFO] Found pagination element")
+                        driver.execute_script("arguments[0].click();", next_button)
+                        next_button_clicked = True
+                        log.debug('next_button_clicked', "Next button clicked with JavaScript", selector=xpath, method='javascript')
                     except:
-                        print(Fore.YELLOW + "[WARNING] Could not find pagination element. Trying alternative methods.")
-                    
-                    # Try to find and click the Next button with multiple approaches
-                    next_button = None
-                    next_button_clicked = False
-                    
-                    # Method 1: Try standard next button
-                    next_button_xpaths = [
-                        "//button[@aria-label='Next']",
-                        "//button[contains(@aria-label, 'Next')]",
-                        "//span[text()='Next']/parent::button",
-                        "//button[contains(@class, 'artdeco-pagination__button--next')]",
-                        "//li[contains(@class, 'artdeco-pagination__button--next')]/button",
-                        "//button[contains(., 'Next')]"
-                    ]
-                    
-                    for xpath in next_button_xpaths:
-                        try:
-                            next_button = WebDriverWait(driver, 5).until(
-                                EC.element_to_be_clickable((By.XPATH, xpath))
-                            )
-                            if next_button:
-                                print(Fore.GREEN + f"[INFO] Found Next button using: {xpath}")
-                                # Scroll to make the button visible
-                                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-                                time.sleep(1)
-                                # Try different click methods
-                                try:
-                                    next_button.click()
-                                    next_button_clicked = True
-                                    print(Fore.GREEN + "[INFO] Next button clicked successfully")
-                                except:
-                                    try:
-                                        driver.execute_script("arguments[0].click();", next_button)
-                                        next_button_clicked = True
-                                        print(Fore.GREEN + "[INFO] Next button clicked with JavaScript")
-                                    except:
-                                        try:
-                                            actions.move_to_element(next_button).click().perform()
-                                            next_button_clicked = True
-                                            print(Fore.GREEN + "[INFO] Next button clicked with ActionChains")
-                                        except:
-                                            print(Fore.YELLOW + "[WARNING] Could not click Next button with this method")
-                                if next_button_clicked:
-                                    break
-                        except:
-                            continue
-                    
-                    # Method 2: If button not found or not clickable, try to find the current page number and click the next one
-                    if not next_button_clicked:
-                        try:
-                            # Find the current active page number
-                            current_page_element = WebDriverWait(driver, 5).until(
-                                EC.presence_of_element_located((By.XPATH, "//li[contains(@class, 'active')]/button"))
-                            )
-                            current_page = int(current_page_element.text.strip())
-                            next_page = current_page + 1
-                            
-                            # Try to click the next page number
-                            next_page_button = WebDriverWait(driver, 5).until(
-                                EC.element_to_be_clickable((By.XPATH, f"//button[normalize-space()='{next_page}']"))
-                            )
-                            driver.execute_script("arguments[0].click();", next_page_button)
-                            next_button_clicked = True
-                            print(Fore.GREEN + f"[INFO] Clicked page number {next_page}")
-                        except Exception as e:
-                            print(Fore.YELLOW + f"[WARNING] Could not navigate by page number: {e}")
-                    
-                    # Method 3: Try direct URL navigation to next page
-                    if not next_button_clicked:
                         try:
-                            # Get current URL and parse page parameter
-                            current_url = driver.current_url
-                            if "page=" in current_url:
-                                # Extract current page from URL
-                                page_part = current_url.split("page=")[1]
-                                if "&" in page_part:
-                                    current_page = int(page_part.split("&")[0])
-                                else:
-                                    current_page = int(page_part)
-                                next_page = current_page + 1
-                                
-                                # Create next page URL
-                                next_url = current_url.replace(f"page={current_page}", f"page={next_page}")
-                            else:
-                                # Add page parameter if not present
-                                if "?" in current_url:
-                                    next_url = current_url + "&page=2"
-                                else:
-                                    next_url = current_url + "?page=2"
-                            
-                            # Navigate to next page
-                            print(Fore.YELLOW + f"[INFO] Navigating directly to next page URL: {next_url}")
-                            driver.get(next_url)
+                            actions.move_to_element(next_button).click().perform()
                             next_button_clicked = True
+                            log.debug('next_button_clicked', "Next button clicked with ActionChains", selector=xpath, method='actions')
                         except Exception as e:
-                            print(Fore.YELLOW + f"[WARNING] Could not navigate by URL: {e}")
-                    
-                    if not next_button_clicked:
-                        print(Fore.YELLOW + "[INFO] Could not find or click Next button. Reached the end of search results.")
-                        break
-                    
-                    page_num += 1
-                    time.sleep(5)  # Wait longer for the next page to load
-                    
-                    # Scroll to make elements visible
-                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight/3);")
-                    time.sleep(2)
-                    
-                    # Get new connect buttons on the next page
-                    connect_buttons = []
-                    try:
-                        if message_letter == "":
-                            # Try multiple XPath patterns for connect buttons
-                            xpath_patterns = [
-                                "//*[text()='Connect']/..",
-                                "//button[contains(@aria-label, 'Invite') or contains(@aria-label, 'Connect')]",
-                                "//span[text()='Connect']/parent::button",
-                                "//span[text()='Connect']/ancestor::button",
-                                "//div[contains(@class, 'entity-result__actions')]/div/button[contains(.,'Connect')]",
-                                "//button[contains(@class, 'artdeco-button')][contains(.,'Connect')]"
-                            ]
-                            
-                            for xpath in xpath_patterns:
-                                try:
-                                    connect_buttons = WebDriverWait(driver, 5).until(EC.presence_of_all_elements_located((By.XPATH, xpath)))
-                                    if connect_buttons and len(connect_buttons) > 0:
-                                        print(f"Found {len(connect_buttons)} connect buttons using xpath: {xpath}")
-                                        break
-                                except:
-                                    continue
-                        elif message_letter != "":
-                            # Try multiple XPath patterns for message buttons
-                            xpath_patterns = [
-                                "//*[text()='Message']/..",
-                                "//button[contains(@aria-label, 'Message')]",
-                                "//span[text()='Message']/parent::button",
-                                "//span[text()='Message']/ancestor::button",
-                                "//div[contains(@class, 'entity-result__actions')]/div/button[contains(.,'Message')]",
-                                "//button[contains(@class, 'artdeco-button')][contains(.,'Message')]"
-                            ]
-                            
-                            for xpath in xpath_patterns:
-                                try:
-                                    connect_buttons = WebDriverWait(driver, 5).until(EC.presence_of_all_elements_located((By.XPATH, xpath)))
-                                    if connect_buttons and len(connect_buttons) > 0:
-                                        print(f"Found {len(connect_buttons)} message buttons using xpath: {xpath}")
-                                        break
-                                except:
-                                    continue
-                        print(f"Number of connect buttons found on page {page_num}: {len(connect_buttons)}")
-                    except:
-                        print(Fore.YELLOW + f"[WARNING] No connect buttons found on page {page_num}")
-                        connect_buttons = []
-                    
-                    cnt2 = 1
-                    cnt = 0
-                    continue
-                    
-                except Exception as e:
-                    print(Fore.RED + f"[ERROR] Could not navigate to next page: {e}")
-                    traceback.print_exc()
-                    print(Fore.YELLOW + "Reached the end of search results or encountered an error.")
+                            log.exception('next_button_failed', "Could not click Next button with this method", e, selector=xpath)
+                if next_button_clicked:
+                    return xpath
+        except:
+            selector_registry.record("next_button", xpath, hit=False)
+            continue
+
+    # Method 2: If button not found or not clickable, try to find the current page number and click the next one
+    try:
+        # Find the current active page number
+        current_page_element = waits.wait_for(
+            driver, 'clickable', EC.presence_of_element_located((By.XPATH, "//li[contains(@class, 'active')]/button")), required=False
+        )
+        current_page = int(current_page_element.text.strip())
+        next_page = current_page + 1
+
+        # Try to click the next page number
+        next_page_button = waits.wait_for(
+            driver, 'clickable', EC.element_to_be_clickable((By.XPATH, f"//button[normalize-space()='{next_page}']")), required=False
+        )
+        driver.execute_script("arguments[0].click();", next_page_button)
+        log.debug('page_number_clicked', "Clicked page number {page}", page=next_page)
+        return 'page_number'
+    except Exception as e:
+        log.exception('page_number_failed', "Could not navigate by page number: {error}", e, level=log.DEBUG)
+
+    # Method 3: Try direct URL navigation to next page
+    try:
+        search = SearchURL.from_url(driver.current_url)
+        next_url = search.url(search.page + 1)
+        # Navigate to next page
+        log.info('next_page_url', "Navigating directly to next page URL: {url}", url=next_url, page=search.page + 1)
+        driver.get(next_url)
+        return 'url'
+    except Exception as e:
+        log.exception('next_page_url_failed', "Could not navigate by URL: {error}", e)
+    return False
+
+def dismiss_dialog(driver:webdriver.Chrome):
+    """Try to dismiss any dialog left open by a failed action"""
+    try:
+        dom_for(driver).click_xpath(DISMISS_XPATH, timeout=0)
+    except:
+        pass
+
+def send_invite(driver:webdriver.Chrome, card:Card, letter:str, include_notes:bool):
+    """Send a connection request through the card's Connect button, returns True when sent"""
+    dom = dom_for(driver)
+    # Handle "Got it" popup if it appears
+    try:
+        if dom.visible(GOT_IT_XPATH):
+            capture_state(driver, 'got_it')
+            dom.click_xpath(GOT_IT_XPATH, timeout=0)
+    except:
+        pass
+
+    # Click connect button
+    try:
+        with run_metrics.span('click', card=card.key, selector=card.handle):
+            if not dom.click_card(card, until=MODAL_OPEN):
+                raise TimeoutException("No dialog opened")
+        capture_state(driver, 'connect_modal')
+    except Exception as e:
+        log.exception('click_failed', "Could not click connect button: {error}", e, card=card.key, selector=card.handle)
+        return False
+
+    # Handle connection request
+    try:
+        with run_metrics.span('modal', card=card.key) as span:
+            if not include_notes:
+                span['selector'] = send_xpath = SEND_WITHOUT_NOTE_XPATH
+            else:
+                span['selector'] = send_xpath = SEND_INVITATION_XPATH
+                dom.click_xpath(ADD_NOTE_XPATH)
+                dom.fill(NOTE_TEXTAREA_XPATH, render_template(letter, card.first_name))
+                capture_state(driver, 'note_modal')
+        with run_metrics.span('send', card=card.key, kind=CONNECT):
+            # A dialog still open means LinkedIn didn't take the invite, and it would block the next card
+            if not dom.click_xpath(send_xpath, until=MODAL_CLOSED):
+                raise TimeoutException("The invitation dialog did not close")
+        return True
+    except Exception as e:
+        log.exception('invite_failed', "Could not complete connection request: {error}", e, card=card.key)
+        dismiss_dialog(driver)
+        return False
+
+def send_message(driver:webdriver.Chrome, card:Card, message_letter:str):
+    """Send a message to a 1st connection through the card's Message button, returns True when sent"""
+    dom = dom_for(driver)
+    # Click message button
+    try:
+        with run_metrics.span('click', card=card.key, selector=card.handle):
+            dom.click_card(card)
+    except Exception as e:
+        log.exception('click_failed', "Could not click message button: {error}", e, card=card.key, selector=card.handle)
+        return False
+
+    # Send message
+    try:
+        with run_metrics.span('modal', card=card.key, selector=MESSAGE_BOX_XPATH):
+            dom.fill(MESSAGE_BOX_XPATH, render_template(message_letter, card.first_name))
+            capture_state(driver, 'messaging_overlay')
+
+        with run_metrics.span('send', card=card.key, kind=MESSAGE):
+            dom.click_xpath(MESSAGE_SEND_XPATH)
+            # Close message dialog
+            dom.click_xpath(MESSAGE_CLOSE_XPATH, until=DETACHED)
+        return True
+    except Exception as e:
+        log.exception('message_failed', "Could not send message: {error}", e, card=card.key)
+        dismiss_dialog(driver)
+        return False
+
+def act_on_card(driver:webdriver.Chrome, kind:str, card:Card, letter:str, include_notes:bool, message_letter:str,
+                ledger:Ledger=None, campaign:str=''):
+    """Send the invite/message of one card and record it, returns 'sent', 'failed' or 'limit'"""
+    linkedin_url = card.profile_url or "LinkedIn Profile"
+    start = time.monotonic()
+    if kind == CONNECT:
+        if not send_invite(driver, card, letter, include_notes):
+            # LinkedIn's own limit can still be lower than the configured caps, the profile stays untried then
+            if invitation_limit_reached(driver):
+                log.error('invite_limit', "No free personalized invitations left.", card=card.key)
+                return 'limit'
+            if ledger:
+                ledger.record(card.key, 'invite', FAILED, campaign, card.profile_url, card.name)
+            return 'failed'
+
+        if ledger:
+            ledger.record(card.key, 'invite', SENT, campaign, card.profile_url, card.name)
+        log.success('invite_sent', "Connection request sent successfully to {url}",
+                    url=linkedin_url, card=card.key, duration=round(time.monotonic() - start, 3))
+
+    else:
+        if not send_message(driver, card, message_letter):
+            if ledger:
+                ledger.record(card.key, 'message', FAILED, campaign, card.profile_url, card.name)
+            return 'failed'
+
+        if ledger:
+            ledger.record(card.key, 'message', MESSAGED, campaign, card.profile_url, card.name)
+        log.success('message_sent', "Message sent successfully to {url}",
+                    url=linkedin_url, card=card.key, duration=round(time.monotonic() - start, 3))
+    return 'sent'
+
+def advance_page(driver:webdriver.Chrome, actions:ActionChains, page_num:int, search:SearchURL=None, strategy:str='url'):
+    """Check the invitation limit and move to the next results page.
+
+    The 'url' strategy loads page_num + 1 straight from the search URL and
+    detects the end of the results from LinkedIn's empty state; a page that
+    doesn't load in time is requested once more. The 'buttons' strategy clicks
+    through the pagination controls instead.
+    Returns 'ok', 'end' at the end of the results, 'limit' when no invitations are left
+    or 'error' when the next page never loaded, so the checkpoint is kept.
+    """
+    if strategy == 'url' and search:
+        if invitation_limit_reached(driver):
+            log.error('invite_limit', "No free personalized invitations left.", page=page_num)
+            return 'limit'
+        with run_metrics.span('navigation', page=page_num + 1, selector='url') as span:
+            state = None
+            for attempt in range(PAGE_LOAD_ATTEMPTS):
+                driver.get(search.url(page_num + 1))
+                try:
+                    state = waits.wait_for(driver, 'page_load', waits.results_or_empty)
                     break
-            
+                except TimeoutException:
+                    log.warning('page_load_timeout', "Page {page} did not load in time (attempt {attempt} of {attempts})",
+                                page=page_num + 1, attempt=attempt + 1, attempts=PAGE_LOAD_ATTEMPTS)
+            if state is None:
+                span['outcome'] = 'error'
+                log.error('page_load_failed', "Page {page} never loaded. Stopping with the checkpoint kept.", page=page_num + 1)
+                return 'error'
+            if state == 'empty':
+                span['outcome'] = 'end'
+                log.info('end_of_results', "Page {page} has no results. Reached the end of search results.", page=page_num + 1)
+                return 'end'
+            search.page = page_num + 1
+        return 'ok'
+
+    # Scroll to bottom of page to make pagination visible
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    try_wait_for(driver, 'scroll', waits.network_idle())
+    capture_state(driver, 'pagination')
+
+    # Check if we've hit the invitation limit
+    if invitation_limit_reached(driver):
+        log.error('invite_limit', "No free personalized invitations left.", page=page_num)
+        return 'limit'
+
+    with run_metrics.span('navigation', page=page_num + 1) as span:
+        results_before = waits.results_signature(driver)
+        page_before = waits.url_param(driver.current_url, 'page')
+        span['selector'] = go_to_next_page(driver, actions)
+        if not span['selector']:
+            span['outcome'] = 'end'
+            log.info('end_of_results', "Could not find or click Next button. Reached the end of search results.", page=page_num)
+            return 'end'
+
+        # Wait for the page param to move and the new results to replace the current ones
+        try_wait_for(driver, 'page_load', waits.url_param_changed('page', page_before))
+        try_wait_for(driver, 'results', waits.results_changed(results_before))
+
+        # Scroll to make elements visible
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/3);")
+        try_wait_for(driver, 'scroll', waits.network_idle())
+    return 'ok'
+
+def send_connection_request(driver: webdriver.Chrome, limit:int, letter:str, include_notes: bool, message_letter:str, pacing:PacingPolicy=None,
+                            ledger:Ledger=None, campaign:str='', checkpoint:CampaignCheckpoint=None, search_url:str='', resume_state:dict=None,
+                            scheduler:ActionScheduler=None, search:SearchURL=None, pagination:str='url', seen:set=None,
+                            watchdog:MemoryWatchdog=None, recycle=None):
+    """Send connection requests/messages to the profiles of the search results.
+
+    Returns the number sent (including those before a resumed checkpoint) and
+    why the campaign stopped: None when the limit was reached, 'end', 'limit',
+    'quota' or 'error'. With a watchdog, recycle(driver, how, url) is called
+    to free browser memory when it asks for it and returns the driver to
+    continue with.
+    """
+    connections_sent = 0
+    stop_reason = None
+    try:
+        kind = CONNECT if message_letter == "" else MESSAGE
+        action = INVITE if kind == CONNECT else MESSAGE_ACTION
+        pacing = pacing or PacingPolicy()
+        resume_state = resume_state or {}
+
+        # Scroll to center of page first for better element visibility
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/3);")
+        try_wait_for(driver, 'scroll', waits.network_idle())  # Wait for lazily loaded results
+
+        actions = ActionChains(driver)
+        # Page cursor over the URL the browser is on, which carries every applied filter
+        search = search or SearchURL.from_url(driver.current_url)
+        page_num = resume_state.get('page_num', search.page)
+        connections_sent = resume_state.get('connections_sent', 0)
+        queue = CandidateQueue(pacing.prefetch_depth)
+        cards = load_page_cards(driver, kind, page_num, ledger=ledger, campaign=campaign, seen=seen)
+        # The ledger already filters out cards handled before the checkpoint
+        queue.load(cards, skip=0 if ledger else min(resume_state.get('index', 0), len(cards)))
+        page_url = driver.current_url
+
+        def quota_left():
+            """False once the scheduler's hourly/daily cap for this action is used up"""
+            return not scheduler or scheduler.can_act(action)
+
+        def save_checkpoint():
+            if checkpoint:
+                checkpoint.save(campaign=campaign, search_url=search_url, page_url=page_url, page_num=page_num,
+                                index=queue.taken, connections_sent=connections_sent)
+
+        def next_page():
+            """Load the next page into the queue, returns False when there is none"""
+            nonlocal page_num, page_url, stop_reason
+            log.info('next_page', "Moving to next page...", page=page_num + 1)
             try:
-                if connections_sent >= limit:
-                    print(Fore.GREEN + f"[INFO] Reached the connection request limit of {limit}.")
-                    break
-                
-                if message_letter == "":
-                    # Check for invitation limit
-                    try:
-                        if driver.find_element(By.XPATH, "//h2[text()='No free personalized invitations left']").is_displayed():
-                            print(Fore.RED + "[ERROR] No free personalized invitations left.")
-                            return
-                    except:
-                        pass
-                    
-                    # Handle "Got it" popup if it appears
-                    try:
-                        got_it_button = driver.find_element(By.XPATH, "//button[@aria-label='Got it']")
-                        if got_it_button.is_displayed():
-                            got_it_button.click()
-                    except:
-                        pass
-                    
-                    # Get connect button
-                    if cnt >= len(connect_buttons):
-                        print(Fore.YELLOW + f"[WARNING] Connect button index {cnt} out of range (length: {len(connect_buttons)})")
-                        break
-                        
-                    connect_button = connect_buttons[cnt]
-                    
-                    # Get profile info using multiple methods
-                    profile_found = False
-                    name = "Connection"
-                    linkedin_url = ""
-                    
-                    # Try multiple XPath patterns to find the profile name and URL
-                    xpath_patterns = [
-                        # Original pattern
-                        f'(//*[text()="Connect"]/../../../..//span[@class="entity-result__title-line entity-result__title-line--2-lines "]//a)[{cnt2}]',
-                        # Alternative patterns
-                        f'(//*[text()="Connect"]/../../..//span[@class="entity-result__title-line entity-result__title-line--2-lines "]//a)[{cnt2}]',
-                        f'(//*[text()="Connect"]/ancestor::div[contains(@class, "entity-result__item")]//span[contains(@class, "entity-result__title-text")]//a)[{cnt2}]',
-                        f'(//span[text()="Connect"]/ancestor::div[contains(@class, "entity-result__item")]//span[contains(@class, "entity-result__title-text")]//a)[{cnt2}]',
-                        f'(//div[contains(@class, "entity-result__item")])[{cnt2}]//span[contains(@class, "entity-result__title-text")]//a',
-                        f'(//div[contains(@class, "entity-result")])[{cnt2}]//a[contains(@class, "app-aware-link")]'
-                    ]
-                    
-                    for xpath in xpath_patterns:
+                status = advance_page(driver, actions, page_num, search, pagination)
+            except Exception as e:
+                log.exception('next_page_failed', "Could not navigate to next page: {error}", e, level=log.ERROR, page=page_num + 1)
+                status = 'error'
+            if status != 'ok':
+                stop_reason = status
+                return False
+            page_num += 1
+            queue.load(load_page_cards(driver, kind, page_num, ledger=ledger, campaign=campaign, seen=seen))
+            page_url = driver.current_url
+            save_checkpoint()
+            return True
+
+        save_checkpoint()
+
+        while connections_sent < limit and not stop_reason:
+            # Stop before the cap instead of loading pages we can't act on
+            if not quota_left():
+                remaining = scheduler.remaining(action)
+                log.warning('quota_reached', "{action} quota reached ({hourly} left this hour, {daily} today). "
+                            "Stopping; resume later with --resume.",
+                            action=action.capitalize(), hourly=remaining['hourly'], daily=remaining['daily'])
+                stop_reason = 'quota'
+                continue
+
+            # If we've processed all cards on this page or found none, go to next page
+            if not queue:
+                next_page()
+                continue
+
+            log.info('processing', "Processing page {page}, connection {number}/{limit}",
+                     page=page_num, number=connections_sent + 1, limit=limit)
+            card = queue.pop()
+            if seen is not None and card.key:
+                seen.add(card.key)
+            if not card.name:
+                log.warning('profile_info_missing', "Could not find profile info for connection {number}. Using default values.",
+                            page=page_num, number=queue.taken)
+                card.name = f"Connection{queue.taken}"
+
+            try:
+                if scheduler:
+                    waited = scheduler.wait_until_ready(action)
+                    if waited > 60:
+                        log.info('schedule_wait', "Waited {minutes:.0f} min for the {action} schedule",
+                                 action=action, minutes=waited / 60, duration=round(waited, 1))
+
+                result = act_on_card(driver, kind, card, letter, include_notes, message_letter, ledger, campaign)
+                if result == 'limit':
+                    stop_reason = 'limit'
+                if result != 'sent':
+                    continue
+                connections_sent += 1
+                if scheduler:
+                    scheduler.record(action)
+
+                # Wait until the schedule allows the next action, using the window to prepare the next candidates
+                pacing.start_window(scheduler.ready_in(action) if scheduler else 0.0)
+                if watchdog and recycle and connections_sent < limit and watchdog.due():
+                    how, reason, sample = watchdog.check(driver)
+                    log.debug('memory_sample', "Browser memory: {rss_mb} MB, tab heap {heap_mb} MB, "
+                                               "{nodes} nodes, {latency_ms:.0f} ms per command", page=page_num, **sample)
+                    if how:
+                        log.warning('recycle', "Recycling the {how} ({reason}), continuing on page {page}",
+                                    how='tab' if how == RECYCLE_TAB else 'browser', reason=reason, page=page_num)
                         try:
-                            linkedin_container = WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.XPATH, xpath)))
-                            linkedin_url = linkedin_container.get_attribute('href')
-                            name_text = linkedin_container.text.strip()
-                            if name_text:
-                                name = name_text.split(' ')[0].title()
-                                profile_found = True
-                                print(f"Found profile using xpath: {xpath}")
-                                break
-                        except:
+                            with run_metrics.span('recycle', page=page_num, selector=how):
+                                driver = recycle(driver, how, page_url)
+                        except Exception as e:
+                            log.exception('recycle_failed', "Could not recycle the browser: {error}", e, level=log.ERROR)
+                            stop_reason = 'error'
                             continue
-                    
-                    if not profile_found:
-                        # If we still can't find the profile, try getting any profile in the current view
-                        try:
-                            profiles = driver.find_elements(By.XPATH, "//span[contains(@class, 'entity-result__title-text')]//a")
-                            if profiles and len(profiles) > cnt:
-                                linkedin_url = profiles[cnt].get_attribute('href')
-                                name_text = profiles[cnt].text.strip()
-                                if name_text:
-                                    name = name_text.split(' ')[0].title()
-                                    profile_found = True
-                        except:
-                            pass
-                    
-                    if not profile_found:
-                        print(Fore.YELLOW + f"[WARNING] Could not find profile info for connection {cnt+1}. Using default values.")
-                        name = f"Connection{cnt+1}"
-                        linkedin_url = "LinkedIn Profile"
-                    
-                    cnt += 1
-                    cnt2 += 1
-                    
-                    # Click connect button
-                    try:
-                        actions.move_to_element(connect_button).perform()
-                        time.sleep(1)
-                        driver.execute_script("arguments[0].click();", connect_button)
-                        time.sleep(1)
-                    except Exception as e:
-                        print(Fore.YELLOW + f"[WARNING] Could not click connect button: {e}")
-                        continue
-                    
-                    # Handle connection request
-                    try:
-                        if not include_notes:
-                            send_without_note = WebDriverWait(driver, 5).until(
-                                EC.element_to_be_clickable((By.XPATH, '//button[@aria-label="Send without a note"]'))
-                            )
-                            driver.execute_script("arguments[0].click();", send_without_note)
-                        else:
-                            add_note_button = WebDriverWait(driver, 5).until(
-                                EC.element_to_be_clickable((By.XPATH, '//button[@aria-label="Add a note"]'))
-                            )
-                            driver.execute_script("arguments[0].click();", add_note_button)
-
-                            message_box = WebDriverWait(driver, 5).until(
-                                EC.presence_of_element_located((By.XPATH, '//textarea[@name="message"]'))
-                            )
-                            message_box.send_keys(letter.replace("{name}", name).replace("{fullName}", name))
-                            time.sleep(1)
-                            
-                            send_button = WebDriverWait(driver, 5).until(
-                                EC.element_to_be_clickable((By.XPATH, '//button[@aria-label="Send invitation"]'))
-                            )
-                            driver.execute_script("arguments[0].click();", send_button)
-
-                        connections_sent += 1
-                        print(Fore.GREEN + f"[INFO] Connection request sent successfully to {linkedin_url}")
-                        print("---------------------------------------------------------------------------------------------------------------")
-                        time.sleep(10)  # Wait between requests to avoid rate limiting
-                    except Exception as e:
-                        print(Fore.YELLOW + f"[WARNING] Could not complete connection request: {e}")
-                        traceback.print_exc()
-                        # Try to dismiss any dialogs that might be open
-                        try:
-                            driver.find_element(By.XPATH, "//button[@aria-label='Dismiss']").click()
-                        except:
-                            pass
+                        actions = ActionChains(driver)
+                        # Handles of the old tab are gone, read the page again; sent profiles now show as Pending
+                        queue.load(load_page_cards(driver, kind, page_num, ledger=ledger, campaign=campaign, seen=seen))
+                if connections_sent < limit and quota_left():
+                    with run_metrics.span('prefetch', page=page_num) as span:
+                        if not queue:
+                            span['selector'] = 'next_page'
+                            next_page()
+                        dropped = queue.prefetch(dom_for(driver))
+                        if dropped:
+                            log.info('prefetch_dropped', "Dropped {dropped} candidates whose buttons are gone",
+                                     page=page_num, dropped=dropped)
+                # No pacing when the loop is about to stop, the window only spaces out the next action
+                if connections_sent < limit and not stop_reason and quota_left():
+                    slept = pacing.wait_remaining()
+                    log.debug('pacing', "Pacing: {duration:.1f}s left after prefetching", duration=slept)
+
+            except Exception as e:
+                log.exception('connection_failed', "Error processing connection {number}/{limit}: {error}", e,
+                              page=page_num, number=queue.taken, limit=limit, card=card.key)
+                continue
+            finally:
+                save_checkpoint()
+
+        # Keep the checkpoint when the invitation limit, the quota or an error stopped the campaign
+        if checkpoint and stop_reason in (None, 'end'):
+            checkpoint.clear()
+        log.success('campaign_done', "Completed sending {sent} connection requests/messages out of {limit} requested.",
+                    sent=connections_sent, limit=limit, stop_reason=stop_reason)
+
+    except Exception as e:
+        log.exception('campaign_failed', "An error occurred in send_connection_request: {error}", e, level=log.ERROR)
+        stop_reason = 'error'
+    return connections_sent, stop_reason
+
+def load_action_page(driver:webdriver.Chrome, page_url:str, page_num:int) -> dict:
+    """Load a results page the discovery tab already parsed, returns its cards by profile key"""
+    with run_metrics.span('navigation', page=page_num, selector='action_tab') as span:
+        driver.get(page_url)
+        if try_wait_for(driver, 'page_load', waits.results_or_empty) != 'results':
+            span['outcome'] = 'missing'
+            return {}
+        cards = dom_for(driver).extract_cards(selector_registry)
+        span['cards'] = len(cards)
+    return {card.key: card for card in cards if card.key}
+
+def send_with_two_tabs(driver: webdriver.Chrome, limit:int, letter:str, include_notes: bool, message_letter:str, pacing:PacingPolicy=None,
+                       ledger:Ledger=None, campaign:str='', checkpoint:CampaignCheckpoint=None, search_url:str='', resume_state:dict=None,
+                       scheduler:ActionScheduler=None, search:SearchURL=None, pagination:str='url', seen:set=None, lookahead:int=20,
+                       blocked_urls:list=None):
+    """send_connection_request with discovery and actions in separate tabs.
+
+    A worker thread pages through the search results in the current tab and
+    queues the cards. This thread loads each of those results pages once in a
+    second tab and sends the invites/messages from its cards, so page loads
+    of the discovery tab run during the pacing wait. blocked_urls are blocked
+    in the second tab as well. Returns the same (sent, stop_reason) pair.
+    """
+    connections_sent = 0
+    stop_reason = None
+    tabs = None
+    worker = None
+    try:
+        kind = CONNECT if message_letter == "" else MESSAGE
+        action = INVITE if kind == CONNECT else MESSAGE_ACTION
+        pacing = pacing or PacingPolicy()
+        resume_state = resume_state or {}
+        search = search or SearchURL.from_url(driver.current_url)
+        page_num = resume_state.get('page_num', search.page)
+        page_url = driver.current_url
+        connections_sent = resume_state.get('connections_sent', 0)
+
+        dom = dom_for(driver)
+        # URL blocking is set per tab, the discovery tab got it when the browser started
+        tabs = TabSet(driver, on_switch=dom.attach, on_close=dom.detach,
+                      on_open=lambda handle: apply_blocklist(driver, blocked_urls)).adopt(DISCOVERY)
+        discovery_actions = ActionChains(driver)
+
+        def load_page(tab_driver, number, first):
+            """Runs in the discovery thread with the discovery tab held"""
+            if not first:
+                status = advance_page(tab_driver, discovery_actions, number - 1, search, pagination)
+                if status != 'ok':
+                    return status, [], ''
+            cards = load_page_cards(tab_driver, kind, number, ledger=ledger, campaign=campaign, seen=seen)
+            # Button handles belong to the discovery tab, the action tab finds the cards again by profile key
+            return 'ok', [card for card in cards if card.key], tab_driver.current_url
+
+        tabs.open(ACTION)
+        worker = DiscoveryWorker(tabs, load_page, page_num, lookahead)
+        worker.start()
+
+        def save_checkpoint():
+            if checkpoint:
+                checkpoint.save(campaign=campaign, search_url=search_url, page_url=page_url, page_num=page_num,
+                                index=0, connections_sent=connections_sent)
+
+        save_checkpoint()
+        # Results page loaded in the action tab and its cards by profile key
+        action_page = None
+        page_cards = {}
+
+        while connections_sent < limit and not stop_reason:
+            if scheduler and not scheduler.can_act(action):
+                remaining = scheduler.remaining(action)
+                log.warning('quota_reached', "{action} quota reached ({hourly} left this hour, {daily} today). "
+                            "Stopping; resume later with --resume.",
+                            action=action.capitalize(), hourly=remaining['hourly'], daily=remaining['daily'])
+                stop_reason = 'quota'
+                continue
+
+            item = worker.get()
+            if item is None:
+                stop_reason = worker.stop_reason or 'end'
+                if worker.error:
+                    log.error('discovery_failed', "Discovery stopped: {error}", error=str(worker.error))
+                continue
+            page_num, page_url, card = item
+            if seen is not None and card.key:
+                seen.add(card.key)
+            log.info('processing', "Processing page {page}, connection {number}/{limit} ({queued} more queued)",
+                     page=page_num, number=connections_sent + 1, limit=limit, queued=worker.candidates.qsize())
+
+            try:
+                if scheduler:
+                    waited = scheduler.wait_until_ready(action)
+                    if waited > 60:
+                        log.info('schedule_wait', "Waited {minutes:.0f} min for the {action} schedule",
+                                 action=action, minutes=waited / 60, duration=round(waited, 1))
+
+                with tabs.use(ACTION) as tab:
+                    if page_url != action_page:
+                        page_cards = load_action_page(tab, page_url, page_num)
+                        # A page that didn't show its results is loaded again for the next card
+                        action_page = page_url if page_cards else None
+                    target = page_cards.get(card.key)
+                    if target and target.kind == PENDING:
+                        if ledger:
+                            ledger.record(card.key, 'observed', PENDING_OUTCOME, campaign, card.profile_url, card.name)
                         continue
-                
-                elif message_letter != "":
-                    # Handle messaging to 1st connections using similar approach
-                    profile_found = False
-                    full_name = "Connection"
-                    linkedin_url = ""
-                    
-                    # Try multiple XPath patterns to find the profile name and URL
-                    xpath_patterns = [
-                        f'(//*[text()="Message"]/../../../../..//span[@class="entity-result__title-line entity-result__title-line--2-lines "]//a)[{cnt2}]',
-                        f'(//*[text()="Message"]/../../..//span[@class="entity-result__title-line entity-result__title-line--2-lines "]//a)[{cnt2}]',
-                        f'(//*[text()="Message"]/ancestor::div[contains(@class, "entity-result__item")]//span[contains(@class, "entity-result__title-text")]//a)[{cnt2}]',
-                        f'(//span[text()="Message"]/ancestor::div[contains(@class, "entity-result__item")]//span[contains(@class, "entity-result__title-text")]//a)[{cnt2}]',
-                        f'(//div[contains(@class, "entity-result__item")])[{cnt2}]//span[contains(@class, "entity-result__title-text")]//a',
-                        f'(//div[contains(@class, "entity-result")])[{cnt2}]//a[contains(@class, "app-aware-link")]'
-                    ]
-                    
-                    for xpath in xpath_patterns:
-                        try:
-                            linkedin_container = WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.XPATH, xpath)))
-                            linkedin_url = linkedin_container.get_attribute('href')
-                            name_text = linkedin_container.text.strip()
-                            if name_text:
-                                full_name = name_text.split(' ')[0].title().replace("view", "").replace('\n', '')
-                                profile_found = True
-                                print(f"Found profile using xpath: {xpath}")
-                                break
-                        except:
-                            continue
-                    
-                    if not profile_found:
-                        # If we still can't find the profile, try getting any profile in the current view
-                        try:
-                            profiles = driver.find_elements(By.XPATH, "//span[contains(@class, 'entity-result__title-text')]//a")
-                            if profiles and len(profiles) > cnt:
-                                linkedin_url = profiles[cnt].get_attribute('href')
-                                name_text = profiles[cnt].text.strip()
-                                if name_text:
-                                    full_name = name_text.split(' ')[0].title().replace("view", "").replace('\n', '')
-                                    profile_found = True
-                        except:
-                            pass
-                    
-                    if not profile_found:
-                        print(Fore.YELLOW + f"[WARNING] Could not find profile info for connection {cnt+1}. Using default values.")
-                        full_name = f"Connection{cnt+1}"
-                        linkedin_url = "LinkedIn Profile"
-                    
-                    connect_button = connect_buttons[cnt]
-                    cnt += 1
-                    cnt2 += 1
-                    
-                    # Click message button
-                    try:
-                        actions.move_to_element(connect_button).perform()
-                        time.sleep(1)
-                        driver.execute_script("arguments[0].click();", connect_button)
-                        time.sleep(2)
-                    except Exception as e:
-                        print(Fore.YELLOW + f"[WARNING] Could not click message button: {e}")
+                    if not target or target.kind != kind:
+                        log.warning('button_missing', "No {kind} button for {url} on page {page}",
+                                    kind=kind, url=card.profile_url, page=page_num, card=card.key)
                         continue
+                    result = act_on_card(tab, kind, target, letter, include_notes, message_letter, ledger, campaign)
+                if result == 'limit':
+                    stop_reason = 'limit'
+                if result != 'sent':
+                    continue
+                connections_sent += 1
+                if scheduler:
+                    scheduler.record(action)
 
-                    # Check for invitation limit
-                    try:
-                        if driver.find_element(By.XPATH, "//h2[text()='No free personalized invitations left']").is_displayed():
-                            print(Fore.RED + "[ERROR] No free personalized invitations left.")
-                            return
-                    except:
-                        pass
+                # The discovery tab gets the driver while this thread waits
+                pacing.start_window(scheduler.ready_in(action) if scheduler else 0.0)
+                slept = pacing.wait_remaining()
+                log.debug('pacing', "Pacing: {duration:.1f}s, {queued} candidates queued",
+                          duration=slept, queued=worker.candidates.qsize())
 
-                    # Send message
-                    try:
-                        message_box = WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.XPATH, "//div[@role='textbox']")))
-                        message_box.clear()
-                        message_box.send_keys(message_letter.replace("{name}", full_name).replace("{fullName}", full_name))
-                        time.sleep(1)
-                        
-                        send_button = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, '//button[text()="Send"]')))
-                        send_button.click()
-                        time.sleep(1)
-                        
-                        # Close message dialog
-                        close_button = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, "//button[@class='msg-overlay-bubble-header__control artdeco-button artdeco-button--circle artdeco-button--muted artdeco-button--1 artdeco-button--tertiary ember-view']")))
-                        close_button.click()
-                        time.sleep(2)
-
-                        connections_sent += 1
-                        print(Fore.GREEN + f"[INFO] Message sent successfully to {linkedin_url}")
-                        print("---------------------------------------------------------------------------------------------------------------")
-                        time.sleep(10)  # Wait between messages to avoid rate limiting
-                    except Exception as e:
-                        print(Fore.YELLOW + f"[WARNING] Could not send message: {e}")
-                        traceback.print_exc()
-                        # Try to dismiss any dialogs that might be open
-                        try:
-                            driver.find_element(By.XPATH, "//button[@aria-label='Dismiss']").click()
-                        except:
-                            pass
-                        continue
-                
             except Exception as e:
-                print(Fore.YELLOW + f"[WARNING] Error processing connection {cnt}/{limit}: {e}")
-                traceback.print_exc()
-                cnt += 1
-                cnt2 += 1
+                log.exception('connection_failed', "Error processing connection {number}/{limit}: {error}", e,
+                              page=page_num, number=connections_sent + 1, limit=limit, card=card.key)
                 continue
-                
-        print(Fore.GREEN + f"[INFO] Completed sending {connections_sent} connection requests/messages out of {limit} requested.")
-                
+            finally:
+                save_checkpoint()
+
+        # Keep the checkpoint when the invitation limit, the quota or an error stopped the campaign
+        if checkpoint and stop_reason in (None, 'end'):
+            checkpoint.clear()
+        log.success('campaign_done', "Completed sending {sent} connection requests/messages out of {limit} requested.",
+                    sent=connections_sent, limit=limit, stop_reason=stop_reason)
+
     except Exception as e:
-        print(Fore.RED + f"[ERROR] An error occurred in send_connection_request: {e}")
-        traceback.print_exc()
+        log.exception('campaign_failed', "An error occurred in send_with_two_tabs: {error}", e, level=log.ERROR)
+        stop_reason = 'error'
+    finally:
+        if worker:
+            worker.stop()
+        if tabs and ACTION in tabs.handles:
+            try:
+                tabs.close(ACTION, back_to=DISCOVERY)
+            except Exception as e:
+                log.warning('tab_close_failed', "Could not close the action tab: {error}", error=str(e))
+    return connections_sent, stop_reason
+
+def harvest_results(driver:webdriver.Chrome, harvest:HarvestWriter, settings:CampaignSettings, search:SearchURL,
+                    max_pages:int=0, pagination:str='url'):
+    """Write every card of the search results to the harvest file without clicking anything.
+
+    Only the current page's cards are held at a time. Returns why the walk
+    stopped: None after max_pages pages (0 for no limit), 'end', 'limit' or 'error'.
+    """
+    kind = CONNECT if settings.action == INVITE else MESSAGE
+    actions = ActionChains(driver)
+    page_num = search.page
+    pages = 0
+    while True:
+        capture_state(driver, 'search_results', page_num)
+        network_stats.collect(driver)
+        with run_metrics.span('discovery', page=page_num, selector='extractor') as span:
+            cards = dom_for(driver).extract_cards(selector_registry)
+            span['cards'] = len(cards)
+        harvest.write_page(settings.campaign, page_num, cards, kind)
+        log.success('harvested', "Page {page}: harvested {cards} cards ({total} total)",
+                    page=page_num, cards=len(cards), total=harvest.rows)
+        pages += 1
+        if max_pages and pages >= max_pages:
+            return None
+        try:
+            status = advance_page(driver, actions, page_num, search, pagination)
+        except Exception as e:
+            log.exception('next_page_failed', "Could not navigate to next page: {error}", e, level=log.ERROR, page=page_num + 1)
+            return 'error'
+        if status != 'ok':
+            return status
+        page_num += 1
 
-def main():
+def print_campaign(settings:CampaignSettings):
+    """Display the loaded configuration of a campaign"""
+    lines = [f"Campaign '{settings.campaign}' from [{settings.section}]:",
+             f"  Connection degree: {settings.connection_degree}",
+             f"  Keyword: {settings.keyword}",
+             f"  Location: {settings.location}"]
+    if settings.actively_hiring:
+        lines.append(f"  Actively Hiring: {settings.actively_hiring}")
+    lines.append(f"  Maximum connection requests: {settings.limit}")
+    if settings.connection_degree.lower() == '1st' and settings.message_letter:
+        lines.append("  Using message for 1st connections")
+    elif settings.include_note:
+        lines.append("  Including note with connection requests")
+    log.info('campaign', "\n".join(lines))
+
+def open_campaign(driver:webdriver.Chrome, settings:CampaignSettings, geo_cache:GeoUrnCache, resume_state:dict=None, on_start_page:bool=False):
+    """Load the first results page of a campaign, returns its search URL and the page cursor"""
+    if settings.location and not settings.location_code:
+        # An earlier campaign of this session may have learned the geoUrn since the settings were loaded
+        settings.location_code = geo_cache.get(settings.location)
+    search_url = str(settings.search())
+    if resume_state:
+        # The saved page URL already carries every filter, including the location
+        log.info('resume', "Resuming at page {page} with {sent} sent: {url}",
+                 page=resume_state['page_num'], sent=resume_state['connections_sent'], url=resume_state['page_url'])
+    else:
+        log.info('navigate', "Navigating to search URL: {url}", url=search_url)
+    if not on_start_page:
+        with run_metrics.span('navigation', page=resume_state['page_num'] if resume_state else 1, selector='url'):
+            driver.get(resume_state['page_url'] if resume_state else search_url)
+            waits.wait_for(driver, 'page_load', EC.presence_of_element_located((By.ID, "global-nav-typeahead")))
+
+    if not resume_state and settings.location != "" and not settings.location_code:
+        with run_metrics.span('select_location', location=settings.location):
+            select_location(driver, settings.location)
+        location_code = geo_urn_from_url(driver.current_url)
+        if location_code:
+            # Later runs put the geoUrn straight into the search URL
+            geo_cache.learn(settings.location, location_code)
+            settings.location_code = location_code
+            search_url = str(settings.search())
+            log.info('geo_urn_learned', "Learned geoUrn {geo_urn} for '{location}'", geo_urn=location_code, location=settings.location)
+    try_wait_for(driver, 'results', waits.results_signature)
+    search = settings.search()
+    if resume_state or driver.current_url != search_url:
+        # Pick up filters applied through the UI and the resumed page
+        search = SearchURL.from_url(driver.current_url)
+    return search_url, search
+
+def has_credentials() -> bool:
+    """Whether setup.ini holds a LinkedIn email and password"""
+    return all(config.get('LinkedIn', option, fallback='').strip('# ') for option in ('email', 'password'))
+
+def main(resume:bool=False, capture_dir:str=None, count_commands:bool=False, harvest_path:str=None, harvest_pages:int=0):
+    global fixture_recorder, dom_backend, session_store
     # Check if input config file exists
     if not os.path.exists(input_config_file):
         create_default_input_config()
-        print(Fore.YELLOW + f"[INFO] Created default input configuration file: {input_config_file}")
-        print(Fore.YELLOW + f"[INFO] Please edit {input_config_file} with your search criteria and run the script again.")
+        log.warning('default_config', "Created default input configuration file: {path}", path=input_config_file)
+        log.warning('default_config', "Please edit {path} with your search criteria and run the script again.", path=input_config_file)
+        log.drain()
         return
 
     # Read input configuration
     input_config.read(input_config_file)
+    config.read(config_file)
+    log.configure(input_config)
+    selector_registry.load()
+    waits.configure(input_config)
+    run_metrics.open(input_config.get('Metrics', 'path', fallback='metrics.jsonl'))
+    if capture_dir is not None:
+        fixture_recorder = FixtureRecorder(capture_dir or new_fixture_dir())
+        log.info('capture', "Capturing page fixtures to {path}", path=fixture_recorder.directory)
     
     driver = None
+    ledger = None
+    command_accounting = None
+    harvest = None
+    watchdog = None
     
     try:
         # Get search criteria from input config
-        connection_degree = input_config.get('SearchCriteria', 'connection_degree')
-        keyword = input_config.get('SearchCriteria', 'keyword')
-        location = input_config.get('SearchCriteria', 'location')
-        location_code_mapping = {
-            'united states': '103644278',
-            'india': '102713980',
-            'canada': '101174742',
-            'united kingdom': '102264111',
-            'australia': '102300403',
-            'germany': '101282230'  # Added Germany
-        }
-        location_code = location_code_mapping.get(location.lower(), '')
-        limit = input_config.getint('SearchCriteria', 'limit')
-        li_at = input_config.get('LinkedIn', 'li_at')
-        
-        # Get the actively_hiring parameter if it exists
-        actively_hiring = input_config.get('SearchCriteria', 'actively_hiring', fallback='Any job title')
-        
-        # Check for message options
-        message_letter = ''
-        include_note = False
-        message = ''
-        
-        if connection_degree.lower() == '1st':
-            if input_config.has_option('Messages', 'message_letter'):
-                message_letter = input_config.get('Messages', 'message_letter')
-        
-        if message_letter == "":
-            if input_config.has_option('Messages', 'include_note'):
-                include_note = input_config.getboolean('Messages', 'include_note')
-                if include_note and input_config.has_option('Messages', 'connection_message'):
-                    message = input_config.get('Messages', 'connection_message')
-        
-        # Display the loaded configuration
-        print(Fore.CYAN + "[-] Using the following search criteria from input_config.ini:")
-        print(Fore.MAGENTA + f"[+] Connection degree: {connection_degree}")
-        print(Fore.MAGENTA + f"[+] Keyword: {keyword}")
-        print(Fore.MAGENTA + f"[+] Location: {location}")
-        if actively_hiring:
-            print(Fore.MAGENTA + f"[+] Actively Hiring: {actively_hiring}")
-        print(Fore.MAGENTA + f"[+] Maximum connection requests: {limit}")
-        if connection_degree.lower() == '1st' and message_letter:
-            print(Fore.MAGENTA + f"[+] Using message for 1st connections")
-        elif include_note:
-            print(Fore.MAGENTA + f"[+] Including note with connection requests")
-        print("----------------------------------------------------------------")
-        
-        driver = setup_driver()
+        geo_cache = GeoUrnCache().load()
+        campaigns = load_campaigns(input_config, geo_cache)
+        session_store = SessionStore.from_config(input_config, config).load()
+        li_at = session_store.cookie
+        # Stop on mistakes that would otherwise only show after Chrome started
+        problems = config_problems(input_config)
+        for settings in campaigns:
+            print_campaign(settings)
+            problems.extend(settings.problems(input_config))
+        for level, text in problems:
+            (log.error if level == ERROR else log.warning)('config_problem', text)
+        has_errors = any(level == ERROR for level, _ in problems)
+        if has_errors:
+            return
+        budget = total_budget(input_config, campaigns)
+        if len(campaigns) > 1:
+            log.info('budget', "{campaigns} campaigns sharing a budget of {budget} connection requests/messages",
+                     campaigns=len(campaigns), budget=budget)
 
-        try:
-            login_with_cookie(driver, li_at)
-        except Exception as e:
-            print(Fore.RED + f"[INFO] Cookie login failed: {e}\n" + Fore.YELLOW + "Attempting login with credentials.")
-            # Check if setup.ini exists and has LinkedIn credentials
-            if os.path.exists(config_file) and config.has_section('LinkedIn') and config.has_option('LinkedIn', 'email') and config.has_option('LinkedIn', 'password'):
+        checkpoint = CampaignCheckpoint()
+        resume_state = checkpoint.load() if resume else None
+        first = 0
+        if harvest_path is not None:
+            # Read-only: no checkpoint, ledger or quota, only the result cards
+            harvest = HarvestWriter(harvest_path).open()
+            log.info('harvest', "Harvest mode, writing result cards to {path}"
+                                + (" (up to {pages} pages per campaign)" if harvest_pages else ""),
+                     path=harvest_path, pages=harvest_pages)
+        elif resume and not resume_state:
+            log.warning('resume', "No checkpoint to resume from. Starting from page 1.")
+        elif resume_state:
+            matching = [index for index, settings in enumerate(campaigns)
+                        if settings.campaign == resume_state.get('campaign') and str(settings.search()) == resume_state.get('search_url')]
+            if matching:
+                # Campaigns before the interrupted one had finished
+                first = matching[0]
+            else:
+                log.warning('resume', "Search criteria changed since the checkpoint. Starting from page 1.")
+                resume_state = None
+
+        scheduler = ActionScheduler.from_config(input_config).load()
+        if harvest:
+            runnable = campaigns
+        else:
+            ledger = Ledger.from_config(input_config).open()
+            log.info('ledger', "Ledger has {profiles} profiles from previous runs", profiles=len(ledger))
+
+            for action in sorted({settings.action for settings in campaigns}):
+                remaining = scheduler.remaining(action)
+                log.info('schedule', "Schedule: {hourly} {action}s left this hour, {daily} today",
+                         action=action, hourly=remaining['hourly'], daily=remaining['daily'])
+            runnable = [settings for settings in campaigns[first:] if scheduler.can_act(settings.action)]
+            if not runnable:
+                log.warning('quota_reached', "Quota already reached. Nothing to do until it refills.")
+                return
+        if resume_state and runnable[0] is not campaigns[first]:
+            resume_state = None
+
+        start_url = resume_state['page_url'] if resume_state else str(runnable[0].search())
+        browser_profile = BrowserProfile.from_config(input_config)
+        startup_timings = {}
+        session_status = None
+        if input_config.getboolean('Session', 'preflight', fallback=True):
+            # Learn whether the cookie still works before paying for a browser start
+            phase_start = time.monotonic()
+            with run_metrics.span('preflight') as span:
+                session_status, detail = check_session(li_at, input_config.get('Session', 'base_url', fallback=LINKEDIN_URL),
+                                                       input_config.getfloat('Session', 'timeout', fallback=10))
+                span['outcome'] = session_status
+            session_store.record(session_status, detail)
+            startup_timings['preflight'] = time.monotonic() - phase_start
+            if session_status == VALID:
+                log.success('preflight', "Session cookie is valid ({detail})", detail=detail)
+            elif session_status == CHALLENGED:
+                log.error('preflight', "LinkedIn wants this session to pass a security check ({detail}). Log in once in a "
+                                       "regular browser, then paste the new li_at cookie into {path}.",
+                          detail=detail, path=input_config_file)
+                return
+            elif session_status == EXPIRED:
+                log.warning('preflight', "Session cookie is expired ({detail})", detail=detail)
+                if not has_credentials() and not browser_profile.persistent:
+                    log.error('login', "No valid login credentials found in setup.ini")
+                    log.warning('login', "Please add your LinkedIn email and password to setup.ini or provide a valid li_at cookie in input_config.ini")
+                    return
+            else:
+                log.warning('preflight', "Could not check the session cookie ({detail}), trying it in the browser", detail=detail)
+
+        phase_start = time.monotonic()
+        driver = setup_driver(browser_profile)
+        startup_timings['driver'] = time.monotonic() - phase_start
+        if count_commands:
+            command_accounting = CommandAccounting().install(driver)
+            run_metrics.command_counter = lambda: command_accounting.total
+        backend_name = input_config.get('Execution', 'backend', fallback='webdriver')
+        dom_backend = create_backend(driver, backend_name)
+        if dom_backend.fallback_reason:
+            log.warning('backend_fallback', "{backend} backend unavailable ({error}), using classic WebDriver",
+                        backend=backend_name, error=dom_backend.fallback_reason)
+        else:
+            log.info('backend', "DOM backend: {backend}", backend=dom_backend.name)
+
+        # Landing directly on the search page saves a page load after the cookie login
+        phase_start = time.monotonic()
+        on_start_page = False
+        if session_status == EXPIRED and not browser_profile.persistent:
+            log.info('login', "Skipping the cookie login. Attempting login with credentials.")
+        else:
+            try:
+                with run_metrics.span('login_cookie'):
+                    login_with_cookie(driver, li_at, start_url)
+                on_start_page = True
+            except Exception as e:
+                log.warning('login', "Cookie login failed: {error}. Attempting login with credentials.", error=str(e))
+        if not on_start_page:
+            if has_credentials():
                 email = config.get('LinkedIn', 'email')
                 password = config.get('LinkedIn', 'password')
-                login_with_credentials(driver, email, password)
+                with run_metrics.span('login_credentials'):
+                    login_with_credentials(driver, email, password)
             else:
-                print(Fore.RED + "[ERROR] No valid login credentials found in setup.ini")
-                print(Fore.YELLOW + "Please add your LinkedIn email and password to setup.ini or provide a valid li_at cookie in input_config.ini")
+                log.error('login', "No valid login credentials found in setup.ini")
+                log.warning('login', "Please add your LinkedIn email and password to setup.ini or provide a valid li_at cookie in input_config.ini")
                 return
-        
-        network_mapping = {
-            "1st": "%5B%22F%22%5D",  
-            "2nd": "%5B%22S%22%5D",  
-            "3rd": "%5B%22O%22%5D"   
-        }
-        network_code = network_mapping.get(connection_degree.lower(), "")
-        if not network_code:
-            print(Fore.YELLOW + f"[WARNING] Invalid connection degree '{connection_degree}'. Using default (2nd).")
-            network_code = "%5B%22S%22%5D"
-
-        # Build the search URL
-        search_url = f"https://www.linkedin.com/search/results/people/?keywords={keyword.replace(' ','%20').lower()}"
-        
-        if location_code:
-            search_url += f"&geoUrn=%5B%22{location_code}%22%5D"
-        elif location:
-            search_url += f"&locations={location.replace(' ','%20')}"
-        
-        # Add network code
-        search_url += f"&network={network_code}"
-        
-        # Add actively hiring filter according to new LinkedIn URL pattern
-        if actively_hiring:
-            if actively_hiring.lower() in ['any job', 'any job title']:
-                # -100 is LinkedIn's internal code that represents "Any job title"
-                search_url += "&activelyHiringForJobTitles=%5B%22-100%22%5D"
+        startup_timings['login'] = time.monotonic() - phase_start
+        phase_start = time.monotonic()
+
+        # Campaigns run back to back in this session, sharing the budget and the profiles already handled
+        pacing = PacingPolicy.from_config(input_config)
+        watchdog = MemoryWatchdog.from_config(input_config)
+
+        def recycle(old_driver, how, url):
+            nonlocal driver
+            if how == RESTART_DRIVER:
+                # The old browser is gone once a restart starts, don't quit it again if this fails
+                driver = None
+            driver = recycle_browser(old_driver, how, url, browser_profile, backend_name, li_at, command_accounting)
+            return driver
+
+        two_tabs = input_config.get('Execution', 'mode', fallback='single_tab') == 'two_tabs'
+        lookahead = input_config.getint('Execution', 'lookahead', fallback=20)
+        seen = set()
+        invites_exhausted = False
+        for index, settings in enumerate(runnable):
+            if budget <= 0 and not harvest:
+                log.info('budget', "Session budget used up, skipping the remaining campaigns.")
+                break
+            if not harvest and (not scheduler.can_act(settings.action) or (invites_exhausted and settings.action == INVITE)):
+                log.info('campaign_skipped', "No {action}s left, skipping campaign '{campaign}'.",
+                         action=settings.action, campaign=settings.campaign)
+                continue
+            if len(runnable) > 1:
+                log.info('campaign_start', "Starting campaign '{campaign}' ({number}/{campaigns})",
+                         campaign=settings.campaign, number=index + 1, campaigns=len(runnable))
+            campaign_resume = resume_state if index == 0 else None
+            search_url, search = open_campaign(driver, settings, geo_cache, campaign_resume, on_start_page and index == 0)
+            if index == 0:
+                startup_timings['first_results'] = time.monotonic() - phase_start
+                log.info('startup', "Startup: " + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in startup_timings.items())
+                         + f" (total {sum(startup_timings.values()):.1f}s)")
+
+            pagination = settings.pagination if settings.pagination in PAGINATION_STRATEGIES else 'url'
+            if harvest:
+                stop_reason = harvest_results(driver, harvest, settings, search, harvest_pages, pagination)
+                if stop_reason == 'error':
+                    break
+                continue
+
+            campaign_args = dict(
+                driver=driver, limit=min(settings.limit, budget), letter=settings.message, include_notes=settings.include_note,
+                message_letter=settings.message_letter, pacing=pacing, ledger=ledger, campaign=settings.campaign,
+                checkpoint=checkpoint, search_url=search_url, resume_state=campaign_resume, scheduler=scheduler,
+                search=search, pagination=pagination, seen=seen)
+            if two_tabs:
+                sent, stop_reason = send_with_two_tabs(lookahead=lookahead, blocked_urls=browser_profile.blocked_urls(), **campaign_args)
             else:
-                # Keep generic actively hiring flag and pass the text in the title parameter as before
-                search_url += "&facetActivelyHiring=true"
-                search_url += f"&title={actively_hiring.replace(' ','%20')}"
-        
-        search_url += "&origin=FACETED_SEARCH"
-        
-        print(Fore.YELLOW + f"[INFO] Navigating to search URL: {search_url}")
-        driver.get(search_url)
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "global-nav-typeahead")))
-        
-        if location != "" and not location_code:
-            select_location(driver, location)
-            
-        send_connection_request(driver=driver, limit=limit, letter=message, include_notes=include_note, message_letter=message_letter)
-        print(Fore.GREEN + "[INFO] Script completed successfully!")
+                sent, stop_reason = send_connection_request(watchdog=watchdog, recycle=recycle, **campaign_args)
+            budget -= sent - (campaign_resume or {}).get('connections_sent', 0)
+            if stop_reason == 'limit':
+                invites_exhausted = True
+            elif stop_reason == 'error':
+                # Leave the checkpoint of the failed campaign for --resume
+                break
+        log.success('done', "Script completed successfully!")
         
     except Exception as e:
-        print(Fore.RED + f"[ERROR] An error occurred in the main function: {e}")
-        traceback.print_exc()
+        log.exception('run_failed', "An error occurred in the main function: {error}", e, level=log.ERROR)
     finally:
+        if driver and network_stats.enabled:
+            network_stats.collect(driver)
+            log.info('summary', f"Network: {network_stats.summary()}")
+        for step, stats in waits.summary().items():
+            log.info('summary', "Wait '{step}': {count}x, avg {avg:.2f}s, max {max:.2f}s", step=step, **stats)
+        if waits.controller:
+            learned = ", ".join(f"{step} {seconds:.1f}s" for step, seconds in sorted(waits.controller.summary().items()))
+            if learned:
+                log.info('summary', f"Adaptive timeouts: {learned}")
+        for phase, stats in run_metrics.summary().items():
+            log.info('summary', "Phase '{phase}': {count}x, p50 {p50:.2f}s, p95 {p95:.2f}s", phase=phase, **stats)
+        log.info('summary', "Throughput: {rate:.1f} invites/messages per hour", rate=run_metrics.invites_per_hour())
+        if watchdog and watchdog.samples:
+            log.info('summary', "Watchdog: {samples} memory samples, {tabs} tab recycles, {restarts} browser restarts",
+                     samples=len(watchdog.samples), tabs=watchdog.recycled[RECYCLE_TAB], restarts=watchdog.recycled[RESTART_DRIVER])
+        if command_accounting:
+            pages = len(run_metrics.durations.get('discovery', []))
+            for line in command_accounting.report(run_metrics.actions, pages):
+                log.info('summary', line)
+        if isinstance(dom_backend, CdpBackend):
+            log.info('summary', "DevTools: {messages} messages for {actions} invites/messages",
+                     messages=dom_backend.messages, actions=run_metrics.actions)
+            dom_backend.close()
+        if harvest:
+            harvest.close()
+            for line in harvest.report(total_budget(input_config, campaigns)):
+                log.info('summary', "Harvest: " + line)
+        run_metrics.write_summary()
+        run_metrics.close()
+        try:
+            selector_registry.save()
+        except OSError as e:
+            log.warning('save_failed', "Could not save selector cache: {error}", error=str(e))
+        try:
+            waits.save()
+        except OSError as e:
+            log.warning('save_failed', "Could not save adaptive timeouts: {error}", error=str(e))
+        if ledger:
+            ledger.close()
         if driver:
-            print(Fore.YELLOW + "[INFO] Closing browser...")
+            # LinkedIn rotates li_at during a session, the next run starts from the latest one
+            save_cookie(driver)
+            log.info('shutdown', "Closing browser...")
             driver.quit()
+        log.drain()
 
 def create_default_input_config():
     """Create a default input configuration file"""
@@ -794,10 +1313,93 @@ def create_default_input_config():
         'limit': '10'
     }
     
+    input_config['Campaigns'] = {
+        'total_limit': '0'
+    }
+
     input_config['LinkedIn'] = {
         'li_at': 'YOUR_LI_AT_COOKIE_HERE'
     }
     
+    input_config['Browser'] = {
+        'headless': 'False',
+        'user_data_dir': '',
+        'window_size': '1366,900',
+        'driver_path': '',
+        'driver_manager': 'False',
+        'block_preset': 'none',
+        'block_urls': ''
+    }
+
+    input_config['Ledger'] = {
+        'path': 'ledger.sqlite3',
+        'retry_failed': 'False'
+    }
+
+    input_config['Metrics'] = {
+        'path': 'metrics.jsonl'
+    }
+
+    input_config['Execution'] = {
+        'mode': 'single_tab',
+        'lookahead': '20',
+        'backend': 'webdriver'
+    }
+
+    input_config['Pagination'] = {
+        'strategy': 'url'
+    }
+
+    input_config['Logging'] = {
+        'level': 'INFO',
+        'path': '',
+        'trace_interval': '60'
+    }
+
+    input_config['Session'] = {
+        'preflight': 'True',
+        'path': '.session.json',
+        'base_url': 'https://www.linkedin.com',
+        'timeout': '10'
+    }
+
+    input_config['Watchdog'] = {
+        'enabled': 'True',
+        'check_every': '10',
+        'tab_heap_mb': '400',
+        'tab_nodes': '100000',
+        'browser_rss_mb': '3000',
+        'latency_factor': '4'
+    }
+
+    input_config['Timeouts'] = {
+        'adaptive': 'True',
+        'percentile': '95',
+        'margin': '1.0',
+        'floor': '1.0',
+        'page_load_floor': '10',
+        'window': '50',
+        'state_file': '.timeouts.json'
+    }
+
+    input_config['Pacing'] = {
+        'action_delay': '0',
+        'jitter': '0',
+        'prefetch_depth': '3'
+    }
+
+    input_config['Schedule'] = {
+        'invites_per_minute': '4',
+        'invite_burst': '2',
+        'invites_per_hour': '60',
+        'invites_per_day': '200',
+        'messages_per_minute': '4',
+        'message_burst': '2',
+        'messages_per_hour': '60',
+        'messages_per_day': '200',
+        'wait_for_hourly_cap': 'True'
+    }
+
     input_config['Messages'] = {
         'include_note': 'True',
         'connection_message': 'Hi {name}, I noticed your profile and would like to connect. Best regards.',
@@ -808,14 +1410,6 @@ def create_default_input_config():
         input_config.write(f)
 
 if __name__ == "__main__":
-    try:
-        print(Fore.CYAN + "LinkedIn Auto Connector")
-        print(Fore.CYAN + "=====================")
-        main()
-    except KeyboardInterrupt:
-        print(Fore.YELLOW + "\n[INFO] Script terminated by user.")
-    except Exception as e:
-        print(Fore.RED + f"[ERROR] Unhandled exception: {e}")
-        traceback.print_exc()
-    finally:
-        print(Fore.GREEN + "[INFO] Script execution completed.")
+    # `python main.py [options]` is the same as `python cli.py run [options]`
+    import cli
+    sys.exit(cli.main(["run"] + sys.argv[1:]))
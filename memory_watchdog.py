@@ -0,0 +1,158 @@
+"""Browser memory watchdog for long runs.
+
+Hours of infinite-scroll results pages and messaging overlays keep growing
+the one Chrome tab of a run until the host swaps and every WebDriver
+command slows down. Every few actions the watchdog samples the tab's
+renderer (JS heap and DOM nodes through the DevTools Performance domain),
+the resident memory of the whole browser process tree and the round-trip
+time of a trivial command. It then tells the caller to recycle the tab,
+which frees the renderer, or to restart the browser, which frees
+everything; the caller logs back in and continues from the current page.
+"""
+import os
+import statistics
+import time
+
+RECYCLE_TAB = 'tab'
+RESTART_DRIVER = 'driver'
+
+# Round trips timed per sample, their median is the command latency
+_PROBES = 3
+# Latencies below this many ms are noise, not a slow browser
+_MIN_BASELINE_MS = 20
+
+
+def renderer_metrics(driver) -> dict:
+    """JS heap in MB and DOM node count of the current tab"""
+    driver.execute_cdp_cmd('Performance.enable', {})
+    metrics = {item['name']: item['value'] for item in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+    return {'heap_mb': round(metrics.get('JSHeapUsedSize', 0) / 2 ** 20, 1), 'nodes': int(metrics.get('Nodes', 0))}
+
+
+def _parent_pids() -> dict:
+    """pid -> parent pid of every process, empty where /proc is missing"""
+    parents = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return parents
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, the fields after it don't
+                fields = f.read().rsplit(')', 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return parents
+
+
+def process_tree_rss_mb(root_pid:int):
+    """Resident memory in MB of root_pid and all its descendants, None without /proc"""
+    parents = _parent_pids()
+    if root_pid not in parents:
+        return None
+    children = {}
+    for pid, parent in parents.items():
+        children.setdefault(parent, []).append(pid)
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return round(total / 2 ** 20, 1)
+
+
+def browser_rss_mb(driver):
+    """Resident memory of chromedriver and the Chrome processes it started"""
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return process_tree_rss_mb(process.pid) if process else None
+
+
+def command_latency_ms(driver) -> float:
+    """Median round trip of a no-op script"""
+    timings = []
+    for _ in range(_PROBES):
+        start = time.monotonic()
+        driver.execute_script("return 1;")
+        timings.append((time.monotonic() - start) * 1000)
+    return statistics.median(timings)
+
+
+class MemoryWatchdog:
+    """Decides from periodic samples whether the tab or the browser needs recycling"""
+
+    def __init__(self, check_every:int=10, tab_heap_mb:float=400, tab_nodes:int=100000,
+                 browser_rss_mb:float=3000, latency_factor:float=4):
+        self.check_every = max(1, check_every)
+        self.tab_heap_mb = tab_heap_mb
+        self.tab_nodes = tab_nodes
+        self.browser_rss_mb = browser_rss_mb
+        self.latency_factor = latency_factor
+        self.actions = 0
+        # Fastest command latency seen, what a fresh browser answers in
+        self.baseline_ms = None
+        self.samples = []
+        self.recycled = {RECYCLE_TAB: 0, RESTART_DRIVER: 0}
+
+    @classmethod
+    def from_config(cls, input_config):
+        """The [Watchdog] settings, None when it is disabled"""
+        if not input_config.getboolean('Watchdog', 'enabled', fallback=True):
+            return None
+        return cls(
+            check_every=input_config.getint('Watchdog', 'check_every', fallback=10),
+            tab_heap_mb=input_config.getfloat('Watchdog', 'tab_heap_mb', fallback=400),
+            tab_nodes=input_config.getint('Watchdog', 'tab_nodes', fallback=100000),
+            browser_rss_mb=input_config.getfloat('Watchdog', 'browser_rss_mb', fallback=3000),
+            latency_factor=input_config.getfloat('Watchdog', 'latency_factor', fallback=4),
+        )
+
+    def due(self) -> bool:
+        """Count an action, True every check_every actions"""
+        self.actions += 1
+        return self.actions % self.check_every == 0
+
+    def sample(self, driver) -> dict:
+        sample = {'latency_ms': command_latency_ms(driver), 'rss_mb': browser_rss_mb(driver)}
+        try:
+            sample.update(renderer_metrics(driver))
+        except Exception:
+            # Not a Chromium driver, only the RSS and latency checks apply
+            sample.update(heap_mb=None, nodes=None)
+        self.samples.append(sample)
+        return sample
+
+    def verdict(self, sample:dict):
+        """(RECYCLE_TAB or RESTART_DRIVER, reason), or (None, '') while everything is within limits"""
+        latency = sample['latency_ms']
+        baseline = max(self.baseline_ms or latency, _MIN_BASELINE_MS)
+        self.baseline_ms = latency if self.baseline_ms is None else min(self.baseline_ms, latency)
+        if sample['rss_mb'] is not None and sample['rss_mb'] > self.browser_rss_mb:
+            return RESTART_DRIVER, f"browser uses {sample['rss_mb']:.0f} MB"
+        if latency > baseline * self.latency_factor:
+            return RESTART_DRIVER, f"commands take {latency:.0f} ms instead of {baseline:.0f} ms"
+        if sample['heap_mb'] is not None and sample['heap_mb'] > self.tab_heap_mb:
+            return RECYCLE_TAB, f"tab JS heap is {sample['heap_mb']:.0f} MB"
+        if sample['nodes'] is not None and sample['nodes'] > self.tab_nodes:
+            return RECYCLE_TAB, f"tab holds {sample['nodes']} DOM nodes"
+        return None, ''
+
+    def check(self, driver):
+        """Sample the browser, returns (action, reason, sample)"""
+        sample = self.sample(driver)
+        how, reason = self.verdict(sample)
+        if how:
+            self.recycled[how] += 1
+            if how == RESTART_DRIVER:
+                # A fresh browser sets a new baseline
+                self.baseline_ms = None
+        return how, reason, sample
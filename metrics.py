@@ -0,0 +1,100 @@
+"""Per-phase timing spans written to a JSONL metrics file.
+
+Each span records one phase of the run (login, location filter, page
+navigation, card discovery, button click, modal handling, send) with its
+duration, outcome and the selector that was used. Records are appended to
+a JSONL file as they finish, and summary() gives p50/p95 per phase and the
+invite rate at the end of a run.
+"""
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+DEFAULT_METRICS_FILE = 'metrics.jsonl'
+
+# Phases whose successful spans count as a sent invite/message
+ACTION_PHASES = ('send',)
+
+
+def percentile(values:list, fraction:float) -> float:
+    """Nearest-rank percentile of values"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # The smallest value with at least fraction of the values at or below it. Rounded
+    # first so float noise such as 0.1 * 30 = 3.0000000000000004 doesn't skip a rank
+    rank = math.ceil(round(fraction * len(ordered), 9))
+    return ordered[max(0, min(len(ordered) - 1, rank - 1))]
+
+
+class Metrics:
+    """Collects spans for one run and appends them to a JSONL file"""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.durations = {}
+        self.actions = 0
+        self.file = None
+        self.lock = threading.Lock()
+        # Optional callable returning the running WebDriver command count
+        self.command_counter = None
+
+    def open(self, path:str=DEFAULT_METRICS_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'a', buffering=1)
+        return self
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def write(self, record:dict):
+        if self.file:
+            with self.lock:
+                self.file.write(json.dumps(record) + '\n')
+
+    @contextmanager
+    def span(self, phase:str, **fields):
+        """Time a phase, the yielded dict can be updated with outcome, selector, ..."""
+        record = {'outcome': 'ok'}
+        record.update(fields)
+        started = time.time()
+        start = time.monotonic()
+        commands_before = self.command_counter() if self.command_counter else 0
+        try:
+            yield record
+        except BaseException:
+            record['outcome'] = 'error'
+            raise
+        finally:
+            duration = time.monotonic() - start
+            self.durations.setdefault(phase, []).append(duration)
+            if phase in ACTION_PHASES and record['outcome'] == 'ok':
+                self.actions += 1
+            if self.command_counter:
+                record['commands'] = self.command_counter() - commands_before
+            self.write(dict(record, run=self.run_id, phase=phase, ts=round(started, 3),
+                            duration_ms=round(duration * 1000, 1)))
+
+    def invites_per_hour(self) -> float:
+        hours = (time.time() - self.started) / 3600
+        return self.actions / hours if hours > 0 else 0.0
+
+    def summary(self) -> dict:
+        """Count, p50 and p95 seconds per phase"""
+        return {
+            phase: {'count': len(values), 'p50': percentile(values, 0.5), 'p95': percentile(values, 0.95)}
+            for phase, values in self.durations.items()
+        }
+
+    def write_summary(self):
+        self.write({'run': self.run_id, 'phase': 'summary', 'ts': round(time.time(), 3),
+                    'invites_per_hour': round(self.invites_per_hour(), 1), 'phases': self.summary()})
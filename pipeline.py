@@ -0,0 +1,66 @@
+"""Candidate queue feeding the invite loop.
+
+Discovery (reading cards, turning pages) and action (clicking Connect or
+Message) used to run strictly one after the other, with the browser idle
+during the pacing delay. The queue lets the loop do discovery work inside
+the pacing window instead: the next few cards are checked and scrolled
+into place ahead of time, and an exhausted page is replaced by the next
+one before the delay runs out.
+"""
+from collections import deque
+
+from cards import FIND_BUTTON_JS
+
+# Checks which buttons are still actionable, re-finding re-rendered ones
+# inside their card, and scrolls the first one into view
+_RESOLVE_JS = FIND_BUTTON_JS + r"""
+const buttons = arguments[0].map(findButton);
+const ok = buttons.map(b => !!(b && b.isConnected && !b.disabled && b.getClientRects().length));
+const first = ok.indexOf(true);
+if (first >= 0) buttons[first].scrollIntoView({block: 'center'});
+return ok;
+"""
+
+
+class CandidateQueue:
+    """Cards of the current page, with up to `depth` of them resolved ahead of time"""
+
+    def __init__(self, depth:int=3):
+        self.depth = max(1, depth)
+        self.pending = deque()
+        self.ready = deque()
+        self.taken = 0
+
+    def load(self, cards:list, skip:int=0):
+        """Replace the queue with the cards of a freshly loaded page"""
+        self.pending = deque(cards[skip:])
+        self.ready.clear()
+        self.taken = skip
+
+    def __len__(self):
+        return len(self.ready) + len(self.pending)
+
+    def pop(self):
+        if not self.ready:
+            self.ready.append(self.pending.popleft())
+        self.taken += 1
+        return self.ready.popleft()
+
+    def prefetch(self, driver) -> int:
+        """Resolve the next cards' buttons in one script call, returns how many were dropped"""
+        batch = []
+        while self.pending and len(self.ready) + len(batch) < self.depth:
+            batch.append(self.pending.popleft())
+        if not batch:
+            return 0
+        resolvable = [card for card in batch if card.handle]
+        usable = driver.execute_script(_RESOLVE_JS, [card.ref() for card in resolvable]) if resolvable else []
+        status = dict(zip((id(card) for card in resolvable), usable))
+        dropped = 0
+        for card in batch:
+            if status.get(id(card), True):
+                self.ready.append(card)
+            else:
+                dropped += 1
+                self.taken += 1
+        return dropped
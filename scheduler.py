@@ -0,0 +1,131 @@
+"""Token bucket pacing with hourly and daily quotas.
+
+Invites and messages each get their own bucket: a per-minute rate with a
+small burst, plus hourly and daily caps. Sent actions are persisted, so the
+caps hold across runs, and the invite loop asks the scheduler before
+loading pages or clicking anything. A run stops cleanly once a cap is
+reached instead of discovering it from LinkedIn's invitation limit
+heading.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass
+
+DEFAULT_STATE_FILE = '.schedule_state.json'
+
+INVITE = 'invite'
+MESSAGE = 'message'
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+@dataclass
+class BucketLimits:
+    """Rate and caps of one action type"""
+    per_minute: float
+    burst: int
+    hourly: int
+    daily: int
+
+
+DEFAULT_LIMITS = {
+    INVITE: BucketLimits(per_minute=4, burst=2, hourly=60, daily=200),
+    MESSAGE: BucketLimits(per_minute=4, burst=2, hourly=60, daily=200),
+}
+
+
+class ActionScheduler:
+    """Per-action token buckets with persisted hourly and daily counts"""
+
+    def __init__(self, limits:dict=None, path:str=DEFAULT_STATE_FILE, wait_for_hourly_cap:bool=True):
+        self.limits = limits or dict(DEFAULT_LIMITS)
+        self.path = path
+        self.wait_for_hourly_cap = wait_for_hourly_cap
+        self.state = {}
+
+    @classmethod
+    def from_config(cls, input_config):
+        section = 'Schedule'
+        limits = {}
+        for kind, default in DEFAULT_LIMITS.items():
+            limits[kind] = BucketLimits(
+                per_minute=input_config.getfloat(section, f'{kind}s_per_minute', fallback=default.per_minute),
+                burst=input_config.getint(section, f'{kind}_burst', fallback=default.burst),
+                hourly=input_config.getint(section, f'{kind}s_per_hour', fallback=default.hourly),
+                daily=input_config.getint(section, f'{kind}s_per_day', fallback=default.daily),
+            )
+        return cls(
+            limits=limits,
+            path=input_config.get(section, 'state_file', fallback=DEFAULT_STATE_FILE),
+            wait_for_hourly_cap=input_config.getboolean(section, 'wait_for_hourly_cap', fallback=True),
+        )
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+        return self
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def _bucket(self, kind:str, now:float) -> dict:
+        """Bucket state with tokens refilled up to now and history trimmed to a day"""
+        limits = self.limits[kind]
+        bucket = self.state.setdefault(kind, {'tokens': limits.burst, 'updated': now, 'history': []})
+        elapsed = max(0.0, now - bucket['updated'])
+        bucket['tokens'] = min(limits.burst, bucket['tokens'] + elapsed * limits.per_minute / 60)
+        bucket['updated'] = now
+        bucket['history'] = [t for t in bucket['history'] if now - t < DAY]
+        return bucket
+
+    def remaining(self, kind:str) -> dict:
+        """Actions left in the current hour and day"""
+        now = time.time()
+        history = self._bucket(kind, now)['history']
+        limits = self.limits[kind]
+        last_hour = sum(1 for t in history if now - t < HOUR)
+        return {'hourly': limits.hourly - last_hour, 'daily': limits.daily - len(history)}
+
+    def can_act(self, kind:str) -> bool:
+        """False once the daily cap (or the hourly cap when not waiting for it) is reached"""
+        remaining = self.remaining(kind)
+        if remaining['daily'] <= 0:
+            return False
+        return remaining['hourly'] > 0 or self.wait_for_hourly_cap
+
+    def ready_in(self, kind:str) -> float:
+        """Seconds until the next action of this kind is allowed"""
+        now = time.time()
+        bucket = self._bucket(kind, now)
+        limits = self.limits[kind]
+        wait = 0.0
+        if bucket['tokens'] < 1:
+            wait = (1 - bucket['tokens']) * 60 / limits.per_minute
+        hour = sorted(t for t in bucket['history'] if now - t < HOUR)
+        if len(hour) >= limits.hourly:
+            # Wait until enough of the last hour's actions fall out of the window
+            wait = max(wait, hour[len(hour) - limits.hourly] + HOUR - now)
+        return wait
+
+    def wait_until_ready(self, kind:str) -> float:
+        """Block until a token is available, returns the seconds waited"""
+        wait = self.ready_in(kind)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, kind:str):
+        """Consume a token for an action that was just performed"""
+        now = time.time()
+        bucket = self._bucket(kind, now)
+        bucket['tokens'] = max(0.0, bucket['tokens'] - 1)
+        bucket['history'].append(now)
+        self.save()
@@ -0,0 +1,71 @@
+"""LinkedIn people search URLs with an explicit page cursor.
+
+SearchURL keeps the query parameters in their original order and encoding,
+so a URL built from the search criteria, or read back from the browser
+after filters were applied, can be moved to any page by swapping only the
+page parameter. Paginating is then one driver.get per page instead of
+looking for a Next button.
+"""
+from urllib.parse import urlsplit, urlunsplit
+
+SEARCH_BASE = "https://www.linkedin.com/search/results/people/"
+
+
+class SearchURL:
+    """A people search URL and the results page it points at"""
+
+    def __init__(self, base:str=SEARCH_BASE, params:list=None, page:int=1):
+        self.base = base
+        # (name, already encoded value) pairs, without the page parameter
+        self.params = list(params or [])
+        self.page = page
+
+    @classmethod
+    def from_criteria(cls, keyword:str, network_code:str, location:str='', location_code:str='', actively_hiring:str=''):
+        """Search URL for the [SearchCriteria] settings"""
+        search = cls()
+        search.add('keywords', keyword.replace(' ', '%20').lower())
+        if location_code:
+            search.add('geoUrn', f"%5B%22{location_code}%22%5D")
+        elif location:
+            search.add('locations', location.replace(' ', '%20'))
+        search.add('network', network_code)
+        if actively_hiring:
+            if actively_hiring.lower() in ['any job', 'any job title']:
+                # -100 is LinkedIn's internal code that represents "Any job title"
+                search.add('activelyHiringForJobTitles', "%5B%22-100%22%5D")
+            else:
+                # Generic actively hiring flag with the text in the title parameter
+                search.add('facetActivelyHiring', 'true')
+                search.add('title', actively_hiring.replace(' ', '%20'))
+        search.add('origin', 'FACETED_SEARCH')
+        return search
+
+    @classmethod
+    def from_url(cls, url:str):
+        """Parse a search URL, e.g. the browser's current URL after filters were applied"""
+        scheme, netloc, path, query, _ = urlsplit(url)
+        params = []
+        page = 1
+        for pair in query.split('&') if query else []:
+            name, _, value = pair.partition('=')
+            if name == 'page':
+                try:
+                    page = int(value)
+                except ValueError:
+                    pass
+            else:
+                params.append((name, value))
+        return cls(urlunsplit((scheme, netloc, path, '', '')), params, page)
+
+    def add(self, name:str, value:str):
+        self.params.append((name, value))
+
+    def url(self, page:int=None) -> str:
+        """URL of the given page, or of the cursor's page"""
+        page = self.page if page is None else page
+        params = self.params + ([('page', str(page))] if page > 1 else [])
+        return self.base + '?' + '&'.join(f"{name}={value}" for name, value in params)
+
+    def __str__(self):
+        return self.url()
@@ -0,0 +1,96 @@
+"""Learned ordering for the selector cascades.
+
+Every cascade (Connect buttons, Next button, profile links, ...) is a list of
+patterns tried in order until one matches, and each miss costs a full wait
+timeout. The registry remembers which patterns hit on previous runs and
+hands the cascade back best-first, so the useful query runs before the
+ones that never match on the current layout.
+"""
+import json
+import os
+import time
+
+DEFAULT_CACHE_FILE = '.selector_cache.json'
+
+# A pattern that has not hit for this long is demoted behind fresh ones
+STALE_AFTER_SECONDS = 7 * 24 * 3600
+# A pattern that missed this many times in a row is demoted as well
+MISS_STREAK_LIMIT = 5
+# Entries not touched for this long are dropped from the cache file
+FORGET_AFTER_SECONDS = 90 * 24 * 3600
+
+
+class SelectorRegistry:
+    """Hit/miss statistics for selector cascades, persisted between runs"""
+
+    def __init__(self, path:str=DEFAULT_CACHE_FILE):
+        self.path = path
+        self.stats = {}
+        self.dirty = False
+
+    def load(self):
+        """Load the cache file, a missing or broken file starts an empty cache"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.stats = data.get('cascades', {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            self.stats = {}
+        return self
+
+    def save(self):
+        """Write the cache atomically so an interrupted run can't corrupt it"""
+        if not self.dirty:
+            return
+        now = time.time()
+        for cascade in list(self.stats):
+            entries = self.stats[cascade]
+            for pattern in list(entries):
+                entry = entries[pattern]
+                if now - max(entry.get('last_hit', 0), entry.get('last_miss', 0)) > FORGET_AFTER_SECONDS:
+                    del entries[pattern]
+            if not entries:
+                del self.stats[cascade]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': 1, 'cascades': self.stats}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def record(self, cascade:str, pattern:str, hit:bool):
+        """Record the outcome of trying a pattern"""
+        entry = self.stats.setdefault(cascade, {}).setdefault(
+            pattern, {'hits': 0, 'misses': 0, 'miss_streak': 0, 'last_hit': 0, 'last_miss': 0}
+        )
+        now = time.time()
+        if hit:
+            entry['hits'] += 1
+            entry['miss_streak'] = 0
+            entry['last_hit'] = now
+        else:
+            entry['misses'] += 1
+            entry['miss_streak'] += 1
+            entry['last_miss'] = now
+        self.dirty = True
+
+    def score(self, cascade:str, pattern:str) -> float:
+        """Smoothed hit rate, quartered for stale entries"""
+        entry = self.stats.get(cascade, {}).get(pattern)
+        if not entry:
+            # Untried patterns rank between known hits and known misses
+            return 0.5
+        rate = (entry['hits'] + 1) / (entry['hits'] + entry['misses'] + 2)
+        if self.is_stale(entry):
+            rate *= 0.25
+        return rate
+
+    @staticmethod
+    def is_stale(entry:dict) -> bool:
+        if entry['miss_streak'] >= MISS_STREAK_LIMIT:
+            return True
+        return entry['hits'] > 0 and time.time() - entry['last_hit'] > STALE_AFTER_SECONDS
+
+    def ordered(self, cascade:str, patterns:list) -> list:
+        """Return the patterns best-first, ties keep their original order"""
+        ranked = sorted(enumerate(patterns), key=lambda item: (-self.score(cascade, item[1]), item[0]))
+        return [pattern for _, pattern in ranked]
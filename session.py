@@ -0,0 +1,142 @@
+"""LinkedIn session cookie store and browserless pre-flight check.
+
+The li_at cookie used to be read from input_config.ini while the refreshed
+one after a login was written to setup.ini, so every run started from the
+cookie the user pasted, however stale. SessionStore is now the one place
+the cookie is read from and saved to (.session.json). A cookie newly
+pasted into [LinkedIn] li_at still wins over the saved one.
+
+check_session() asks the feed for the cookie with a single HTTP request
+and classifies it as valid, expired or challenged before any browser is
+started, so an expired cookie goes straight to the credential login
+instead of costing a Chrome start and a page load timeout. The base URL
+is configurable, `python simulator.py --session expired` serves a stub.
+"""
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+DEFAULT_SESSION_FILE = '.session.json'
+LINKEDIN_URL = 'https://www.linkedin.com'
+
+VALID = 'valid'
+EXPIRED = 'expired'
+CHALLENGED = 'challenged'
+# Network errors, rate limiting or an answer that says nothing about the cookie
+UNKNOWN = 'unknown'
+
+# Values of [LinkedIn] li_at that mean no cookie was pasted
+PLACEHOLDERS = ('', '###', 'YOUR_LI_AT_COOKIE_HERE')
+
+# Where LinkedIn sends a request whose session is no longer accepted
+_LOGIN_PATHS = ('/login', '/uas/login', '/authwall', '/signup')
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+
+def classify(status_code:int, location:str='', set_li_at:str=None) -> tuple:
+    """(VALID, EXPIRED, CHALLENGED or UNKNOWN, detail) of one answer of the feed"""
+    if set_li_at is not None and set_li_at.strip('"') == 'delete me':
+        return EXPIRED, "LinkedIn cleared the cookie"
+    if 300 <= status_code < 400:
+        path = urlparse(location).path
+        if path.startswith('/checkpoint/'):
+            return CHALLENGED, f"LinkedIn asks for a security check ({path})"
+        if path.startswith(_LOGIN_PATHS):
+            return EXPIRED, f"redirected to the login ({path})"
+        return UNKNOWN, f"redirected to {location}"
+    if status_code == 200:
+        return VALID, "the feed loaded"
+    if status_code in (401, 403):
+        return EXPIRED, f"HTTP {status_code}"
+    # 999 is LinkedIn refusing automated clients, 429 rate limiting
+    return UNKNOWN, f"HTTP {status_code}"
+
+
+def check_session(li_at:str, base_url:str=LINKEDIN_URL, timeout:float=10) -> tuple:
+    """Classify li_at with one request to the feed, without a browser"""
+    if not li_at:
+        return EXPIRED, "no li_at cookie"
+    import requests
+    try:
+        response = requests.get(base_url.rstrip('/') + '/feed/', cookies={'li_at': li_at},
+                                headers={'User-Agent': USER_AGENT}, allow_redirects=False, timeout=timeout)
+    except requests.RequestException as e:
+        return UNKNOWN, str(e) or type(e).__name__
+    return classify(response.status_code, response.headers.get('Location', ''), response.cookies.get('li_at'))
+
+
+class SessionStore:
+    """The account's li_at cookie and the outcome of its last check, persisted between runs"""
+
+    def __init__(self, path:str=DEFAULT_SESSION_FILE, configured:str='', legacy:str=''):
+        self.path = path
+        # [LinkedIn] li_at of input_config.ini, and the one older versions saved to setup.ini
+        self.configured = '' if configured in PLACEHOLDERS else configured
+        self.legacy = '' if legacy in PLACEHOLDERS else legacy
+        self.li_at = ''
+        # The configured cookie at the time li_at was saved
+        self.seeded_from = ''
+        self.status = None
+        self.detail = ''
+        self.checked_at = 0
+
+    @classmethod
+    def from_config(cls, input_config, setup_config=None):
+        return cls(
+            path=input_config.get('Session', 'path', fallback=DEFAULT_SESSION_FILE),
+            configured=input_config.get('LinkedIn', 'li_at', fallback='').strip(),
+            legacy=setup_config.get('LinkedIn', 'li_at', fallback='').strip() if setup_config else '',
+        )
+
+    def load(self):
+        """Load the saved session, a missing or broken file starts from the configured cookie"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                data = {}
+        except (OSError, ValueError):
+            data = {}
+        self.li_at = data.get('li_at', '')
+        self.seeded_from = data.get('seeded_from', '')
+        self.status = data.get('status')
+        self.detail = data.get('detail', '')
+        self.checked_at = data.get('checked_at', 0)
+        if not self.li_at and self.legacy:
+            self.li_at = self.legacy
+            self.seeded_from = self.configured
+        return self
+
+    @property
+    def cookie(self) -> str:
+        """The cookie to log in with: the saved one, unless a new one was pasted into the config since"""
+        if self.configured and self.configured != self.seeded_from:
+            return self.configured
+        return self.li_at or self.configured
+
+    def save(self, li_at:str):
+        """Remember the cookie the browser holds after a login"""
+        if not li_at or (li_at == self.li_at and self.seeded_from == self.configured):
+            return
+        self.li_at = li_at
+        self.seeded_from = self.configured
+        self._write()
+
+    def record(self, status:str, detail:str=''):
+        """Remember the outcome of a pre-flight check"""
+        self.status = status
+        self.detail = detail
+        self.checked_at = time.time()
+        self._write()
+
+    def _write(self):
+        """Write the session atomically, readable by the user only since it holds the cookie"""
+        tmp_path = self.path + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'version': 1, 'li_at': self.li_at, 'seeded_from': self.seeded_from, 'status': self.status,
+                       'detail': self.detail, 'checked_at': self.checked_at}, f, indent=1)
+        os.replace(tmp_path, self.path)
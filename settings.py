@@ -0,0 +1,197 @@
+"""Campaign settings read from input_config.ini, without any browser imports.
+
+CampaignSettings holds what main() needs to start a campaign: the search
+criteria, the messages and the search URL built from them. problems() and
+config_problems() report configuration mistakes up front, so
+`python cli.py validate` can check a config in milliseconds instead of after
+Chrome started and logged in.
+
+Several campaigns can be listed as [Campaign <name>] sections. Each one
+overrides any [SearchCriteria] or [Messages] option, and all of them run
+back to back in one browser session.
+"""
+import re
+from dataclasses import dataclass
+
+from browser import BrowserProfile
+from locations import GeoUrnCache
+from scheduler import ActionScheduler, INVITE, MESSAGE
+from search_url import SearchURL
+
+INPUT_CONFIG_FILE = 'input_config.ini'
+SETUP_CONFIG_FILE = 'setup.ini'
+
+SEARCH_SECTION = 'SearchCriteria'
+MESSAGES_SECTION = 'Messages'
+CAMPAIGN_PREFIX = 'Campaign '
+
+NETWORK_CODES = {
+    "1st": "%5B%22F%22%5D",
+    "2nd": "%5B%22S%22%5D",
+    "3rd": "%5B%22O%22%5D",
+}
+DEFAULT_DEGREE = '2nd'
+
+PAGINATION_STRATEGIES = ('url', 'buttons')
+EXECUTION_MODES = ('single_tab', 'two_tabs')
+DOM_BACKENDS = ('webdriver', 'cdp')
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+# LinkedIn rejects invitation notes longer than this
+NOTE_MAX_LENGTH = 300
+# First name length assumed when checking a note against the limit
+LONG_FIRST_NAME = 20
+
+TEMPLATE_FIELDS = ('name', 'fullName')
+_PLACEHOLDER = re.compile(r'\{([^{}]*)\}')
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+def render_template(template:str, first_name:str) -> str:
+    """Fill the {name} and {fullName} placeholders of a note or message"""
+    return template.replace("{name}", first_name).replace("{fullName}", first_name)
+
+
+@dataclass
+class CampaignSettings:
+    """[SearchCriteria] and [Messages] settings of one campaign"""
+    connection_degree: str = DEFAULT_DEGREE
+    keyword: str = ''
+    location: str = ''
+    location_code: str = ''
+    limit: int = 10
+    campaign: str = ''
+    actively_hiring: str = 'Any job title'
+    include_note: bool = False
+    message: str = ''
+    message_letter: str = ''
+    pagination: str = 'url'
+    section: str = SEARCH_SECTION
+
+    @classmethod
+    def from_config(cls, input_config, geo_cache:GeoUrnCache=None, section:str=SEARCH_SECTION):
+        def option(getter, name, fallback, default_section=SEARCH_SECTION):
+            """The campaign section's value, else the shared section's"""
+            return getter(section, name, fallback=getter(default_section, name, fallback=fallback))
+
+        connection_degree = option(input_config.get, 'connection_degree', DEFAULT_DEGREE)
+        keyword = option(input_config.get, 'keyword', '')
+        location = option(input_config.get, 'location', '')
+
+        # Message letters only go to 1st connections, otherwise an optional invitation note
+        message_letter = ''
+        include_note = False
+        message = ''
+        if connection_degree.lower() == '1st':
+            message_letter = option(input_config.get, 'message_letter', '', MESSAGES_SECTION)
+        if message_letter == "":
+            include_note = option(input_config.getboolean, 'include_note', False, MESSAGES_SECTION)
+            if include_note:
+                message = option(input_config.get, 'connection_message', '', MESSAGES_SECTION)
+
+        if section.startswith(CAMPAIGN_PREFIX):
+            campaign = input_config.get(section, 'campaign', fallback=section[len(CAMPAIGN_PREFIX):].strip())
+        else:
+            campaign = input_config.get(section, 'campaign', fallback=keyword)
+
+        return cls(
+            connection_degree=connection_degree,
+            keyword=keyword,
+            location=location,
+            location_code=geo_cache.get(location) if geo_cache and location else '',
+            limit=option(input_config.getint, 'limit', 10),
+            campaign=campaign,
+            actively_hiring=option(input_config.get, 'actively_hiring', 'Any job title'),
+            include_note=include_note,
+            message=message,
+            message_letter=message_letter,
+            pagination=input_config.get('Pagination', 'strategy', fallback='url'),
+            section=section,
+        )
+
+    @property
+    def network_code(self) -> str:
+        return NETWORK_CODES.get(self.connection_degree.lower(), NETWORK_CODES[DEFAULT_DEGREE])
+
+    @property
+    def action(self) -> str:
+        """Scheduler bucket of the campaign's actions"""
+        return MESSAGE if self.message_letter else INVITE
+
+    @property
+    def template(self) -> str:
+        """The note or message sent to every profile, '' when none"""
+        return self.message_letter or self.message
+
+    def search(self) -> SearchURL:
+        return SearchURL.from_criteria(self.keyword, self.network_code, self.location, self.location_code, self.actively_hiring)
+
+    def problems(self, input_config=None) -> list:
+        """(ERROR or WARNING, text) for every configuration mistake found"""
+        problems = []
+        if self.connection_degree.lower() not in NETWORK_CODES:
+            problems.append((WARNING, f"Invalid connection degree '{self.connection_degree}'. Using default ({DEFAULT_DEGREE})."))
+        if not self.keyword.strip():
+            problems.append((ERROR, "keyword is empty"))
+        if self.limit <= 0:
+            problems.append((ERROR, f"limit must be positive, got {self.limit}"))
+        if self.location and not self.location_code:
+            problems.append((WARNING, f"No geoUrn known for location '{self.location}', it will be picked in the filter UI once"))
+        if self.pagination not in PAGINATION_STRATEGIES:
+            problems.append((WARNING, f"Unknown pagination strategy '{self.pagination}'. Using 'url'."))
+        if self.include_note and not self.message:
+            problems.append((WARNING, "include_note is True but connection_message is empty"))
+
+        for field in sorted(set(_PLACEHOLDER.findall(self.template)) - set(TEMPLATE_FIELDS)):
+            problems.append((ERROR, f"Unknown placeholder {{{field}}} in the message, use {{name}}"))
+        if self.message:
+            length = len(render_template(self.message, 'x' * LONG_FIRST_NAME))
+            if length > NOTE_MAX_LENGTH:
+                problems.append((ERROR, f"connection_message is {length} characters with a {LONG_FIRST_NAME}-character "
+                                        f"name, LinkedIn allows {NOTE_MAX_LENGTH}"))
+
+        if input_config is not None:
+            message_letter = input_config.get(self.section, 'message_letter',
+                                              fallback=input_config.get(MESSAGES_SECTION, 'message_letter', fallback=''))
+            if self.connection_degree.lower() != '1st' and message_letter:
+                problems.append((WARNING, "message_letter is only sent to 1st connections and is ignored for this search"))
+        return problems
+
+
+def config_problems(input_config) -> list:
+    """(ERROR or WARNING, text) for the session-wide options, shared by all campaigns"""
+    problems = []
+    mode = input_config.get('Execution', 'mode', fallback='single_tab')
+    if mode not in EXECUTION_MODES:
+        problems.append((ERROR, f"Unknown execution mode '{mode}', use one of: {', '.join(EXECUTION_MODES)}"))
+    backend = input_config.get('Execution', 'backend', fallback='webdriver')
+    if backend not in DOM_BACKENDS:
+        problems.append((ERROR, f"Unknown backend '{backend}', use one of: {', '.join(DOM_BACKENDS)}"))
+    level = input_config.get('Logging', 'level', fallback='INFO')
+    if level.upper() not in LOG_LEVELS:
+        problems.append((WARNING, f"Unknown log level '{level}', use one of: {', '.join(LOG_LEVELS)}. Using INFO."))
+    percentile = input_config.getfloat('Timeouts', 'percentile', fallback=95)
+    if not 0 < percentile <= 100:
+        problems.append((ERROR, f"[Timeouts] percentile must be between 0 and 100, got {percentile:g}"))
+    for action, limits in ActionScheduler.from_config(input_config).limits.items():
+        if limits.per_minute <= 0:
+            problems.append((ERROR, f"[Schedule] {action}s_per_minute must be positive, got {limits.per_minute:g}"))
+    try:
+        BrowserProfile.from_config(input_config).blocked_urls()
+    except ValueError as e:
+        problems.append((ERROR, str(e)))
+    return problems
+
+
+def load_campaigns(input_config, geo_cache:GeoUrnCache=None) -> list:
+    """Settings of every [Campaign <name>] section, or of [SearchCriteria] when there are none"""
+    sections = [section for section in input_config.sections() if section.startswith(CAMPAIGN_PREFIX)]
+    return [CampaignSettings.from_config(input_config, geo_cache, section) for section in sections or [SEARCH_SECTION]]
+
+
+def total_budget(input_config, campaigns:list) -> int:
+    """Actions allowed over all campaigns of a session, [Campaigns] total_limit or the sum of their limits"""
+    total_limit = input_config.getint('Campaigns', 'total_limit', fallback=0)
+    return total_limit if total_limit > 0 else sum(campaign.limit for campaign in campaigns)
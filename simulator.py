@@ -0,0 +1,463 @@
+"""Local stand-in for LinkedIn people search, for repeatable benchmarks.
+
+The simulator serves generated search result pages that follow the DOM
+contracts the script relies on: entity-result cards with Connect/Message
+buttons, artdeco-pagination, the location filter and its typeahead, the
+"Add a note"/"Send invitation" modal, the "Got it" popup, the
+invitation-limit heading and the messaging overlay. Page latency, dialog
+latency, result counts and failure rates are configurable, and the
+generated people only depend on the seed, so two runs see the same pages.
+The feed answers like LinkedIn does for a valid, expired or challenged
+session cookie, for the pre-flight check.
+
+Usage:
+    python simulator.py --results 200 --latency 300 --failure-rate 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote
+
+from locations import BUNDLED_GEO_URNS, geo_urn_from_url
+
+FIRST_NAMES = ['Alex', 'Priya', 'Jordan', 'Mei', 'Carlos', 'Fatima', 'Liam', 'Aisha', 'Noah', 'Sofia',
+               'Ravi', 'Emma', 'Kenji', 'Olivia', 'Mateo', 'Zara', 'Ethan', 'Lena', 'Omar', 'Chloe']
+LAST_NAMES = ['Smith', 'Patel', 'Garcia', 'Chen', 'Müller', 'Khan', 'Johnson', 'Rossi', 'Kim', 'Silva',
+              'Nguyen', 'Brown', 'Sato', 'Ivanova', 'Okafor', 'Dubois', 'Cohen', 'Larsen', 'Haddad', 'Walsh']
+HEADLINES = ['Software Engineer', 'Data Scientist', 'Technical Recruiter', 'Product Manager',
+             'Machine Learning Engineer', 'Engineering Manager', 'DevOps Engineer', 'UX Designer']
+CITIES = ['Toronto, Ontario', 'Bengaluru, Karnataka', 'London, England', 'Berlin, Germany',
+          'Sydney, New South Wales', 'San Francisco, California', 'New York, New York']
+
+MESSAGE_CLOSE_CLASS = ('msg-overlay-bubble-header__control artdeco-button artdeco-button--circle '
+                       'artdeco-button--muted artdeco-button--1 artdeco-button--tertiary ember-view')
+
+
+@dataclass
+class SimulatorConfig:
+    """Shape and behaviour of the simulated search"""
+    # Results of a search and how many fit on one page
+    results: int = 100
+    page_size: int = 10
+    # Server delay of every page load, and client delay before a dialog or typeahead shows
+    page_latency_ms: int = 300
+    dialog_latency_ms: int = 150
+    typeahead_latency_ms: int = 200
+    # Share of the cards with a Message (1st), Pending or Follow button; the rest show Connect
+    message_rate: float = 0.1
+    pending_rate: float = 0.05
+    follow_rate: float = 0.05
+    # Chance that a page shows the "Got it" popup, that a click opens nothing and that a send fails
+    got_it_rate: float = 0.05
+    click_failure_rate: float = 0.0
+    send_failure_rate: float = 0.0
+    # Show the invitation limit after this many invites (0 for never)
+    invite_limit: int = 0
+    seed: int = 1
+    # How the feed treats the session cookie: 'valid', 'expired' or 'challenged'
+    session: str = 'valid'
+
+
+class Simulator:
+    """Generated people and the invites and messages sent to them"""
+
+    def __init__(self, config:SimulatorConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.invited = set()
+        self.messaged = set()
+        self.pages_served = 0
+
+    def person(self, geo:str, index:int) -> dict:
+        rng = random.Random(f"{self.config.seed}:{geo}:{index}")
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        slug = f"{first}-{last}-{geo or 'any'}-{index}".lower().replace('ü', 'u')
+        roll = rng.random()
+        if roll < self.config.message_rate:
+            kind, degree = 'Message', '1st'
+        elif roll < self.config.message_rate + self.config.pending_rate:
+            kind, degree = 'Pending', '2nd'
+        elif roll < self.config.message_rate + self.config.pending_rate + self.config.follow_rate:
+            kind, degree = 'Follow', '3rd'
+        else:
+            kind, degree = 'Connect', rng.choice(['2nd', '2nd', '3rd'])
+        person = {
+            'name': f"{first} {last}",
+            'slug': slug,
+            'urn': f"urn:li:fsd_profile:SIM{zlib.crc32(slug.encode()):08X}",
+            'headline': f"{rng.choice(HEADLINES)} at {rng.choice(['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli'])}",
+            'location': rng.choice(CITIES),
+            'degree': degree,
+            'kind': kind,
+        }
+        with self.lock:
+            if kind == 'Connect' and slug in self.invited:
+                person = dict(person, kind='Pending')
+        return person
+
+    def people(self, geo:str, page:int) -> list:
+        start = (page - 1) * self.config.page_size
+        return [self.person(geo, index) for index in range(start, min(start + self.config.page_size, self.config.results))]
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.config.results // self.config.page_size))
+
+    def record(self, kind:str, slug:str) -> dict:
+        with self.lock:
+            (self.invited if kind == 'invite' else self.messaged).add(slug)
+            return self.stats()
+
+    def stats(self) -> dict:
+        return {'invites': len(self.invited), 'messages': len(self.messaged), 'pages': self.pages_served}
+
+    def client_config(self, page:int) -> str:
+        config = dict(asdict(self.config), page=page, pages=self.pages, sent=len(self.invited),
+                      locations={name.title(): urn for name, urn in BUNDLED_GEO_URNS.items()})
+        return f"window.__sim = {json.dumps(config)};"
+
+    def action_button(self, person:dict) -> str:
+        if person['kind'] == 'Connect':
+            return (f'<button class="artdeco-button artdeco-button--2 artdeco-button--secondary" '
+                    f'aria-label="Invite {escape(person["name"])} to connect"><span class="artdeco-button__text">Connect</span></button>')
+        if person['kind'] == 'Pending':
+            return (f'<button class="artdeco-button artdeco-button--2" disabled '
+                    f'aria-label="Pending, click to withdraw invitation sent to {escape(person["name"])}"><span class="artdeco-button__text">Pending</span></button>')
+        return (f'<button class="artdeco-button artdeco-button--2 artdeco-button--secondary" '
+                f'aria-label="{person["kind"]} {escape(person["name"])}"><span class="artdeco-button__text">{person["kind"]}</span></button>')
+
+    def card(self, person:dict) -> str:
+        return f"""
+<li class="reusable-search__result-container">
+  <div class="entity-result" data-chameleon-result-urn="{person['urn']}">
+    <div class="entity-result__item">
+      <div class="entity-result__title-line">
+        <span class="entity-result__title-text">
+          <a class="app-aware-link" href="/in/{person['slug']}/"><span aria-hidden="true">{escape(person['name'])}</span><span class="visually-hidden">View {escape(person['name'])}'s profile</span></a>
+        </span>
+        <span class="entity-result__badge-text"><span aria-hidden="true">• {person['degree']}</span></span>
+      </div>
+      <div class="entity-result__primary-subtitle">{escape(person['headline'])}</div>
+      <div class="entity-result__secondary-subtitle">{escape(person['location'])}</div>
+      <div class="entity-result__actions"><div>{self.action_button(person)}</div></div>
+    </div>
+  </div>
+</li>"""
+
+    def pagination(self, page:int) -> str:
+        items = []
+        for number in range(max(1, page - 4), min(self.pages, page + 4) + 1):
+            current = ' active selected' if number == page else ''
+            items.append(f'<li class="artdeco-pagination__indicator{current}">'
+                         f'<button aria-label="Page {number}"><span>{number}</span></button></li>')
+        pages = ''.join(items)
+        disabled = ' disabled' if page >= self.pages else ''
+        return f"""
+<div class="artdeco-pagination">
+  <button aria-label="Previous" class="artdeco-pagination__button artdeco-pagination__button--previous"{' disabled' if page <= 1 else ''}><span>Previous</span></button>
+  <ul class="artdeco-pagination__pages">{pages}</ul>
+  <button aria-label="Next" class="artdeco-pagination__button artdeco-pagination__button--next"{disabled}><span>Next</span></button>
+</div>"""
+
+    def document(self, title:str, body:str, page:int=1) -> str:
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{escape(title)}</title><style>{_SIM_CSS}</style></head>
+<body>
+<header><div id="global-nav-typeahead"><input placeholder="Search"></div></header>
+{body}
+<script>{self.client_config(page)}{_SIM_JS}</script>
+</body></html>"""
+
+    def search_page(self, url:str) -> str:
+        page = int(parse_qs(urlparse(url).query).get('page', ['1'])[0])
+        geo = geo_urn_from_url(url)
+        people = self.people(geo, page) if page <= self.pages else []
+        if not people:
+            main = '<main><div class="search-reusable-search-no-results"><h2>No results found</h2></div></main>'
+        else:
+            main = (f'<main><div class="search-results-container"><h2 class="pb2">About {self.config.results} results</h2>'
+                    f'<ul class="reusable-search__entity-result-list">{"".join(self.card(person) for person in people)}</ul>'
+                    f'{self.pagination(page)}</div></main>')
+        filters = """
+<div class="search-reusable-search__filters-bar">
+  <button id="searchFilter_geoUrn" class="artdeco-pill">Locations</button>
+  <div id="sim-location-dropdown" class="artdeco-hoverable-content" hidden>
+    <input placeholder="Add a location" aria-label="Add a location">
+    <div class="sim-hits"></div>
+    <button aria-label="Show results" class="artdeco-button"><span>Show results</span></button>
+  </div>
+</div>"""
+        return self.document(f"Search | page {page}", filters + main, page)
+
+
+def make_handler(simulator:Simulator):
+    """Request handler class serving the simulated LinkedIn"""
+
+    class SimulatorHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, body:str, content_type:str='text/html', status:int=200):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type + '; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/__sim__/stats':
+                return self.send_body(json.dumps(simulator.stats()), 'application/json')
+            time.sleep(simulator.config.page_latency_ms / 1000)
+            with simulator.lock:
+                simulator.pages_served += 1
+            if url.path.startswith('/search/results/people'):
+                return self.send_body(simulator.search_page(self.path))
+            if url.path in ('/', '/feed/'):
+                if simulator.config.session == 'expired':
+                    return self.redirect('/authwall?trk=feed', clear_session=True)
+                if simulator.config.session == 'challenged':
+                    return self.redirect('/checkpoint/challenge/simulated')
+                return self.send_body(simulator.document('Feed', '<main><h2>Feed</h2></main>'))
+            self.send_body('', status=404)
+
+        def redirect(self, location:str, clear_session:bool=False):
+            self.send_response(302)
+            self.send_header('Location', location)
+            if clear_session:
+                self.send_header('Set-Cookie', 'li_at="delete me"; Path=/; Expires=Thu, 01 Jan 1970 00:00:00 GMT')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if url.path in ('/__sim__/invite', '/__sim__/message'):
+                stats = simulator.record(url.path.rsplit('/', 1)[1], payload.get('slug', ''))
+                return self.send_body(json.dumps(stats), 'application/json')
+            self.send_body('', status=404)
+
+    return SimulatorHandler
+
+
+def start_simulator(config:SimulatorConfig=None, port:int=0):
+    """Serve a simulator on a background thread, returns the server with its .simulator"""
+    simulator = Simulator(config or SimulatorConfig())
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(simulator))
+    server.simulator = simulator
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def search_url(server, page:int=1, keywords:str='simulated') -> str:
+    host, port = server.server_address[:2]
+    url = f"http://{host}:{port}/search/results/people/?keywords={quote(keywords)}&origin=FACETED_SEARCH"
+    return url + (f"&page={page}" if page > 1 else '')
+
+
+_SIM_CSS = """
+body { font-family: sans-serif; margin: 0; }
+.entity-result { padding: 12px; border-bottom: 1px solid #ddd; min-height: 80px; }
+.artdeco-modal, .msg-overlay-conversation-bubble, .sim-popup { position: fixed; background: #fff; border: 1px solid #999; padding: 16px; z-index: 10; }
+.artdeco-modal { top: 20%; left: 30%; width: 40%; }
+.msg-overlay-conversation-bubble { bottom: 0; right: 20px; width: 340px; }
+.sim-popup { top: 10px; right: 10px; }
+.artdeco-pagination { padding: 24px; }
+.artdeco-pagination__pages, .artdeco-pagination__pages li { display: inline; list-style: none; }
+.visually-hidden { position: absolute; width: 1px; height: 1px; overflow: hidden; clip: rect(0 0 0 0); }
+"""
+
+# Plays LinkedIn's part in the page: dialogs, typeahead, pagination and sends.
+# Random outcomes come from a generator seeded with the seed and the page, so
+# reruns against the same simulator behave the same way.
+_SIM_JS = r"""
+(function () {
+    const sim = window.__sim;
+    let state = (sim.seed * 7919 + sim.page * 104729) >>> 0;
+    function rand() {
+        state = (state + 0x6D2B79F5) >>> 0;
+        let t = state;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    }
+    let sent = sim.sent;
+    let actedButton = null;
+
+    function later(fn, ms) { setTimeout(fn, ms); }
+    function post(path, slug) {
+        return fetch(path, {method: 'POST', body: JSON.stringify({slug: slug})});
+    }
+    function slugOf(btn) {
+        const card = btn.closest('.entity-result');
+        const link = card ? card.querySelector('a[href*="/in/"]') : null;
+        const path = link ? link.getAttribute('href') : location.pathname;
+        return path.split('/').filter(Boolean)[1] || '';
+    }
+    function dialog(html, label) {
+        closeDialogs();
+        const modal = document.createElement('div');
+        modal.className = 'artdeco-modal';
+        modal.setAttribute('role', 'dialog');
+        modal.setAttribute('aria-label', label);
+        modal.innerHTML = html;
+        document.body.appendChild(modal);
+        return modal;
+    }
+    function closeDialogs() {
+        document.querySelectorAll('.artdeco-modal').forEach(el => el.remove());
+    }
+    function goToPage(page) {
+        const params = new URLSearchParams(location.search);
+        params.set('page', page);
+        location.search = params.toString();
+    }
+
+    const CONNECT_MODAL = '<h2>Add a note to your invitation?</h2>' +
+        '<button aria-label="Dismiss" class="artdeco-modal__dismiss">×</button>' +
+        '<button aria-label="Add a note" class="artdeco-button"><span>Add a note</span></button>' +
+        '<button aria-label="Send without a note" class="artdeco-button artdeco-button--primary"><span>Send without a note</span></button>';
+    const NOTE_MODAL = '<h2>Add a note</h2>' +
+        '<button aria-label="Dismiss" class="artdeco-modal__dismiss">×</button>' +
+        '<textarea name="message" maxlength="300"></textarea>' +
+        '<button aria-label="Send invitation" class="artdeco-button artdeco-button--primary"><span>Send</span></button>';
+    const LIMIT_MODAL = '<h2>No free personalized invitations left</h2>' +
+        '<p>You have used all of your personalized invitations for this month.</p>' +
+        '<button aria-label="Close" class="artdeco-button"><span>Close</span></button>';
+    const MESSAGE_OVERLAY = '<div class="msg-overlay-bubble-header"><span>New message</span>' +
+        '<button class="MESSAGE_CLOSE_CLASS"><span>Close</span></button></div>' +
+        '<div role="textbox" contenteditable="true" class="msg-form__contenteditable"></div>' +
+        '<button class="msg-form__send-button artdeco-button">Send</button>';
+
+    if (rand() < sim.got_it_rate) {
+        const popup = document.createElement('div');
+        popup.className = 'sim-popup';
+        popup.setAttribute('role', 'alert');
+        popup.innerHTML = '<p>Tip: add a note to personalize your invitation.</p><button aria-label="Got it">Got it</button>';
+        document.body.appendChild(popup);
+    }
+
+    // Location filter: pill, typeahead and "Show results"
+    const dropdown = document.getElementById('sim-location-dropdown');
+    let chosenGeo = null;
+    if (dropdown) {
+        const input = dropdown.querySelector('input');
+        const hits = dropdown.querySelector('.sim-hits');
+        input.addEventListener('input', () => {
+            const typed = input.value.trim().toLowerCase();
+            later(() => {
+                const names = Object.keys(sim.locations).filter(name => typed && name.toLowerCase().startsWith(typed));
+                if (typed && !names.length) names.push(input.value.trim().replace(/\b\w/g, c => c.toUpperCase()));
+                hits.innerHTML = names.map(name =>
+                    '<div class="basic-typeahead__selectable"><span class="search-typeahead-v2__hit-info">' + name + '</span></div>').join('');
+            }, sim.typeahead_latency_ms);
+        });
+        hits.addEventListener('click', event => {
+            const hit = event.target.closest('.basic-typeahead__selectable');
+            if (!hit) return;
+            const name = hit.innerText.trim();
+            let urn = sim.locations[name];
+            if (!urn) {
+                urn = 0;
+                for (const c of name) urn = (urn * 31 + c.charCodeAt(0)) % 100000000;
+                urn = String(100000000 + urn);
+            }
+            chosenGeo = urn;
+            input.value = name;
+        });
+    }
+
+    document.addEventListener('click', function (event) {
+        const btn = event.target.closest('button');
+        if (!btn) return;
+        const text = (btn.innerText || '').trim();
+        const label = btn.getAttribute('aria-label') || '';
+
+        if (btn.id === 'searchFilter_geoUrn') {
+            dropdown.hidden = false;
+        } else if (label === 'Show results') {
+            if (!chosenGeo) return;
+            const params = new URLSearchParams(location.search);
+            params.set('geoUrn', '["' + chosenGeo + '"]');
+            params.delete('page');
+            location.search = params.toString();
+        } else if (label === 'Got it') {
+            btn.closest('.sim-popup').remove();
+        } else if (label === 'Dismiss' || label === 'Close') {
+            closeDialogs();
+        } else if (label === 'Add a note') {
+            later(() => dialog(NOTE_MODAL, 'Add a note'), sim.dialog_latency_ms);
+        } else if (label === 'Send invitation' || label === 'Send without a note') {
+            if (rand() < sim.send_failure_rate) {
+                btn.closest('.artdeco-modal').insertAdjacentHTML('beforeend', '<p class="artdeco-inline-feedback">Something went wrong</p>');
+                return;
+            }
+            sent += 1;
+            post('/__sim__/invite', actedButton ? slugOf(actedButton) : '');
+            closeDialogs();
+            if (actedButton) {
+                actedButton.innerHTML = '<span class="artdeco-button__text">Pending</span>';
+                actedButton.setAttribute('aria-label', 'Pending');
+                actedButton.disabled = true;
+            }
+        } else if (text === 'Connect' || label.startsWith('Invite')) {
+            actedButton = btn;
+            if (sim.invite_limit && sent >= sim.invite_limit) {
+                later(() => dialog(LIMIT_MODAL, 'Invitation limit'), sim.dialog_latency_ms);
+            } else if (rand() >= sim.click_failure_rate) {
+                later(() => dialog(CONNECT_MODAL, 'Invite'), sim.dialog_latency_ms);
+            }
+        } else if (text === 'Message' || label.startsWith('Message')) {
+            actedButton = btn;
+            later(() => {
+                const overlay = document.createElement('aside');
+                overlay.className = 'msg-overlay-container';
+                overlay.innerHTML = '<div class="msg-overlay-conversation-bubble">' + MESSAGE_OVERLAY + '</div>';
+                document.body.appendChild(overlay);
+            }, sim.dialog_latency_ms);
+        } else if (text === 'Send' && btn.closest('.msg-overlay-container')) {
+            const box = btn.closest('.msg-overlay-container').querySelector('[role="textbox"]');
+            if (box.innerText.trim()) {
+                post('/__sim__/message', actedButton ? slugOf(actedButton) : '');
+                box.innerHTML = '';
+            }
+        } else if (btn.closest('.msg-overlay-bubble-header')) {
+            btn.closest('.msg-overlay-container').remove();
+        } else if (label === 'Next' && !btn.disabled) {
+            goToPage(sim.page + 1);
+        } else if (btn.closest('.artdeco-pagination__pages') && /^\d+$/.test(text)) {
+            goToPage(parseInt(text, 10));
+        }
+    }, true);
+})();
+""".replace('MESSAGE_CLOSE_CLASS', MESSAGE_CLOSE_CLASS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a simulated LinkedIn people search")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--results", type=int, default=SimulatorConfig.results)
+    parser.add_argument("--latency", type=int, default=SimulatorConfig.page_latency_ms, help="page load latency in ms")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="chance that a click or a send fails")
+    parser.add_argument("--invite-limit", type=int, default=0, help="show the invitation limit after this many invites")
+    parser.add_argument("--session", choices=('valid', 'expired', 'challenged'), default='valid',
+                        help="how the feed treats the li_at cookie")
+    args = parser.parse_args()
+
+    server = start_simulator(SimulatorConfig(results=args.results, page_latency_ms=args.latency,
+                                             click_failure_rate=args.failure_rate, send_failure_rate=args.failure_rate,
+                                             invite_limit=args.invite_limit, session=args.session), args.port)
+    print(f"Simulating LinkedIn search at {search_url(server)}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
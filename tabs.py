@@ -0,0 +1,133 @@
+"""Two-tab execution: discovery and actions in one browser session.
+
+One tab pages through the search results and extracts candidate cards
+while a second tab, sharing the session and cookies, loads each results
+page the first one parsed and sends the invites or messages from its
+cards. A worker thread runs the discovery tab and hands plain card
+records to the action loop through a bounded queue.
+
+A WebDriver session only talks to one window at a time, so every driver
+call goes through TabSet.use(), which holds a lock and switches windows
+when needed. Discovery work therefore runs while the action loop waits
+out its pacing window instead of after it.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+
+DISCOVERY = 'discovery'
+ACTION = 'action'
+
+# Seconds between checks of the stop flag while the queue is full
+_PUT_INTERVAL = 0.5
+
+
+class TabSet:
+    """Named windows of one driver, with every command serialized by a lock"""
+
+    def __init__(self, driver, on_switch=None, on_close=None, on_open=None):
+        self.driver = driver
+        self.lock = threading.RLock()
+        self.handles = {}
+        self.current = None
+        # Told the window handle whenever the driver moves to another tab or one is closed
+        self.on_switch = on_switch or (lambda handle: None)
+        self.on_close = on_close or (lambda handle: None)
+        # Called with the new tab current, for per tab settings such as URL blocking
+        self.on_open = on_open or (lambda handle: None)
+
+    def adopt(self, name:str):
+        """Name the window the driver is currently on"""
+        with self.lock:
+            self.handles[name] = self.driver.current_window_handle
+            self.current = name
+            self.on_switch(self.handles[name])
+        return self
+
+    def open(self, name:str):
+        """Open a new tab in the same session and make it current"""
+        with self.lock:
+            self.driver.switch_to.new_window('tab')
+            self.handles[name] = self.driver.current_window_handle
+            self.current = name
+            self.on_switch(self.handles[name])
+            self.on_open(self.handles[name])
+        return self
+
+    @contextmanager
+    def use(self, name:str):
+        """Hold the driver, switched to the named tab, for the duration of the block"""
+        with self.lock:
+            if self.current != name:
+                self.driver.switch_to.window(self.handles[name])
+                self.current = name
+                self.on_switch(self.handles[name])
+            yield self.driver
+
+    def close(self, name:str, back_to:str):
+        """Close a tab and switch back to another one"""
+        with self.lock:
+            handle = self.handles.pop(name, None)
+            if handle:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+                self.on_close(handle)
+            self.driver.switch_to.window(self.handles[back_to])
+            self.current = back_to
+            self.on_switch(self.handles[back_to])
+
+
+class DiscoveryWorker(threading.Thread):
+    """Walks the result pages in the discovery tab and queues their cards.
+
+    load_page(driver, page_num, first) is called with the discovery tab held
+    and returns (status, cards, page_url); any status but 'ok' ends discovery.
+    Queue items are (page_num, page_url, card) tuples, and None marks the end.
+    """
+
+    def __init__(self, tabs:TabSet, load_page, first_page:int, lookahead:int=20):
+        super().__init__(name='discovery', daemon=True)
+        self.tabs = tabs
+        self.load_page = load_page
+        self.first_page = first_page
+        self.candidates = queue.Queue(maxsize=max(1, lookahead))
+        self.stopped = threading.Event()
+        self.stop_reason = None
+        self.error = None
+
+    def run(self):
+        page_num = self.first_page
+        try:
+            while not self.stopped.is_set():
+                with self.tabs.use(DISCOVERY) as driver:
+                    status, cards, page_url = self.load_page(driver, page_num, page_num == self.first_page)
+                if status != 'ok':
+                    self.stop_reason = status
+                    break
+                for card in cards:
+                    if not self._put((page_num, page_url, card)):
+                        return
+                page_num += 1
+        except Exception as e:
+            self.stop_reason = 'error'
+            self.error = e
+        finally:
+            self._put(None)
+
+    def _put(self, item) -> bool:
+        """Queue an item, giving up when the worker is stopped while the queue is full"""
+        while not self.stopped.is_set():
+            try:
+                self.candidates.put(item, timeout=_PUT_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self):
+        """Next (page_num, page_url, card), or None once discovery has ended"""
+        return self.candidates.get()
+
+    def stop(self, timeout:float=30):
+        self.stopped.set()
+        self.join(timeout)
@@ -0,0 +1,39 @@
+import json
+import os
+
+from checkpoint import CampaignCheckpoint
+
+
+def test_save_load_clear(tmp_path):
+    checkpoint = CampaignCheckpoint(str(tmp_path / 'checkpoint.json'))
+    assert checkpoint.load() is None
+    checkpoint.save(campaign='c1', page_url='https://www.linkedin.com/search/results/people/?page=3',
+                    page_num=3, index=4, connections_sent=12)
+    state = checkpoint.load()
+    assert state['page_num'] == 3
+    assert state['index'] == 4
+    assert state['connections_sent'] == 12
+    assert state['updated_at'] > 0
+    assert not os.path.exists(checkpoint.path + '.tmp')
+
+    checkpoint.clear()
+    assert checkpoint.load() is None
+    checkpoint.clear()
+
+
+def test_save_replaces_previous_state(tmp_path):
+    checkpoint = CampaignCheckpoint(str(tmp_path / 'checkpoint.json'))
+    checkpoint.save(page_url='page-1', page_num=1)
+    checkpoint.save(page_url='page-2', page_num=2)
+    assert checkpoint.load()['page_url'] == 'page-2'
+
+
+def test_unusable_checkpoints(tmp_path):
+    path = tmp_path / 'checkpoint.json'
+    checkpoint = CampaignCheckpoint(str(path))
+    path.write_text('{"page_url": "https://www.linkedin.com/sea')
+    assert checkpoint.load() is None
+    path.write_text(json.dumps({'page_num': 2}))
+    assert checkpoint.load() is None
+    path.write_text(json.dumps(['page_url']))
+    assert checkpoint.load() is None
@@ -0,0 +1,103 @@
+import csv
+import json
+
+import pytest
+
+import harvest
+from cards import Card, CONNECT, MESSAGE
+from harvest import FIELDS, HarvestWriter, output_format
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def card(name:str, kind:str=CONNECT) -> Card:
+    slug = name.lower().replace(' ', '-')
+    return Card(name, f"https://www.linkedin.com/in/{slug}/", '', kind, '', headline='Engineer at Acme',
+                location='Berlin', degree='2nd')
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('cards.csv', 'csv'), ('cards.jsonl', 'jsonl'), ('cards.JSON', 'jsonl'), ('cards', 'csv'), ('cards.txt', 'csv'),
+])
+def test_output_format(path, expected):
+    assert output_format(path) == expected
+
+
+def test_csv_rows_follow_one_header(tmp_path):
+    path = tmp_path / 'out' / 'cards.csv'
+    writer = HarvestWriter(str(path)).open()
+    writer.write_page('managers', 1, [card('Jane Doe'), card('Max Mustermann', None)])
+    # Each page is flushed as soon as it is written
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 3
+    writer.write_page('managers', 2, [card('Jürgen Müller', MESSAGE)])
+    writer.close()
+
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == list(FIELDS)
+    assert rows[1:] == [
+        ['managers', '1', 'Jane Doe', 'https://www.linkedin.com/in/jane-doe/', 'Engineer at Acme', 'Berlin', '2nd', CONNECT],
+        ['managers', '1', 'Max Mustermann', 'https://www.linkedin.com/in/max-mustermann/', 'Engineer at Acme', 'Berlin',
+         '2nd', ''],
+        ['managers', '2', 'Jürgen Müller', 'https://www.linkedin.com/in/jürgen-müller/', 'Engineer at Acme', 'Berlin',
+         '2nd', MESSAGE],
+    ]
+
+
+def test_jsonl_has_no_header(tmp_path):
+    path = tmp_path / 'cards.jsonl'
+    writer = HarvestWriter(str(path)).open()
+    writer.write_page('managers', 1, [card('Jane Doe')])
+    writer.write_page('managers', 2, [card('Jürgen Müller', None)])
+    writer.close()
+
+    rows = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [row['name'] for row in rows] == ['Jane Doe', 'Jürgen Müller']
+    assert rows[0] == dict(zip(FIELDS, ('managers', 1, 'Jane Doe', 'https://www.linkedin.com/in/jane-doe/',
+                                        'Engineer at Acme', 'Berlin', '2nd', CONNECT)))
+    assert rows[1]['action'] == ''
+    assert 'Jürgen' in path.read_text(encoding='utf-8')
+
+
+def test_new_harvest_replaces_the_file(tmp_path):
+    path = tmp_path / 'cards.csv'
+    writer = HarvestWriter(str(path)).open()
+    writer.write_page('old', 1, [card('Jane Doe')])
+    writer.close()
+    writer = HarvestWriter(str(path)).open()
+    writer.write_page('new', 1, [card('Max Mustermann')])
+    writer.close()
+
+    rows = path.read_text(encoding='utf-8').splitlines()
+    assert len(rows) == 2
+    assert rows[1].startswith('new,1,Max Mustermann')
+
+
+def test_report(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(harvest, 'time', clock)
+    writer = HarvestWriter(str(tmp_path / 'cards.csv')).open()
+    writer.write_page('c', 1, [card('A'), card('B', MESSAGE), card('C')], CONNECT)
+    writer.write_page('c', 2, [card('D'), card('E', None)], CONNECT)
+    clock.now += 60
+    writer.close()
+
+    assert (writer.rows, writer.pages, writer.actionable) == (5, 2, 3)
+    assert writer.pages_per_minute() == 2.0
+    assert writer.report(30) == [
+        "5 cards from 2 pages in 60s: 2.0 pages/min, 30.0s per page",
+        "1.5 actionable candidates per page (3 of 5)",
+        "A limit of 30 needs about 20 pages (~10.0 min of page loads)",
+    ]
+
+
+def test_report_without_pages(tmp_path):
+    writer = HarvestWriter(str(tmp_path / 'cards.csv')).open()
+    writer.close()
+    assert len(writer.report(30)) == 1
@@ -0,0 +1,45 @@
+import pytest
+
+from ledger import Ledger, canonical_profile_key, SENT, FAILED, PENDING
+
+
+@pytest.mark.parametrize('profile_url, urn, expected', [
+    ('https://www.linkedin.com/in/Jane-Doe-123/', '', 'in/jane-doe-123'),
+    ('https://www.linkedin.com/in/jane-doe-123?miniProfileUrn=x', '', 'in/jane-doe-123'),
+    ('https://www.linkedin.com/in/j%C3%BCrgen/', '', 'in/jürgen'),
+    ('', 'urn:li:fsd_profile:ACoAAB12_x', 'urn:li:fsd_profile:ACoAAB12_x'),
+    ('', '(urn:li:member:42,SEARCH)', 'urn:li:member:42'),
+    ('https://www.linkedin.com/search/results/people/', 'urn:li:member:7', 'urn:li:member:7'),
+    ('', '', ''),
+])
+def test_canonical_profile_key(profile_url, urn, expected):
+    assert canonical_profile_key(profile_url, urn) == expected
+
+
+def test_record_dedupes_and_persists(tmp_path):
+    path = str(tmp_path / 'ledger.sqlite3')
+    ledger = Ledger(path).open()
+    ledger.record('in/jane', 'observed', PENDING, 'c1')
+    ledger.record('in/jane', 'invite', SENT, 'c2', 'https://www.linkedin.com/in/jane/', 'Jane')
+    ledger.record('', 'invite', SENT)
+    assert len(ledger) == 1
+    assert ledger.seen('in/jane')
+    assert not ledger.seen('in/john')
+    ledger.close()
+
+    reopened = Ledger(path).open()
+    assert reopened.index == {'in/jane': SENT}
+    row = reopened.conn.execute("SELECT action, campaign, name FROM contacts").fetchone()
+    assert row == ('invite', 'c2', 'Jane')
+    reopened.close()
+
+
+@pytest.mark.parametrize('retry_failed, seen', [(False, True), (True, False)])
+def test_failed_profiles_and_retry(tmp_path, retry_failed, seen):
+    path = str(tmp_path / 'ledger.sqlite3')
+    ledger = Ledger(path).open()
+    ledger.record('in/jane', 'invite', FAILED)
+    ledger.close()
+    reopened = Ledger(path, retry_failed=retry_failed).open()
+    assert reopened.seen('in/jane') is seen
+    reopened.close()
@@ -0,0 +1,105 @@
+import json
+from configparser import ConfigParser
+
+import pytest
+
+pytest.importorskip('colorama')
+import log
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def make_config(**options) -> ConfigParser:
+    input_config = ConfigParser()
+    input_config['Logging'] = options
+    return input_config
+
+
+@pytest.fixture
+def json_log(tmp_path, monkeypatch):
+    """Path of the JSON lines file of a debug level run, back to the defaults afterwards"""
+    monkeypatch.setattr(log, '_last_trace', {})
+    path = tmp_path / 'run.jsonl'
+    log.configure(make_config(level='DEBUG', path=str(path), trace_interval='60'))
+    yield path
+    log.configure(make_config())
+
+
+def entries(path) -> list:
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_records_are_written_after_drain(json_log, capsys):
+    log.info('page', "Page {page} loaded in {ms} ms", page=3, ms=120)
+    log.success('sent', "Invite sent to {name}", name='Jane')
+    log.drain()
+
+    first, second = entries(json_log)
+    assert first['event'] == 'page' and first['level'] == 'INFO'
+    assert first['message'] == "Page 3 loaded in 120 ms"
+    assert (first['page'], first['ms']) == (3, 120)
+    assert second['level'] == 'SUCCESS' and second['name'] == 'Jane'
+    assert capsys.readouterr().out.splitlines()[-2:] == [
+        log.Fore.CYAN + "[INFO] Page 3 loaded in 120 ms", log.Fore.GREEN + "[INFO] Invite sent to Jane"]
+
+
+def test_records_below_the_level_are_dropped(tmp_path):
+    path = tmp_path / 'run.jsonl'
+    log.configure(make_config(level='WARNING', path=str(path)))
+    try:
+        log.info('page', "Page loaded")
+        log.warning('slow', "Slow page")
+        log.drain()
+        assert [entry['event'] for entry in entries(path)] == ['slow']
+    finally:
+        log.configure(make_config())
+
+
+def test_message_keeps_the_template_when_a_field_is_missing(json_log):
+    log.info('page', "Page {page} of {pages}", page=2)
+    log.drain()
+    assert entries(json_log)[0]['message'] == "Page {page} of {pages}"
+
+
+def raise_and_log(event:str):
+    try:
+        raise ValueError('no such button')
+    except ValueError as e:
+        log.exception(event, "Fallback missed: {error}", e)
+
+
+def test_repeated_traces_are_throttled(json_log, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(log, 'time', clock)
+    raise_and_log('missed')
+    clock.now += 10
+    raise_and_log('missed')
+    raise_and_log('other')
+    clock.now += 60
+    raise_and_log('missed')
+    log.drain()
+
+    logged = entries(json_log)
+    assert [entry['message'] for entry in logged] == ["Fallback missed: no such button"] * 4
+    assert [(entry['event'], 'trace' in entry) for entry in logged] == [
+        ('missed', True), ('missed', False), ('other', True), ('missed', True)]
+    assert 'ValueError: no such button' in logged[0]['trace']
+
+
+def test_no_traces_above_debug(tmp_path):
+    path = tmp_path / 'run.jsonl'
+    log.configure(make_config(level='INFO', path=str(path)))
+    try:
+        raise_and_log('missed')
+        log.drain()
+        entry, = entries(path)
+        assert entry['level'] == 'WARNING' and entry['error'] == 'no such button'
+        assert 'trace' not in entry
+    finally:
+        log.configure(make_config())
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from memory_watchdog import MemoryWatchdog, RECYCLE_TAB, RESTART_DRIVER, process_tree_rss_mb
+
+
+def sample(latency_ms=30.0, rss_mb=500.0, heap_mb=50.0, nodes=5000) -> dict:
+    return {'latency_ms': latency_ms, 'rss_mb': rss_mb, 'heap_mb': heap_mb, 'nodes': nodes}
+
+
+def make_watchdog(**kwargs) -> MemoryWatchdog:
+    return MemoryWatchdog(**dict(dict(check_every=3, tab_heap_mb=400, tab_nodes=100000,
+                                      browser_rss_mb=3000, latency_factor=4), **kwargs))
+
+
+def test_due_every_check_every_actions():
+    watchdog = make_watchdog()
+    assert [watchdog.due() for _ in range(7)] == [False, False, True, False, False, True, False]
+
+
+def test_within_limits():
+    watchdog = make_watchdog()
+    assert watchdog.verdict(sample()) == (None, '')
+    assert watchdog.verdict(sample(heap_mb=400, nodes=100000, rss_mb=3000)) == (None, '')
+
+
+@pytest.mark.parametrize('overrides, expected', [
+    ({'heap_mb': 401}, RECYCLE_TAB),
+    ({'nodes': 100001}, RECYCLE_TAB),
+    ({'rss_mb': 3001}, RESTART_DRIVER),
+    # The whole browser outranks the tab
+    ({'rss_mb': 3001, 'heap_mb': 900, 'nodes': 500000}, RESTART_DRIVER),
+])
+def test_thresholds(overrides, expected):
+    assert make_watchdog().verdict(sample(**overrides))[0] == expected
+
+
+def test_missing_measurements_are_skipped():
+    watchdog = make_watchdog()
+    assert watchdog.verdict(sample(rss_mb=None, heap_mb=None, nodes=None)) == (None, '')
+
+
+def test_latency_against_fastest_baseline():
+    watchdog = make_watchdog()
+    assert watchdog.verdict(sample(latency_ms=50))[0] is None
+    assert watchdog.verdict(sample(latency_ms=30))[0] is None
+    assert watchdog.baseline_ms == 30
+    assert watchdog.verdict(sample(latency_ms=120))[0] is None
+    how, reason = watchdog.verdict(sample(latency_ms=121))
+    assert how == RESTART_DRIVER
+    assert '121 ms instead of 30 ms' in reason
+
+
+def test_noise_floor_for_fast_baselines():
+    watchdog = make_watchdog()
+    watchdog.verdict(sample(latency_ms=2))
+    # 4x of 2 ms would be 8 ms, the baseline counts as at least 20 ms
+    assert watchdog.verdict(sample(latency_ms=60))[0] is None
+    assert watchdog.verdict(sample(latency_ms=81))[0] == RESTART_DRIVER
+
+
+def test_check_counts_recycles_and_resets_baseline_on_restart(monkeypatch):
+    watchdog = make_watchdog()
+    samples = iter([sample(latency_ms=30), sample(heap_mb=500), sample(rss_mb=4000), sample(latency_ms=200)])
+    monkeypatch.setattr(watchdog, 'sample', lambda driver: next(samples))
+    assert watchdog.check(None)[0] is None
+    assert watchdog.check(None)[0] == RECYCLE_TAB
+    assert watchdog.baseline_ms == 30
+    assert watchdog.check(None)[0] == RESTART_DRIVER
+    assert watchdog.baseline_ms is None
+    # A fresh browser may answer slower than the old baseline without being recycled
+    assert watchdog.check(None)[0] is None
+    assert watchdog.recycled == {RECYCLE_TAB: 1, RESTART_DRIVER: 1}
+
+
+def test_process_tree_rss():
+    if not os.path.isdir('/proc'):
+        pytest.skip('needs /proc')
+    assert process_tree_rss_mb(os.getpid()) > 0
+    assert process_tree_rss_mb(2 ** 22 + 1) is None
@@ -0,0 +1,29 @@
+import pytest
+
+from metrics import percentile
+
+
+@pytest.mark.parametrize('count, fraction, expected', [
+    (10, 0.5, 5),
+    (20, 0.95, 19),
+    (6, 0.5, 3),
+    (30, 0.1, 3),
+    (100, 0.95, 95),
+    (1, 0.5, 1),
+])
+def test_percentile_is_nearest_rank(count, fraction, expected):
+    assert percentile(list(range(1, count + 1)), fraction) == expected
+
+
+def test_percentile_sorts_values():
+    assert percentile([9, 1, 5, 3, 7], 0.5) == 5
+
+
+def test_percentile_clamps_fraction():
+    values = [4, 2, 8]
+    assert percentile(values, 0) == 2
+    assert percentile(values, 1) == 8
+
+
+def test_percentile_of_nothing():
+    assert percentile([], 0.95) == 0.0
@@ -0,0 +1,86 @@
+from cards import Card, CONNECT
+from pipeline import CandidateQueue
+
+
+class FakeDriver:
+    """Answers the resolve script with the given usable flags, one per card it is asked about"""
+
+    def __init__(self, usable:dict):
+        self.usable = usable
+        self.calls = []
+
+    def execute_script(self, script, refs):
+        self.calls.append([ref['handle'] for ref in refs])
+        return [self.usable.get(ref['handle'], True) for ref in refs]
+
+
+def make_cards(count:int, handles:bool=True) -> list:
+    return [Card(f"Person {i}", f"https://www.linkedin.com/in/p{i}/", '', CONNECT, f"lac-{i}" if handles else '')
+            for i in range(count)]
+
+
+def names(cards) -> list:
+    return [card.name for card in cards]
+
+
+def test_load_skips_cards_handled_before_the_checkpoint():
+    queue = CandidateQueue()
+    queue.load(make_cards(5), skip=2)
+    assert len(queue) == 3
+    assert queue.taken == 2
+    assert queue.pop().name == 'Person 2'
+    assert queue.taken == 3
+
+
+def test_load_replaces_the_previous_page():
+    queue = CandidateQueue()
+    queue.load(make_cards(3))
+    queue.pop()
+    queue.load(make_cards(2))
+    assert len(queue) == 2
+    assert queue.taken == 0
+
+
+def test_pop_in_page_order_without_prefetch():
+    queue = CandidateQueue()
+    queue.load(make_cards(3))
+    assert names([queue.pop() for _ in range(3)]) == ['Person 0', 'Person 1', 'Person 2']
+    assert not queue
+    assert queue.taken == 3
+
+
+def test_prefetch_resolves_up_to_depth_in_one_call():
+    queue = CandidateQueue(depth=2)
+    queue.load(make_cards(5))
+    driver = FakeDriver({})
+    assert queue.prefetch(driver) == 0
+    assert driver.calls == [['lac-0', 'lac-1']]
+    # Already full, nothing to resolve
+    assert queue.prefetch(driver) == 0
+    assert len(driver.calls) == 1
+    assert queue.pop().name == 'Person 0'
+    queue.prefetch(driver)
+    assert driver.calls[-1] == ['lac-2']
+
+
+def test_prefetch_drops_unusable_cards_and_counts_them_taken():
+    queue = CandidateQueue(depth=3)
+    queue.load(make_cards(4))
+    assert queue.prefetch(FakeDriver({'lac-0': False, 'lac-2': False})) == 2
+    assert queue.taken == 2
+    assert names([queue.pop(), queue.pop()]) == ['Person 1', 'Person 3']
+    assert queue.taken == 4
+    assert not queue
+
+
+def test_cards_without_handle_are_kept_without_a_script_call():
+    queue = CandidateQueue(depth=2)
+    queue.load(make_cards(2, handles=False))
+    driver = FakeDriver({})
+    assert queue.prefetch(driver) == 0
+    assert driver.calls == []
+    assert len(queue) == 2
+
+
+def test_prefetch_of_empty_queue():
+    assert CandidateQueue().prefetch(FakeDriver({})) == 0
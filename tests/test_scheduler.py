@@ -0,0 +1,77 @@
+import pytest
+
+import scheduler
+from scheduler import ActionScheduler, BucketLimits, INVITE, HOUR, DAY
+
+
+class Clock:
+    def __init__(self, now:float=1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler, 'time', clock)
+    return clock
+
+
+def make_scheduler(tmp_path, wait_for_hourly_cap=True, **limits):
+    limits = dict(dict(per_minute=6, burst=2, hourly=5, daily=8), **limits)
+    return ActionScheduler({INVITE: BucketLimits(**limits)}, str(tmp_path / 'schedule.json'), wait_for_hourly_cap).load()
+
+
+def test_burst_then_refill(tmp_path, clock):
+    bucket = make_scheduler(tmp_path)
+    assert bucket.ready_in(INVITE) == 0
+    bucket.record(INVITE)
+    bucket.record(INVITE)
+    # 6 per minute refills one token every 10 seconds
+    assert bucket.ready_in(INVITE) == pytest.approx(10)
+    clock.now += 4
+    assert bucket.ready_in(INVITE) == pytest.approx(6)
+    clock.now += 6
+    assert bucket.ready_in(INVITE) == 0
+
+
+def test_tokens_never_exceed_burst(tmp_path, clock):
+    bucket = make_scheduler(tmp_path)
+    clock.now += DAY
+    bucket.record(INVITE)
+    bucket.record(INVITE)
+    assert bucket.ready_in(INVITE) > 0
+
+
+def test_hourly_cap_waits_for_the_oldest_action(tmp_path, clock):
+    bucket = make_scheduler(tmp_path, per_minute=600, burst=10)
+    first = clock.now
+    for _ in range(5):
+        bucket.record(INVITE)
+        clock.now += 60
+    assert bucket.remaining(INVITE)['hourly'] == 0
+    assert bucket.can_act(INVITE)
+    assert bucket.ready_in(INVITE) == pytest.approx(first + HOUR - clock.now)
+
+
+def test_hourly_cap_stops_when_not_waiting(tmp_path, clock):
+    bucket = make_scheduler(tmp_path, per_minute=600, burst=10, wait_for_hourly_cap=False)
+    for _ in range(5):
+        bucket.record(INVITE)
+    assert not bucket.can_act(INVITE)
+    clock.now += HOUR
+    assert bucket.can_act(INVITE)
+
+
+def test_daily_cap_persists_across_runs(tmp_path, clock):
+    bucket = make_scheduler(tmp_path, per_minute=600, burst=10, hourly=100)
+    for _ in range(8):
+        bucket.record(INVITE)
+    assert not bucket.can_act(INVITE)
+
+    reloaded = make_scheduler(tmp_path, per_minute=600, burst=10, hourly=100)
+    assert reloaded.remaining(INVITE) == {'hourly': 92, 'daily': 0}
+    clock.now += DAY
+    assert reloaded.remaining(INVITE) == {'hourly': 100, 'daily': 8}
@@ -0,0 +1,42 @@
+from search_url import SearchURL, SEARCH_BASE
+
+URL = (SEARCH_BASE + "?keywords=data%20scientist&geoUrn=%5B%22101174742%22%5D"
+       "&network=%5B%22S%22%5D&origin=FACETED_SEARCH")
+
+
+def test_from_url_reads_the_page_cursor():
+    search = SearchURL.from_url(URL + "&page=4&sid=abc")
+    assert search.page == 4
+    assert search.base == SEARCH_BASE
+    assert ('page', '4') not in search.params
+    assert search.url() == URL + "&sid=abc&page=4"
+
+
+def test_first_page_has_no_page_parameter():
+    search = SearchURL.from_url(URL)
+    assert search.page == 1
+    assert search.url() == URL
+    assert search.url(2) == URL + "&page=2"
+    assert search.url(1) == URL
+
+
+def test_invalid_page_falls_back_to_one():
+    assert SearchURL.from_url(URL + "&page=next").page == 1
+
+
+def test_round_trip_keeps_encoding_and_order():
+    assert str(SearchURL.from_url(URL + "&page=7")) == URL + "&page=7"
+
+
+def test_from_criteria():
+    search = SearchURL.from_criteria('Data Scientist', '%5B%22S%22%5D', location='Canada', location_code='101174742',
+                                     actively_hiring='any job')
+    assert search.url(3) == (SEARCH_BASE + "?keywords=data%20scientist&geoUrn=%5B%22101174742%22%5D"
+                             "&network=%5B%22S%22%5D&activelyHiringForJobTitles=%5B%22-100%22%5D"
+                             "&origin=FACETED_SEARCH&page=3")
+
+
+def test_from_criteria_without_geo_urn():
+    search = SearchURL.from_criteria('ml', '%5B%22F%22%5D', location='New York', actively_hiring='Data Engineer')
+    assert search.params == [('keywords', 'ml'), ('locations', 'New%20York'), ('network', '%5B%22F%22%5D'),
+                             ('facetActivelyHiring', 'true'), ('title', 'Data%20Engineer'), ('origin', 'FACETED_SEARCH')]
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import selector_cache
+from selector_cache import SelectorRegistry, MISS_STREAK_LIMIT, STALE_AFTER_SECONDS, FORGET_AFTER_SECONDS
+
+PATTERNS = ['first', 'second', 'third']
+
+
+class Clock:
+    def __init__(self, now:float=1_000_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(selector_cache, 'time', clock)
+    return clock
+
+
+def test_untried_cascade_keeps_its_order(tmp_path):
+    assert SelectorRegistry(str(tmp_path / 'cache.json')).ordered('next', PATTERNS) == PATTERNS
+
+
+def test_hits_move_a_pattern_first_and_misses_last(tmp_path, clock):
+    registry = SelectorRegistry(str(tmp_path / 'cache.json'))
+    registry.record('next', 'first', hit=False)
+    registry.record('next', 'third', hit=True)
+    assert registry.ordered('next', PATTERNS) == ['third', 'second', 'first']
+    # Other cascades are unaffected
+    assert registry.ordered('connect', PATTERNS) == PATTERNS
+
+
+def test_miss_streak_makes_an_entry_stale(tmp_path, clock):
+    registry = SelectorRegistry(str(tmp_path / 'cache.json'))
+    for _ in range(10):
+        registry.record('next', 'first', hit=True)
+    for _ in range(MISS_STREAK_LIMIT - 1):
+        registry.record('next', 'first', hit=False)
+    entry = registry.stats['next']['first']
+    assert not SelectorRegistry.is_stale(entry)
+    registry.record('next', 'first', hit=False)
+    assert SelectorRegistry.is_stale(entry)
+    registry.record('next', 'second', hit=True)
+    assert registry.ordered('next', PATTERNS)[0] == 'second'
+    registry.record('next', 'first', hit=True)
+    assert not SelectorRegistry.is_stale(entry)
+
+
+def test_old_hits_become_stale(tmp_path, clock):
+    registry = SelectorRegistry(str(tmp_path / 'cache.json'))
+    registry.record('next', 'first', hit=True)
+    entry = registry.stats['next']['first']
+    clock.now += STALE_AFTER_SECONDS - 1
+    assert not SelectorRegistry.is_stale(entry)
+    clock.now += 2
+    assert SelectorRegistry.is_stale(entry)
+    assert registry.score('next', 'first') < registry.score('next', 'second')
+
+
+def test_save_load_round_trip(tmp_path, clock):
+    path = str(tmp_path / 'cache.json')
+    registry = SelectorRegistry(path)
+    registry.record('next', 'third', hit=True)
+    registry.record('next', 'first', hit=False)
+    registry.save()
+    assert not registry.dirty
+
+    reloaded = SelectorRegistry(path).load()
+    assert reloaded.stats == registry.stats
+    assert reloaded.ordered('next', PATTERNS) == ['third', 'second', 'first']
+
+
+def test_save_forgets_untouched_entries(tmp_path, clock):
+    path = str(tmp_path / 'cache.json')
+    registry = SelectorRegistry(path)
+    registry.record('next', 'first', hit=True)
+    registry.record('connect', 'first', hit=True)
+    clock.now += FORGET_AFTER_SECONDS / 2
+    registry.record('next', 'second', hit=True)
+    clock.now += FORGET_AFTER_SECONDS / 2 + 1
+    registry.save()
+    with open(path) as f:
+        assert json.load(f)['cascades'] == {'next': {'second': registry.stats['next']['second']}}
+
+
+def test_save_without_changes_writes_nothing(tmp_path):
+    path = tmp_path / 'cache.json'
+    SelectorRegistry(str(path)).save()
+    assert not path.exists()
+
+
+def test_broken_cache_file_starts_empty(tmp_path):
+    path = tmp_path / 'cache.json'
+    path.write_text('{"cascades": ')
+    assert SelectorRegistry(str(path)).load().stats == {}
@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+
+from session import SessionStore, check_session, classify, VALID, EXPIRED, CHALLENGED, UNKNOWN
+from simulator import SimulatorConfig, start_simulator
+
+
+@pytest.mark.parametrize('status_code, location, set_li_at, expected', [
+    (200, '', None, VALID),
+    (302, 'https://www.linkedin.com/authwall?trk=feed', None, EXPIRED),
+    (303, '/uas/login?session_redirect=%2Ffeed%2F', None, EXPIRED),
+    (302, '/checkpoint/challenge/AgF', None, CHALLENGED),
+    (200, '', '"delete me"', EXPIRED),
+    (401, '', None, EXPIRED),
+    (302, '/feed/?trk=redirect', None, UNKNOWN),
+    (999, '', None, UNKNOWN),
+    (429, '', None, UNKNOWN),
+])
+def test_classify(status_code, location, set_li_at, expected):
+    assert classify(status_code, location, set_li_at)[0] == expected
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / 'session.json')
+    store = SessionStore(path, configured='pasted').load()
+    assert store.cookie == 'pasted'
+    store.save('refreshed')
+    store.record(EXPIRED, 'redirected to the login')
+
+    reloaded = SessionStore(path, configured='pasted').load()
+    assert reloaded.cookie == 'refreshed'
+    assert reloaded.status == EXPIRED
+    assert reloaded.detail == 'redirected to the login'
+    assert reloaded.checked_at > 0
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+
+def test_newly_pasted_cookie_wins(tmp_path):
+    path = str(tmp_path / 'session.json')
+    SessionStore(path, configured='old').load().save('refreshed')
+    assert SessionStore(path, configured='new').load().cookie == 'new'
+
+
+def test_placeholder_and_legacy_cookie(tmp_path):
+    store = SessionStore(str(tmp_path / 'session.json'), configured='YOUR_LI_AT_COOKIE_HERE', legacy='from-setup').load()
+    assert store.cookie == 'from-setup'
+
+
+def test_broken_file_starts_from_config(tmp_path):
+    path = tmp_path / 'session.json'
+    path.write_text('{not json')
+    assert SessionStore(str(path), configured='pasted').load().cookie == 'pasted'
+    path.write_text(json.dumps(['a list']))
+    assert SessionStore(str(path), configured='pasted').load().cookie == 'pasted'
+
+
+@pytest.mark.parametrize('session, expected', [('valid', VALID), ('expired', EXPIRED), ('challenged', CHALLENGED)])
+def test_check_session_against_simulator(session, expected):
+    pytest.importorskip('requests')
+    server = start_simulator(SimulatorConfig(page_latency_ms=0, session=session))
+    try:
+        host, port = server.server_address[:2]
+        status, detail = check_session('cookie', f"http://{host}:{port}", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert status == expected, detail
+
+
+def test_check_session_without_cookie():
+    assert check_session('')[0] == EXPIRED
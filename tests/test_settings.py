@@ -0,0 +1,95 @@
+from configparser import ConfigParser
+
+import pytest
+
+from settings import (CampaignSettings, ERROR, WARNING, NOTE_MAX_LENGTH, config_problems, load_campaigns,
+                      total_budget)
+from scheduler import INVITE, MESSAGE
+
+
+def make_config(text:str) -> ConfigParser:
+    input_config = ConfigParser()
+    input_config.read_string(text)
+    return input_config
+
+
+def texts(problems:list, level:str) -> list:
+    return [text for problem_level, text in problems if problem_level == level]
+
+
+def test_valid_campaign_has_no_problems():
+    settings = CampaignSettings(keyword='Manager', include_note=True, message='Hi {name}, glad to connect!')
+    assert settings.problems() == []
+
+
+@pytest.mark.parametrize('overrides, level, fragment', [
+    ({'keyword': ' '}, ERROR, 'keyword is empty'),
+    ({'limit': 0}, ERROR, 'limit must be positive'),
+    ({'connection_degree': '4th'}, WARNING, "Invalid connection degree '4th'"),
+    ({'location': 'Atlantis'}, WARNING, "No geoUrn known for location 'Atlantis'"),
+    ({'pagination': 'scroll'}, WARNING, "Unknown pagination strategy 'scroll'"),
+    ({'include_note': True}, WARNING, 'connection_message is empty'),
+    ({'include_note': True, 'message': 'Hi {firstName}'}, ERROR, 'Unknown placeholder {firstName}'),
+    ({'include_note': True, 'message': 'x' * (NOTE_MAX_LENGTH - 10) + ' {name}'}, ERROR, 'LinkedIn allows 300'),
+])
+def test_campaign_problems(overrides, level, fragment):
+    settings = CampaignSettings(**dict(dict(keyword='Manager'), **overrides))
+    assert any(fragment in text for text in texts(settings.problems(), level)), settings.problems()
+
+
+def test_message_letter_ignored_outside_1st_connections():
+    input_config = make_config("[SearchCriteria]\nkeyword = Manager\n[Messages]\nmessage_letter = Hello {name}\n")
+    settings = CampaignSettings.from_config(input_config)
+    assert settings.message_letter == ''
+    assert texts(settings.problems(input_config), WARNING) == [
+        "message_letter is only sent to 1st connections and is ignored for this search"]
+
+
+def test_config_problems():
+    assert config_problems(make_config("")) == []
+    problems = config_problems(make_config(
+        "[Execution]\nmode = three_tabs\nbackend = playwright\n"
+        "[Logging]\nlevel = chatty\n"
+        "[Timeouts]\npercentile = 120\n"
+        "[Schedule]\ninvites_per_minute = 0\n"
+        "[Browser]\nblock_preset = everything\n"))
+    errors = texts(problems, ERROR)
+    assert len(errors) == 5
+    assert any("Unknown execution mode 'three_tabs'" in text for text in errors)
+    assert any("Unknown backend 'playwright'" in text for text in errors)
+    assert any("percentile must be between 0 and 100" in text for text in errors)
+    assert any("invites_per_minute must be positive" in text for text in errors)
+    assert any("Unknown block_preset 'everything'" in text for text in errors)
+    assert len(texts(problems, WARNING)) == 1
+
+
+def test_session_options_are_not_campaign_problems():
+    input_config = make_config("[Execution]\nmode = three_tabs\n[Campaign a]\nkeyword = A\n[Campaign b]\nkeyword = B\n")
+    assert all(settings.problems(input_config) == [] for settings in load_campaigns(input_config))
+    assert len(config_problems(input_config)) == 1
+
+
+def test_load_campaigns_without_campaign_sections():
+    campaigns = load_campaigns(make_config("[SearchCriteria]\nkeyword = Manager\nlimit = 5\n"))
+    assert [(settings.section, settings.campaign, settings.limit) for settings in campaigns] == [
+        ('SearchCriteria', 'Manager', 5)]
+
+
+def test_load_campaigns_override_shared_sections():
+    input_config = make_config(
+        "[SearchCriteria]\nconnection_degree = 2nd\nkeyword = Manager\nlimit = 10\n"
+        "[Messages]\ninclude_note = True\nconnection_message = Hi {name}\nmessage_letter = Hello {name}\n"
+        "[Campaign recruiters]\nkeyword = Recruiter\nlimit = 3\n"
+        "[Campaign friends]\nconnection_degree = 1st\ncampaign = old friends\n")
+    recruiters, friends = load_campaigns(input_config)
+    assert (recruiters.campaign, recruiters.keyword, recruiters.limit) == ('recruiters', 'Recruiter', 3)
+    assert recruiters.message == 'Hi {name}' and recruiters.action == INVITE
+    assert (friends.campaign, friends.keyword, friends.limit) == ('old friends', 'Manager', 10)
+    assert friends.message_letter == 'Hello {name}' and friends.action == MESSAGE
+    assert total_budget(input_config, [recruiters, friends]) == 13
+
+
+def test_total_limit_caps_the_budget():
+    input_config = make_config("[Campaigns]\ntotal_limit = 4\n")
+    assert total_budget(input_config, [CampaignSettings(limit=3), CampaignSettings(limit=5)]) == 4
+    assert total_budget(make_config("[Campaigns]\ntotal_limit = 0\n"), [CampaignSettings(limit=3)]) == 3
@@ -0,0 +1,40 @@
+from timeouts import TimeoutController, MIN_SAMPLES
+
+
+def make_controller(tmp_path, **kwargs):
+    return TimeoutController({'page_load': 20, 'clickable': 5}, str(tmp_path / 'timeouts.json'),
+                             floors={'page_load': 10}, **kwargs)
+
+
+def test_ceiling_until_enough_samples(tmp_path):
+    controller = make_controller(tmp_path)
+    for _ in range(MIN_SAMPLES - 1):
+        controller.observe('clickable', 0.5)
+    assert controller.timeout('clickable') == 5
+    controller.observe('clickable', 0.5)
+    assert controller.timeout('clickable') == 1.5
+
+
+def test_page_load_keeps_its_floor(tmp_path):
+    controller = make_controller(tmp_path)
+    for _ in range(20):
+        controller.observe('page_load', 0.5)
+    assert controller.timeout('page_load') == 10
+
+
+def test_miss_widens_to_ceiling_until_a_success(tmp_path):
+    controller = make_controller(tmp_path)
+    for _ in range(20):
+        controller.observe('clickable', 0.5)
+    controller.observe('clickable', 1.5, timed_out=True)
+    assert controller.timeout('clickable') == 5
+    controller.observe('clickable', 0.5)
+    assert controller.timeout('clickable') == 1.5
+
+
+def test_windows_survive_a_restart(tmp_path):
+    controller = make_controller(tmp_path)
+    for _ in range(10):
+        controller.observe('clickable', 2.0)
+    controller.save()
+    assert make_controller(tmp_path).load().timeout('clickable') == 3.0
@@ -0,0 +1,108 @@
+"""Adaptive wait timeouts learned from observed latencies.
+
+A fixed timeout is wrong both ways: on a fast connection every failing
+branch of a selector cascade burns the full timeout, on a slow one real
+waits give up early and the run drops into the slow fallback path. The
+controller keeps a rolling window of how long each kind of wait actually
+took and times it out at a percentile of that window plus a margin,
+clamped between a floor and the step's ceiling from [Waits]. Navigation
+waits keep a floor of their own at the old fixed page load timeout, and a
+wait that times out puts its step back at the ceiling until one succeeds,
+so a timeout that got too tight recovers instead of failing every page.
+The windows are saved between runs so a new run starts from the last
+one's latencies.
+"""
+import json
+import os
+from collections import deque
+
+from metrics import percentile
+
+DEFAULT_STATE_FILE = '.timeouts.json'
+
+# Below this many samples a step keeps its ceiling
+MIN_SAMPLES = 5
+
+# Seconds the page loads waited for before timeouts were learned
+PAGE_LOAD_FLOOR = 10.0
+
+
+class TimeoutController:
+    """Rolling latency windows per wait step and the timeouts derived from them"""
+
+    def __init__(self, ceilings:dict, path:str=DEFAULT_STATE_FILE, percentile:float=0.95,
+                 margin:float=1.0, floor:float=1.0, window:int=50, floors:dict=None):
+        # Shared with waits.WAIT_CEILINGS, so [Waits] overrides apply here too
+        self.ceilings = ceilings
+        self.path = path
+        self.percentile = percentile
+        self.margin = margin
+        self.floor = floor
+        # Per step floors above the general one
+        self.floors = floors or {}
+        self.window = max(MIN_SAMPLES, window)
+        self.samples = {}
+        # Steps whose last wait timed out, they wait up to their ceiling until one succeeds
+        self.missed = set()
+        self.dirty = False
+
+    @classmethod
+    def from_config(cls, input_config, ceilings:dict):
+        return cls(
+            ceilings,
+            path=input_config.get('Timeouts', 'state_file', fallback=DEFAULT_STATE_FILE),
+            percentile=input_config.getfloat('Timeouts', 'percentile', fallback=95) / 100,
+            margin=input_config.getfloat('Timeouts', 'margin', fallback=1.0),
+            floor=input_config.getfloat('Timeouts', 'floor', fallback=1.0),
+            window=input_config.getint('Timeouts', 'window', fallback=50),
+            floors=dict.fromkeys(('page_load', 'login'),
+                                 input_config.getfloat('Timeouts', 'page_load_floor', fallback=PAGE_LOAD_FLOOR)),
+        )
+
+    def load(self):
+        """Load the saved windows, a missing or broken file starts from the ceilings"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            steps = data.get('steps', {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            steps = {}
+        self.samples = {
+            step: deque((float(value) for value in values), maxlen=self.window)
+            for step, values in steps.items() if isinstance(values, list)
+        }
+        return self
+
+    def save(self):
+        """Write the windows atomically so an interrupted run can't corrupt them"""
+        if not self.dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': 1, 'steps': {step: [round(value, 3) for value in values]
+                                               for step, values in self.samples.items()}},
+                      f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def observe(self, step:str, seconds:float, timed_out:bool=False):
+        """Add the duration of one wait of step to its window, a timeout widens the step to its ceiling"""
+        self.samples.setdefault(step, deque(maxlen=self.window)).append(seconds)
+        if timed_out:
+            self.missed.add(step)
+        else:
+            self.missed.discard(step)
+        self.dirty = True
+
+    def timeout(self, step:str) -> float:
+        """Percentile of the step's window plus the margin, between the floor and its ceiling"""
+        ceiling = self.ceilings.get(step, 10)
+        samples = self.samples.get(step)
+        if step in self.missed or not samples or len(samples) < MIN_SAMPLES:
+            return ceiling
+        floor = max(self.floor, self.floors.get(step, 0))
+        return min(ceiling, max(floor, percentile(list(samples), self.percentile) + self.margin))
+
+    def summary(self) -> dict:
+        """Current timeout per step that has samples"""
+        return {step: self.timeout(step) for step in self.samples}
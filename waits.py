@@ -0,0 +1,230 @@
+"""Condition based waits and the pacing policy.
+
+Page loads, modals and pagination are waited for by watching the page
+itself (results list mutations, modal state, URL params, network activity)
+instead of sleeping for a fixed time. Every wait has a per-step ceiling and
+its actual duration is recorded; with [Timeouts] adaptive the recorded
+durations set each step's timeout below its ceiling, and a required wait
+that times out widens its step again. Deliberate delays
+between actions are a separate concern handled by PacingPolicy.
+"""
+import random
+import time
+from urllib.parse import urlparse, parse_qs
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from timeouts import TimeoutController
+
+# Upper bound in seconds for each kind of wait, overridable from [Waits]
+WAIT_CEILINGS = {
+    'page_load': 10,
+    'results': 8,
+    'scroll': 3,
+    'modal_open': 5,
+    'modal_close': 5,
+    'typeahead': 5,
+    'clickable': 5,
+    'login': 10,
+}
+
+POLL_INTERVAL = 0.1
+
+# Extra seconds between two actions on top of the schedule, [Pacing] action_delay
+DEFAULT_ACTION_DELAY = 0.0
+
+# Durations of completed waits per step, in seconds
+wait_stats = {}
+
+# Learns each step's timeout from its durations, set up by configure()
+controller = None
+
+_RESULTS_SIGNATURE_JS = """
+const links = Array.from(document.querySelectorAll('a[href*="/in/"]'));
+if (!links.length) return '';
+return links.length + '|' + links[0].href.split('?')[0] + '|' + links[links.length - 1].href.split('?')[0];
+"""
+
+_RESULTS_STATE_JS = """
+const main = document.querySelector('main') || document.body;
+if (main.querySelector('.search-reusable-search-no-results, .artdeco-empty-state')) return 'empty';
+if (Array.from(main.querySelectorAll('h2')).some(h => /no results found/i.test(h.textContent))) return 'empty';
+if (main.querySelector('a[href*="/in/"]')) return 'results';
+return null;
+"""
+
+_MODAL_JS = """
+const modals = document.querySelectorAll('div[role="dialog"], div[role="alertdialog"], .artdeco-modal');
+for (const modal of modals) {
+    if (modal.offsetParent !== null || modal.getClientRects().length) return modal;
+}
+return null;
+"""
+
+_NETWORK_STATE_JS = """
+return [document.readyState, performance.getEntriesByType('resource').length];
+"""
+
+
+def configure(input_config):
+    """Apply per-step ceilings from [Waits] and set up the adaptive timeouts of [Timeouts]"""
+    global controller
+    if input_config.has_section('Waits'):
+        for step in WAIT_CEILINGS:
+            if input_config.has_option('Waits', step):
+                WAIT_CEILINGS[step] = input_config.getfloat('Waits', step)
+    controller = None
+    if input_config.getboolean('Timeouts', 'adaptive', fallback=True):
+        controller = TimeoutController.from_config(input_config, WAIT_CEILINGS).load()
+
+
+def timeout_for(step:str) -> float:
+    """Seconds a wait of step may take: learned when adaptive, its ceiling otherwise"""
+    if controller:
+        return controller.timeout(step)
+    return WAIT_CEILINGS.get(step, 10)
+
+
+def wait_for(driver, step:str, condition, timeout:float=None, required:bool=True):
+    """Block until condition(driver) is truthy, bounded by the step's timeout.
+
+    Returns the condition's value and records how long the wait took. Raises
+    TimeoutException when the timeout is reached. A required wait that times
+    out is learned at its timeout and puts the step back at its ceiling, so
+    a step whose timeout is too short for the connection grows it; optional
+    waits only teach their successes.
+    """
+    limit = timeout if timeout is not None else timeout_for(step)
+    start = time.monotonic()
+    try:
+        value = WebDriverWait(driver, limit, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        record(step, time.monotonic() - start, learn=required, timed_out=True)
+        raise
+    record(step, time.monotonic() - start)
+    return value
+
+
+def record(step:str, seconds:float, learn:bool=True, timed_out:bool=False):
+    """Count a wait of step that took seconds, also for waits done inside the page"""
+    wait_stats.setdefault(step, []).append(seconds)
+    if controller and learn:
+        controller.observe(step, seconds, timed_out)
+
+
+def try_wait_for(driver, step:str, condition, timeout:float=None):
+    """Like wait_for but returns None instead of raising on timeout.
+
+    Used for probes that may legitimately fail (fallback branches, optional
+    dialogs), so their timeouts don't stretch the step's learned timeout.
+    """
+    try:
+        return wait_for(driver, step, condition, timeout, required=False)
+    except TimeoutException:
+        return None
+
+
+def results_signature(driver) -> str:
+    """Short fingerprint of the profile links currently in the results list"""
+    return driver.execute_script(_RESULTS_SIGNATURE_JS) or ''
+
+
+def results_changed(old_signature:str):
+    """Condition: the results list differs from old_signature and is not empty"""
+    def condition(driver):
+        signature = results_signature(driver)
+        return signature if signature and signature != old_signature else False
+    return condition
+
+
+def results_or_empty(driver):
+    """Condition: the page shows results ('results') or LinkedIn's empty state ('empty')"""
+    return driver.execute_script(_RESULTS_STATE_JS) or False
+
+
+def modal_open(driver):
+    """Condition: a dialog is visible, returns the dialog element"""
+    return driver.execute_script(_MODAL_JS) or False
+
+
+def modal_closed(driver):
+    """Condition: no dialog is visible"""
+    return driver.execute_script(_MODAL_JS) is None
+
+
+def url_param(url:str, name:str):
+    values = parse_qs(urlparse(url).query).get(name)
+    return values[0] if values else None
+
+
+def url_param_changed(name:str, old_value):
+    """Condition: the query parameter `name` of the current URL changed"""
+    def condition(driver):
+        value = url_param(driver.current_url, name)
+        return value if value is not None and value != old_value else False
+    return condition
+
+
+def network_idle(quiet_ms:int=500):
+    """Condition: the document is loaded and no new resources started for quiet_ms"""
+    state = {'count': -1, 'since': time.monotonic()}
+
+    def condition(driver):
+        ready, count = driver.execute_script(_NETWORK_STATE_JS)
+        now = time.monotonic()
+        if count != state['count']:
+            state['count'] = count
+            state['since'] = now
+            return False
+        return ready == 'complete' and (now - state['since']) * 1000 >= quiet_ms
+    return condition
+
+
+def summary() -> dict:
+    """Count, average and maximum duration per wait step"""
+    return {
+        step: {'count': len(durations), 'avg': sum(durations) / len(durations), 'max': max(durations)}
+        for step, durations in wait_stats.items() if durations
+    }
+
+
+def save():
+    """Persist the learned timeouts for the next run"""
+    if controller:
+        controller.save()
+
+
+class PacingPolicy:
+    """Deliberate delay between actions, kept apart from page load waits.
+
+    The delay is a window: start_window() opens it right after an action, the
+    caller may do useful work, and wait_remaining() only sleeps what is left.
+    """
+
+    def __init__(self, action_delay:float=DEFAULT_ACTION_DELAY, jitter:float=0, prefetch_depth:int=3):
+        self.action_delay = action_delay
+        self.jitter = jitter
+        self.prefetch_depth = prefetch_depth
+        self.deadline = 0.0
+
+    @classmethod
+    def from_config(cls, input_config):
+        return cls(
+            action_delay=input_config.getfloat('Pacing', 'action_delay', fallback=DEFAULT_ACTION_DELAY),
+            jitter=input_config.getfloat('Pacing', 'jitter', fallback=0),
+            prefetch_depth=input_config.getint('Pacing', 'prefetch_depth', fallback=3),
+        )
+
+    def delay(self) -> float:
+        return max(0.0, self.action_delay + random.uniform(-self.jitter, self.jitter))
+
+    def start_window(self, minimum:float=0.0):
+        """Open the pacing window after an invite/message, lasting at least minimum seconds"""
+        self.deadline = time.monotonic() + max(minimum, self.delay())
+
+    def wait_remaining(self) -> float:
+        """Sleep for whatever is left of the pacing window, returns the seconds slept"""
+        remaining = max(0.0, self.deadline - time.monotonic())
+        time.sleep(remaining)
+        return remaining